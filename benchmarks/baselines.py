@@ -0,0 +1,81 @@
+"""
+Benchmark baselines keyed by commit and the regression check between two of them.
+
+Every saved run is benchmarks/baselines/<commit>.json. A run is compared on the median of each
+metric (handlers/<step>, flows/<flow>, models/<model>); a metric regresses when it is slower than
+the baseline by more than the threshold share and by more than a noise floor in milliseconds.
+"""
+import json
+import os
+import subprocess
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+def current_commit():
+    """Short hash of HEAD, with a -dirty suffix for uncommitted changes; 'unknown' outside a git checkout."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+
+def baseline_path(commit: str, baselines_dir=BASELINES_DIR):
+    return os.path.join(baselines_dir, f"{commit}.json")
+
+
+def save_baseline(run, baselines_dir=BASELINES_DIR):
+    """Store the run under its commit and return the path."""
+    os.makedirs(baselines_dir, exist_ok=True)
+    path = baseline_path(run['commit'], baselines_dir)
+    with open(path, 'w') as baseline_file:
+        json.dump(run, baseline_file, indent=2)
+    return path
+
+
+def load_baseline(commit=None, baselines_dir=BASELINES_DIR, exclude=None):
+    """Load the baseline of ``commit``, or the most recently created one other than ``exclude``; None if missing."""
+    if commit:
+        path = baseline_path(commit, baselines_dir)
+        if not os.path.exists(path):
+            return None
+        with open(path) as baseline_file:
+            return json.load(baseline_file)
+
+    if not os.path.isdir(baselines_dir):
+        return None
+    runs = []
+    for filename in os.listdir(baselines_dir):
+        if filename.endswith('.json') and filename != f"{exclude}.json":
+            with open(os.path.join(baselines_dir, filename)) as baseline_file:
+                runs.append(json.load(baseline_file))
+    return max(runs, key=lambda run: run['created'], default=None)
+
+
+def metric_medians(run):
+    """Flatten a run into {'handlers/perform_login': median seconds, ...}."""
+    medians = {}
+    for section in ('handlers', 'flows', 'models'):
+        for name, summary in run.get(section, {}).items():
+            if summary.get('p50') is not None:
+                medians[f"{section}/{name}"] = summary['p50']
+    return medians
+
+
+def find_regressions(current, baseline, threshold=0.2, min_delta_ms=20):
+    """Return one entry per metric that got slower than the baseline beyond the threshold and noise floor."""
+    regressions = []
+    baseline_medians = metric_medians(baseline)
+    for metric, median in sorted(metric_medians(current).items()):
+        previous = baseline_medians.get(metric)
+        if previous is None:
+            continue
+        delta = median - previous
+        if delta * 1000 > min_delta_ms and median > previous * (1 + threshold):
+            regressions.append({'metric': metric, 'baseline': previous, 'current': median,
+                                'change': delta / previous if previous else float('inf')})
+    return regressions
@@ -0,0 +1,214 @@
+"""
+Benchmarks of the modules/ handlers, the full perform_test flow and the execution models.
+
+Everything runs against the local stand-in server, so timings depend on the harness and the browsers
+rather than on the public demo site. The execution models do the same work (every Config.USERS user
+on every benchmarked browser):
+- sync: one page, users one after another, engines one after another
+- contexts: one browser per engine, USER_CONCURRENCY users at once in their own contexts
+- async: every user on every engine interleaved on one event loop
+- process: one spawned worker process per engine (even for a single engine), users one after another
+
+# python -m benchmarks.run_benchmarks
+# python -m benchmarks.run_benchmarks --rounds 5 --browsers chromium,firefox,webkit --save
+# python -m benchmarks.run_benchmarks --check --threshold 0.25        (exit code 1 on a regression)
+"""
+import argparse
+import importlib.metadata
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+
+from config.config import Config
+from modules.close_browser import handle_close_browser_context
+from modules.navigate_to_login_page import handle_navigate_to_login_page
+from modules.perform_login_with_config_data import handle_perform_login_with_config_data
+from modules.perform_logout import handle_perform_logout
+from modules.perform_logout_redirection_to_login import handle_perform_logout_redirection_to_login
+from utils.async_runner import run_async_matrix
+from utils.browser_pool import close_browser_pool, get_browser_pool
+from utils.engine_matrix import run_engine_matrix
+from utils.data_sources import config_users
+from utils.instrumentation import reset_step_records, step_records
+from utils.log_pipeline import setup_logging
+from utils.login_flow import perform_test, run_engine
+from utils.screenshot_service import get_screenshot_service
+from utils.stand_in_server import StandInServer
+from utils.stats import summarize
+from benchmarks.baselines import current_commit, find_regressions, load_baseline, save_baseline
+
+logger = logging.getLogger(__name__)
+
+MODELS = ('sync', 'contexts', 'async', 'process')
+
+SCREENSHOTS_DIR = os.path.join('screenshots', 'benchmarks')
+
+
+@contextmanager
+def overridden_setting(name: str, value):
+    """Override a Config setting, and its environment variable so spawned workers see it too."""
+    previous_value, previous_env = getattr(Config, name), os.environ.get(name)
+    setattr(Config, name, value)
+    os.environ[name] = ('1' if value else '0') if isinstance(value, bool) else str(value)
+    try:
+        yield
+    finally:
+        setattr(Config, name, previous_value)
+        if previous_env is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = previous_env
+
+
+def bench_handlers(browser_name: str, iterations: int, headless=True):
+    """Time every sync handler on one page, through the step instrumentation."""
+    reset_step_records()
+    user = Config.USERS[0]
+    browser = get_browser_pool().acquire(browser_name, headless=headless)
+    page = browser.new_context().new_page()
+    with overridden_setting('INSTRUMENT', True):
+        try:
+            for _ in range(iterations):
+                handle_navigate_to_login_page(page)
+                handle_perform_login_with_config_data(page, user['username'], user['password'])
+                handle_perform_logout(page)
+                handle_perform_logout_redirection_to_login(page, SCREENSHOTS_DIR, user['username'])
+        finally:
+            handle_close_browser_context(page)
+
+    walls = {}
+    for record in step_records():
+        walls.setdefault(record['step'], []).append(record['wall'])
+    reset_step_records()
+    return {step: summarize(values) for step, values in sorted(walls.items())}
+
+
+def bench_perform_test(browser_name: str, rounds: int, headless=True):
+    """Time the full perform_test flow (every Config.USERS user on one page)."""
+    browser = get_browser_pool().acquire(browser_name, headless=headless)
+    walls = []
+    for _ in range(rounds):
+        page = browser.new_context().new_page()
+        try:
+            start = time.perf_counter()
+            perform_test(page, SCREENSHOTS_DIR, config_users())
+            walls.append(time.perf_counter() - start)
+        finally:
+            handle_close_browser_context(page)
+    return summarize(walls)
+
+
+def run_model(model: str, browser_names, headless=True, concurrency=4):
+    """Run every user on every browser once with one execution model; returns the number of failed flows."""
+    if model == 'async':
+        results = run_async_matrix(browser_names, Config.USERS, headless=headless, max_concurrency=concurrency)
+    else:
+        user_concurrency = concurrency if model == 'contexts' else 1
+        workers = len(browser_names) if model == 'process' else 1
+        with overridden_setting('USER_CONCURRENCY', user_concurrency):
+            # The process model always goes through the spawned workers, also with a single engine
+            results = run_engine_matrix(run_engine, browser_names, headless=headless, workers=workers,
+                                        spawn=model == 'process')
+    return sum(1 for result in results if result['status'] != 'passed')
+
+
+def bench_models(models, browser_names, rounds: int, headless=True, concurrency=4):
+    summaries = {}
+    for model in models:
+        walls, failed = [], 0
+        for _ in range(rounds):
+            start = time.perf_counter()
+            failed += run_model(model, browser_names, headless=headless, concurrency=concurrency)
+            walls.append(time.perf_counter() - start)
+        summaries[model] = {**summarize(walls), 'failed': failed}
+    return summaries
+
+
+def run_benchmarks(browser_names, models=MODELS, rounds=3, iterations=10, headless=True, concurrency=4):
+    """Run every benchmark against a fresh stand-in server and return the run, ready to be saved as a baseline."""
+    faults = json.loads(Config.STAND_IN_FAULTS) if Config.STAND_IN_FAULTS else None
+    # Every Config.USERS user can log in on the stand-in, so all models take the same (successful) path
+    users = {user['username']: user['password'] for user in Config.USERS}
+    os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+
+    with StandInServer(users=users, faults=faults) as server:
+        Config.use_site(server.url)
+        try:
+            run = {
+                'version': 1,
+                'commit': current_commit(),
+                'created': time.time(),
+                'python': platform.python_version(),
+                'playwright': importlib.metadata.version('playwright'),
+                'browsers': list(browser_names),
+                'rounds': rounds,
+                'iterations': iterations,
+                'handlers': bench_handlers(browser_names[0], iterations, headless=headless),
+                'flows': {'perform_test': bench_perform_test(browser_names[0], rounds, headless=headless)},
+                'models': bench_models(models, browser_names, rounds, headless=headless, concurrency=concurrency),
+            }
+        finally:
+            close_browser_pool()
+            get_screenshot_service().flush()
+    return run
+
+
+def format_run(run):
+    lines = [f"Benchmarks of {run['commit']} on {', '.join(run['browsers'])} (median / p95):"]
+    for section in ('handlers', 'flows', 'models'):
+        for name, summary in run[section].items():
+            failed = f", {summary['failed']} failed flow(s)" if summary.get('failed') else ''
+            lines.append(f"  {section}/{name}: {summary['p50'] * 1000:.0f}ms / {summary['p95'] * 1000:.0f}ms"
+                         f"{failed}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the handlers and execution models on the stand-in.')
+    parser.add_argument('--browsers', default='chromium', help='comma separated engines; handlers use the first')
+    parser.add_argument('--models', default=','.join(MODELS))
+    parser.add_argument('--rounds', type=int, default=3, help='timed runs of the flow and of every model')
+    parser.add_argument('--iterations', type=int, default=10, help='timed calls of every handler')
+    parser.add_argument('--concurrency', type=int, default=4, help='users in flight for contexts and async')
+    parser.add_argument('--headed', action='store_true')
+    parser.add_argument('--save', action='store_true', help='store the run as the baseline of the current commit')
+    parser.add_argument('--check', action='store_true', help='fail when a metric regressed against a baseline')
+    parser.add_argument('--baseline', help='commit of the baseline to check against (default: the latest other)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown share, e.g. 0.2 for 20%%')
+    parser.add_argument('--min-delta-ms', type=float, default=20, help='slowdowns below this are noise')
+    args = parser.parse_args()
+    setup_logging()
+
+    models = [model for model in args.models.split(',') if model]
+    unknown = set(models) - set(MODELS)
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(sorted(unknown))}")
+
+    run = run_benchmarks(args.browsers.split(','), models, rounds=args.rounds, iterations=args.iterations,
+                         headless=not args.headed, concurrency=args.concurrency)
+    for line in format_run(run):
+        logger.info(line)
+    if args.save:
+        logger.info(f"Saved baseline {save_baseline(run)}")
+
+    if args.check:
+        baseline = load_baseline(args.baseline, exclude=run['commit'])
+        if baseline is None:
+            logger.warning("No baseline to check against; run with --save on the reference commit first")
+            return
+        regressions = find_regressions(run, baseline, args.threshold, args.min_delta_ms)
+        for regression in regressions:
+            logger.error(f"Regression in {regression['metric']}: {regression['baseline'] * 1000:.0f}ms -> "
+                         f"{regression['current'] * 1000:.0f}ms ({regression['change']:+.0%}) "
+                         f"against {baseline['commit']}")
+        if regressions:
+            sys.exit(1)
+        logger.info(f"No regression beyond {args.threshold:.0%} against {baseline['commit']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,163 @@
+import os
+
+
 class Config:
-    BASE_URL = 'https://opensource-demo.orangehrmlive.com/web/index.php/auth/login'
+    # Site under test; set SITE_URL (or STAND_IN=1 for the bundled local server) to test another instance
+    SITE_URL = os.environ.get('SITE_URL', 'https://opensource-demo.orangehrmlive.com')
+    BASE_URL = f'{SITE_URL}/web/index.php/auth/login'
+    DASHBOARD_URL = f'{SITE_URL}/web/index.php/dashboard/index'
+    LOGOUT_URL = f'{SITE_URL}/web/index.php/auth/logout'
+    VALIDATE_URL = f'{SITE_URL}/web/index.php/auth/validate'
+
+    # How helpers that only need a logged in session (storage state cache, authenticated_page) log in:
+    # 'api' posts the login form through the context's APIRequestContext, 'ui' drives the login page
+    LOGIN_STRATEGY = os.environ.get('LOGIN_STRATEGY', 'api')
 
     # List of users with their usernames and passwords
     USERS = [
         {'username': 'Admin', 'password': 'admin123'},
         {'username': 'User1', 'password': 'password1'},  # Add more users here
         # Add as many users as needed
-    ]
\ No newline at end of file
+    ]
+
+    # Users of the JSON data runners, and an optional file (.jsonl, .csv or .json) that replaces USERS
+    # for the config data runners; both are streamed row by row by utils/data_sources.py
+    LOGIN_DATA_FILE = os.environ.get('LOGIN_DATA_FILE', os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_data', 'json_login_data.json'))
+    USERS_FILE = os.environ.get('USERS_FILE', '')
+
+    # Upper bound in ms for condition based waits (menu item visible, URL change, response, error banner)
+    WAIT_TIMEOUT = int(os.environ.get('WAIT_TIMEOUT', '10000'))
+    # Upper bound in ms for the redirect back to the login page after logout
+    REDIRECT_TIMEOUT = int(os.environ.get('REDIRECT_TIMEOUT', '30000'))
+
+    # Where authenticated storage states are cached and how many seconds they stay valid
+    STORAGE_STATE_DIR = os.environ.get('STORAGE_STATE_DIR', '.auth')
+    STORAGE_STATE_TTL = int(os.environ.get('STORAGE_STATE_TTL', '1800'))
+
+    # Request routing profiles (see utils/network_policy.py); NETWORK_PROFILE picks the one the runners use
+    NETWORK_PROFILES = {
+        'none': {},
+        'lean': {
+            'block_resource_types': ['image', 'font', 'media'],
+        },
+        'strict': {
+            'block_resource_types': ['image', 'font', 'media'],
+            'block_third_party': True,
+            'stub_url_patterns': ['*google-analytics*', '*googletagmanager*'],
+        },
+    }
+    NETWORK_PROFILE = os.environ.get('NETWORK_PROFILE', 'none')
+    NETWORK_SIZES_FILE = os.environ.get('NETWORK_SIZES_FILE', '.network_sizes.json')
+
+    # Screenshot capture policy ('always', 'on_failure' or 'first_n'), image format and background writers
+    SCREENSHOT_POLICY = os.environ.get('SCREENSHOT_POLICY', 'always')
+    SCREENSHOT_FIRST_N = int(os.environ.get('SCREENSHOT_FIRST_N', '1'))
+    SCREENSHOT_TYPE = os.environ.get('SCREENSHOT_TYPE', 'png')  # 'png' or 'jpeg'
+    SCREENSHOT_QUALITY = int(os.environ.get('SCREENSHOT_QUALITY', '70'))  # jpeg only
+    SCREENSHOT_SCALE = os.environ.get('SCREENSHOT_SCALE', 'device')  # 'css' skips device pixel ratio upscaling
+    SCREENSHOT_WORKERS = int(os.environ.get('SCREENSHOT_WORKERS', '2'))
+
+    # Store screenshots once per unique image in a content-addressed store with a manifest (utils/artifact_store.py)
+    ARTIFACT_STORE = os.environ.get('ARTIFACT_STORE', '0') == '1'
+    ARTIFACT_STORE_DIR = os.environ.get('ARTIFACT_STORE_DIR', 'artifacts')
+
+    # Browsers to test and how many of them run at the same time (one worker process per browser)
+    BROWSER_NAMES = ['chromium', 'firefox', 'webkit']
+    ENGINE_WORKERS = int(os.environ.get('ENGINE_WORKERS', '3'))
+
+    # The login test matrix has one case per engine, headless mode, data source and user.
+    # HEADLESS_MODES is e.g. "true" (CI), "false" or "true,false"; MATRIX_SOURCES names sources of utils/login_flow.py
+    HEADLESS_MODES = os.environ.get('HEADLESS_MODES', os.environ.get('HEADLESS', 'true'))
+    MATRIX_SOURCES = os.environ.get('MATRIX_SOURCES', 'config,json')
+
+    # Per test case duration history, used by pytest --shard i/N to balance shards (utils/sharding.py)
+    DURATION_HISTORY_FILE = os.environ.get('DURATION_HISTORY_FILE', '.test_durations.json')
+
+    # Websocket endpoints of already running Playwright browser servers, e.g. "chromium=ws://127.0.0.1:3000/".
+    # Engines listed here are connected to instead of launched by the browser pool
+    BROWSER_WS_ENDPOINTS = os.environ.get('BROWSER_WS_ENDPOINTS', '')
+
+    # Hand every flow the engine's persistent context on PROFILE_DIR/<engine>-<mode> instead of a new context, so the
+    # HTTP disk cache stays warm between users and runs; cookies and storage are cleared per user (utils/browser_pool.py)
+    PERSISTENT_PROFILE = os.environ.get('PERSISTENT_PROFILE', '0') == '1'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'browser_profiles')
+
+    # Number of users driven at the same time, each in its own browser context of one browser.
+    # 1 keeps the one-user-after-another flow on a single page
+    USER_CONCURRENCY = int(os.environ.get('USER_CONCURRENCY', '1'))
+
+    # 'process' runs one worker process per browser, 'async' interleaves every user on every
+    # browser on a single asyncio event loop with at most ASYNC_CONCURRENCY flows in flight
+    EXECUTION_MODE = os.environ.get('EXECUTION_MODE', 'process')
+    ASYNC_CONCURRENCY = int(os.environ.get('ASYNC_CONCURRENCY', '12'))
+
+    # Start the async and context runners at CONCURRENCY_START flows and adjust the number every CONCURRENCY_WINDOW
+    # steps to the step latency, memory and load (utils/concurrency.py); ASYNC_CONCURRENCY / USER_CONCURRENCY and
+    # the machine (CONTEXT_MEMORY_MB per context) bound it
+    ADAPTIVE_CONCURRENCY = os.environ.get('ADAPTIVE_CONCURRENCY', '0') == '1'
+    CONCURRENCY_START = int(os.environ.get('CONCURRENCY_START', '2'))
+    CONCURRENCY_WINDOW = int(os.environ.get('CONCURRENCY_WINDOW', '8'))
+    CONCURRENCY_LATENCY_TOLERANCE = float(os.environ.get('CONCURRENCY_LATENCY_TOLERANCE', '0.5'))
+    CONCURRENCY_MIN_FREE_MB = float(os.environ.get('CONCURRENCY_MIN_FREE_MB', '512'))
+    CONCURRENCY_MAX_LOAD = float(os.environ.get('CONCURRENCY_MAX_LOAD', '1.5'))
+    CONTEXT_MEMORY_MB = float(os.environ.get('CONTEXT_MEMORY_MB', '150'))
+
+    # Run against the local stand-in server (utils/stand_in_server.py) instead of the public demo site.
+    # STAND_IN_FAULTS holds per route latency/error settings as JSON, e.g. '{"dashboard": {"latency_ms": 300}}'
+    USE_STAND_IN = os.environ.get('STAND_IN', '0') == '1'
+    STAND_IN_FAULTS = os.environ.get('STAND_IN_FAULTS', '')
+
+    # Record wall, Playwright and harness time of every modules/ handler call (utils/instrumentation.py)
+    # and write the per-step summary to INSTRUMENTATION_FILE at the end of the run
+    INSTRUMENT = os.environ.get('INSTRUMENT', '0') == '1'
+    INSTRUMENTATION_FILE = os.environ.get('INSTRUMENTATION_FILE', 'step_timings.json')
+
+    # Time and count the matches of every selector the handlers act on (utils/selector_profiler.py);
+    # selectors resolving slower than SLOW_SELECTOR_MS (median) are flagged in the report
+    PROFILE_SELECTORS = os.environ.get('PROFILE_SELECTORS', '0') == '1'
+    SLOW_SELECTOR_MS = float(os.environ.get('SLOW_SELECTOR_MS', '100'))
+
+    # Probe BASE_URL over plain HTTP before launching browsers (utils/health.py), and skip the remaining
+    # flows after CIRCUIT_BREAKER_THRESHOLD consecutive infrastructure failures (0 never skips)
+    HEALTH_CHECK = os.environ.get('HEALTH_CHECK', '1') == '1'
+    HEALTH_TIMEOUT = float(os.environ.get('HEALTH_TIMEOUT', '10'))
+    CIRCUIT_BREAKER_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_THRESHOLD', '3'))
+
+    # Report login matrix cases that passed with the same inputs within RESULT_CACHE_TTL hours as cached
+    # instead of running them again (utils/result_cache.py)
+    RESULT_CACHE = os.environ.get('RESULT_CACHE', '0') == '1'
+    RESULT_CACHE_FILE = os.environ.get('RESULT_CACHE_FILE', '.result_cache.json')
+    RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', '24'))
+
+    # Keep a ring buffer of the last FLIGHT_RECORDER_EVENTS browser events and a trace chunk per case, written
+    # to FLIGHT_RECORDER_DIR only when the case fails (utils/flight_recorder.py). FLIGHT_RECORDER_TRACE is off,
+    # actions or snapshots; FLIGHT_RECORDER_VIDEO=1 also records video and keeps it for failed contexts
+    FLIGHT_RECORDER = os.environ.get('FLIGHT_RECORDER', '0') == '1'
+    FLIGHT_RECORDER_EVENTS = int(os.environ.get('FLIGHT_RECORDER_EVENTS', '200'))
+    FLIGHT_RECORDER_TRACE = os.environ.get('FLIGHT_RECORDER_TRACE', 'actions')
+    FLIGHT_RECORDER_VIDEO = os.environ.get('FLIGHT_RECORDER_VIDEO', '0') == '1'
+    FLIGHT_RECORDER_DIR = os.environ.get('FLIGHT_RECORDER_DIR', 'flight_recordings')
+
+    # JSON log files, one per worker process, rotated at LOG_MAX_BYTES with LOG_BACKUPS old files
+    # (utils/log_pipeline.py)
+    LOG_DIR = os.environ.get('LOG_DIR', 'logs')
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_BACKUPS = int(os.environ.get('LOG_BACKUPS', '5'))
+
+    # Sample CPU% and RSS of the browser processes every RESOURCE_SAMPLE_INTERVAL seconds and report peak and
+    # average usage per engine and step, written to RESOURCE_FILE (utils/resource_sampler.py, needs psutil)
+    RESOURCE_SAMPLER = os.environ.get('RESOURCE_SAMPLER', '0') == '1'
+    RESOURCE_SAMPLE_INTERVAL = float(os.environ.get('RESOURCE_SAMPLE_INTERVAL', '0.5'))
+    RESOURCE_FILE = os.environ.get('RESOURCE_FILE', 'resource_usage.json')
+
+    @classmethod
+    def use_site(cls, site_url: str):
+        """Point every URL at another instance of the site; worker processes inherit it through SITE_URL."""
+        site_url = site_url.rstrip('/')
+        os.environ['SITE_URL'] = site_url
+        cls.SITE_URL = site_url
+        cls.BASE_URL = f'{site_url}/web/index.php/auth/login'
+        cls.DASHBOARD_URL = f'{site_url}/web/index.php/dashboard/index'
+        cls.LOGOUT_URL = f'{site_url}/web/index.php/auth/logout'
+        cls.VALIDATE_URL = f'{site_url}/web/index.php/auth/validate'
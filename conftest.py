@@ -1,19 +1,242 @@
+import json
+import time
+
 import pytest
-from playwright.sync_api import sync_playwright
 
-# Fixture to set up Playwright and browser context
+from config.config import Config
+from utils.browser_pool import close_browser_pool, format_pool_stats, get_browser_pool
+from utils.flight_recorder import close_flight_recorders
+from utils.health import CircuitOpenError, ensure_site_up, get_circuit_breaker
+from utils.log_pipeline import setup_logging, stop_logging
+from utils.instrumentation import build_summary, format_summary, write_summary
+from utils.network_policy import save_known_sizes
+from utils.resource_sampler import (ResourceSampler, format_summary as format_resource_summary,
+                                    write_summary as write_resource_summary)
+from utils.result_cache import ResultCache, case_key, changed_files, impacted_case_ids
+from utils.screenshot_service import close_screenshot_service
+from utils.selector_profiler import build_report, format_report, install_selector_hooks
+from utils.sharding import load_history, parse_shard, plan_shards, record_run, shard_history_path
+from utils.stand_in_server import StandInServer
+from utils.storage_state_cache import StorageStateCache
+from utils.wait_policy import format_wait_summary, log_wait_summary, wait_summary
+
+_browser_pool_stats = {}
+_stand_in_server = None
+_test_durations = {}
+_result_cache = None
+_case_keys = {}
+_cached_skips = set()
+_resource_sampler = None
+_resource_summary = {}
+
+def pytest_addoption(parser):
+    parser.addoption('--shard', default=None, metavar='i/N',
+                     help='run only shard i of N, balanced by the duration history')
+    parser.addoption('--impacted-by', default=None, metavar='REF',
+                     help='run only the login matrix cases using a modules/ file changed since the git REF')
+
+def pytest_configure(config):
+    # JSON log files per worker through a background queue; pytest keeps the console
+    setup_logging(console=False)
+    # STAND_IN=1 runs the whole suite against the local stand-in server instead of the demo site
+    global _stand_in_server
+    if Config.USE_STAND_IN and _stand_in_server is None:
+        faults = json.loads(Config.STAND_IN_FAULTS) if Config.STAND_IN_FAULTS else {}
+        _stand_in_server = StandInServer(faults=faults).start()
+        Config.use_site(_stand_in_server.url)
+    if Config.PROFILE_SELECTORS:
+        install_selector_hooks()
+    # Sample the browsers the pool launches from here on
+    global _resource_sampler
+    if Config.RESOURCE_SAMPLER and _resource_sampler is None:
+        try:
+            _resource_sampler = ResourceSampler().start()
+        except RuntimeError as e:
+            raise pytest.UsageError(str(e))
+
+def _login_case(item):
+    callspec = getattr(item, 'callspec', None)
+    return callspec.params.get('login_case') if callspec else None
+
+def _select_impacted(config, items):
+    # Drop the matrix cases whose handlers did not change; other tests always run
+    ref = config.getoption('--impacted-by')
+    if not ref:
+        return
+    cases = [_login_case(item) for item in items if _login_case(item) is not None]
+    impacted = impacted_case_ids(cases, changed_files(ref))
+    if impacted is None:
+        return
+    deselected = [item for item in items if _login_case(item) is not None and _login_case(item).id not in impacted]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item not in deselected]
+
+def pytest_collection_modifyitems(config, items):
+    _select_impacted(config, items)
+    global _result_cache
+    if Config.RESULT_CACHE:
+        _result_cache = ResultCache()
+        _case_keys.update({item.nodeid: case_key(_login_case(item)) for item in items if _login_case(item)})
+
+    # Every agent plans the same shards from the same collection and history, then keeps its own
+    shard = config.getoption('--shard')
+    if not shard:
+        return
+    try:
+        index, count = parse_shard(shard)
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+    shards = plan_shards([item.nodeid for item in items], load_history(), count)
+    selected_ids = set(shards[index - 1]['nodeids'])
+    selected = [item for item in items if item.nodeid in selected_ids]
+    deselected = [item for item in items if item.nodeid not in selected_ids]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+
+def _uses_site(item):
+    # Tests that drive the configured site (the demo site, or the session wide stand-in with STAND_IN=1)
+    fixtures = set(getattr(item, 'fixturenames', ()))
+    return bool(fixtures & {'case_page', 'authenticated_page'}) and 'stand_in_site' not in fixtures
+
+def pytest_runtest_setup(item):
+    key = _case_keys.get(item.nodeid)
+    if key is not None:
+        passed_at = _result_cache.passed_at(key)
+        if passed_at is not None:
+            passed = time.strftime('%Y-%m-%d %H:%M', time.localtime(passed_at))
+            _cached_skips.add(item.nodeid)
+            pytest.skip(f"cached: passed with the same inputs at {passed}")
+    # Runs before the fixtures, so no browser is launched for a site that is down
+    if _uses_site(item):
+        breaker = get_circuit_breaker()
+        try:
+            breaker.check()
+        except CircuitOpenError as e:
+            breaker.record(e)
+            pytest.skip(str(e))
+        ensure_site_up()
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    key = _case_keys.get(item.nodeid)
+    if key is not None and report.when == 'call':
+        if report.passed:
+            _result_cache.store(key, item.nodeid)
+        else:
+            _result_cache.invalidate(key)
+    if not _uses_site(item) or report.skipped:
+        return
+    if report.failed:
+        get_circuit_breaker().record(call.excinfo.value)
+    elif report.when == 'call':
+        get_circuit_breaker().record()
+
+def pytest_runtest_logreport(report):
+    # A case reported from the result cache did not run; its ~0s would mislead the shard planning
+    if report.nodeid in _cached_skips:
+        return
+    # Setup, call and teardown together make up the duration of a test case
+    _test_durations[report.nodeid] = _test_durations.get(report.nodeid, 0.0) + report.duration
+
+# Fixture to get the warm chromium browser from the shared browser pool
 @pytest.fixture(scope="session")
 def browser():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)  # Set headless=True for headless mode
-        yield browser
-        browser.close()
+    return get_browser_pool().acquire('chromium', headless=True)  # Set headless=True for headless mode
 
 @pytest.fixture(scope="function")
 def page(browser):
-    context = browser.new_context()
+    context = get_browser_pool().new_context('chromium', headless=True)
     page = context.new_page()
     yield page
+    get_browser_pool().release_context(context)
+
+# Cache of logged in sessions shared by the whole run
+@pytest.fixture(scope="session")
+def storage_state_cache():
+    return StorageStateCache()
+
+@pytest.fixture(scope="function")
+def authenticated_page(browser, storage_state_cache, request):
+    """
+    A page that is already logged in and on the dashboard.
+    Logs in as the first Config.USERS entry, or as the user given through indirect parametrization.
+    """
+    user = getattr(request, 'param', Config.USERS[0])
+    context, page = storage_state_cache.new_context(browser, user['username'], user['password'])
+    yield page
     context.close()
 
+# The local stand-in site for one test module; reuses the session wide server when STAND_IN=1
+@pytest.fixture(scope="module")
+def stand_in_site():
+    if _stand_in_server is not None:
+        yield _stand_in_server
+        return
+    previous_site_url = Config.SITE_URL
+    with StandInServer() as server:
+        Config.use_site(server.url)
+        try:
+            yield server
+        finally:
+            Config.use_site(previous_site_url)
+
+def pytest_sessionfinish(session, exitstatus):
+    # Close the pooled browsers once every test module is done with them
+    _browser_pool_stats.update(close_browser_pool())
+    if _resource_sampler is not None:
+        _resource_sampler.stop()
+        _resource_summary.update(_resource_sampler.summary())
+        write_resource_summary(_resource_summary)
+    close_screenshot_service()
+    close_flight_recorders()
+    save_known_sizes()
+    if _test_durations:
+        shard = session.config.getoption('--shard')
+        record_run(_test_durations, output_path=shard_history_path(*parse_shard(shard)) if shard else None)
+    if _result_cache is not None:
+        _result_cache.save()
+    if Config.INSTRUMENT:
+        write_summary()
+    if _stand_in_server is not None:
+        _stand_in_server.stop()
+    # The waits that replaced the fixed sleeps, in the log files too
+    log_wait_summary()
+    stop_logging()
+
+def pytest_terminal_summary(terminalreporter):
+    if _result_cache is not None:
+        terminalreporter.section(f"result cache ({Config.RESULT_CACHE_FILE})")
+        terminalreporter.write_line(f"{_result_cache.stats['hits']} case(s) reported from the cache, "
+                                    f"{_result_cache.stats['stored']} pass(es) stored")
+    breaker = get_circuit_breaker()
+    if breaker.stats['infrastructure']:
+        terminalreporter.section("site health")
+        terminalreporter.write_line(breaker.format_stats())
+        terminalreporter.write_line(f"Last infrastructure failure: {breaker.last_error}")
+    if _browser_pool_stats:
+        terminalreporter.section("browser pool")
+        for line in format_pool_stats(_browser_pool_stats):
+            terminalreporter.write_line(line)
+    if Config.INSTRUMENT:
+        terminalreporter.section(f"step timings ({Config.INSTRUMENTATION_FILE})")
+        for line in format_summary(build_summary()):
+            terminalreporter.write_line(line)
+    if _resource_summary.get('by_engine'):
+        terminalreporter.section(f"browser resources ({Config.RESOURCE_FILE})")
+        for line in format_resource_summary(_resource_summary):
+            terminalreporter.write_line(line)
+    waits = wait_summary()
+    if waits:
+        terminalreporter.section("waits")
+        for line in format_wait_summary(waits):
+            terminalreporter.write_line(line)
+    if Config.PROFILE_SELECTORS:
+        terminalreporter.section(f"selectors (slow above {Config.SLOW_SELECTOR_MS:.0f}ms median)")
+        for line in format_report(build_report()):
+            terminalreporter.write_line(line)
+
 # Optional: You can add more fixtures or configuration here if needed
@@ -1,4 +1,20 @@
+from utils.browser_pool import get_browser_pool
+from utils.instrumentation import timed_step
+
+
 def handle_close_browser(playwright, browser):
     """Ensure the browser and Playwright are properly closed."""
     browser.close()
-    playwright.stop()
\ No newline at end of file
+    playwright.stop()
+
+
+async def handle_close_browser_async(playwright, browser):
+    """Async version of handle_close_browser."""
+    await browser.close()
+    await playwright.stop()
+
+
+@timed_step('close_browser_context')
+def handle_close_browser_context(page):
+    """Close the context of the page; the browser (or persistent context) itself stays open in the browser pool."""
+    get_browser_pool().release_context(page.context)
@@ -1,15 +1,17 @@
+from config.config import Config
 from playwright.sync_api import Page
+from modules.selectors import LOGIN_BUTTON, PASSWORD_INPUT, USERNAME_INPUT
 
 
 class LoginPage:
     def __init__(self, page: Page):
         self.page = page
-        self.username_input = page.locator('input[name="username"]')
-        self.password_input = page.locator('input[name="password"]')
-        self.login_button = page.locator('button[type="submit"]')
+        self.username_input = page.locator(USERNAME_INPUT)
+        self.password_input = page.locator(PASSWORD_INPUT)
+        self.login_button = page.locator(LOGIN_BUTTON)
 
     def goto(self):
-        self.page.goto('https://opensource-demo.orangehrmlive.com/web/index.php/auth/login')
+        self.page.goto(Config.BASE_URL)
 
     def login(self, username: str, password: str):
         self.username_input.fill(username)
@@ -1,8 +1,20 @@
+from config.config import Config
 from playwright.sync_api import Page, Playwright
+from playwright.async_api import Page as AsyncPage
+from modules.selectors import USERNAME_INPUT
+from utils.instrumentation import timed_step
 
 
+@timed_step('navigate_to_login_page')
 def handle_navigate_to_login_page(page: Page):
     """ Navigate to the login page and ensure it's fully loaded. """
-    page.goto("https://opensource-demo.orangehrmlive.com/web/index.php/auth/login")
+    page.goto(Config.BASE_URL)
     # page.goto('https://opensource-demo.orangehrmlive.com/auth/login')
-    page.wait_for_selector('input[name="username"]', timeout=10000)
\ No newline at end of file
+    page.wait_for_selector(USERNAME_INPUT, timeout=10000)
+
+
+@timed_step('navigate_to_login_page')
+async def handle_navigate_to_login_page_async(page: AsyncPage):
+    """ Async version of handle_navigate_to_login_page for flows running on an event loop. """
+    await page.goto(Config.BASE_URL)
+    await page.wait_for_selector(USERNAME_INPUT, timeout=10000)
@@ -0,0 +1,90 @@
+import html
+import json
+import re
+
+from config.config import Config
+from playwright.sync_api import Page
+from playwright.async_api import Page as AsyncPage
+from modules.navigate_to_login_page import handle_navigate_to_login_page, handle_navigate_to_login_page_async
+from modules.perform_login_with_config_data import (handle_perform_login_with_config_data,
+                                                    handle_perform_login_with_config_data_async)
+from utils.instrumentation import timed_step
+
+LOGIN_STRATEGIES = ('ui', 'api')
+
+# The demo site passes the CSRF token to its login component as :token="&quot;...&quot;",
+# a plain form (like the stand-in server) as a hidden _token input
+_COMPONENT_TOKEN = re.compile(r':token="([^"]*)"')
+_HIDDEN_INPUT = re.compile(r'<input[^>]*\bname="_token"[^>]*>')
+_VALUE = re.compile(r'\bvalue="([^"]*)"')
+
+
+def parse_login_token(login_page_html: str):
+    """Return the CSRF token of the login form."""
+    match = _COMPONENT_TOKEN.search(login_page_html)
+    if match:
+        return json.loads(html.unescape(match.group(1)))
+    hidden_input = _HIDDEN_INPUT.search(login_page_html)
+    value = _VALUE.search(hidden_input.group(0)) if hidden_input else None
+    if value is None:
+        raise RuntimeError("Login token not found on the login page")
+    return html.unescape(value.group(1))
+
+
+def _check_logged_in(response, username: str):
+    if not response.ok or response.url != Config.DASHBOARD_URL:
+        raise RuntimeError(f"API login failed for user {username} (HTTP {response.status} at {response.url})")
+
+
+@timed_step('perform_login_via_api')
+def handle_perform_login_via_api(page: Page, username: str, password: str, open_dashboard=True):
+    """
+    Log in with HTTP requests only: fetch the login form token and post the credentials.
+    The page's context shares cookies with its APIRequestContext, so the session lands in the browser context.
+    """
+    request = page.context.request
+    token = parse_login_token(request.get(Config.BASE_URL).text())
+    response = request.post(Config.VALIDATE_URL,
+                            form={'_token': token, 'username': username, 'password': password})
+    _check_logged_in(response, username)
+    if open_dashboard:
+        page.goto(Config.DASHBOARD_URL)
+
+
+@timed_step('perform_login_via_api')
+async def handle_perform_login_via_api_async(page: AsyncPage, username: str, password: str, open_dashboard=True):
+    """Async version of handle_perform_login_via_api."""
+    request = page.context.request
+    token = parse_login_token(await (await request.get(Config.BASE_URL)).text())
+    response = await request.post(Config.VALIDATE_URL,
+                                  form={'_token': token, 'username': username, 'password': password})
+    _check_logged_in(response, username)
+    if open_dashboard:
+        await page.goto(Config.DASHBOARD_URL)
+
+
+def handle_perform_login(page: Page, username: str, password: str, strategy=None):
+    """
+    Log in with the given strategy ('ui' or 'api', default Config.LOGIN_STRATEGY) and end on the dashboard.
+    Only tests that verify the login page itself need 'ui'.
+    """
+    strategy = strategy or Config.LOGIN_STRATEGY
+    if strategy == 'api':
+        handle_perform_login_via_api(page, username, password)
+    elif strategy == 'ui':
+        handle_navigate_to_login_page(page)
+        handle_perform_login_with_config_data(page, username, password)
+    else:
+        raise ValueError(f"Unknown login strategy: {strategy}, use one of {', '.join(LOGIN_STRATEGIES)}")
+
+
+async def handle_perform_login_async(page: AsyncPage, username: str, password: str, strategy=None):
+    """Async version of handle_perform_login."""
+    strategy = strategy or Config.LOGIN_STRATEGY
+    if strategy == 'api':
+        await handle_perform_login_via_api_async(page, username, password)
+    elif strategy == 'ui':
+        await handle_navigate_to_login_page_async(page)
+        await handle_perform_login_with_config_data_async(page, username, password)
+    else:
+        raise ValueError(f"Unknown login strategy: {strategy}, use one of {', '.join(LOGIN_STRATEGIES)}")
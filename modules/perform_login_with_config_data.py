@@ -1,16 +1,31 @@
 from config.config import Config
 from playwright.sync_api import Page
+from playwright.async_api import Page as AsyncPage
+from modules.selectors import LOGIN_BUTTON, PASSWORD_INPUT, USERNAME_INPUT
+from utils.instrumentation import timed_step
 
 
+@timed_step('perform_login')
 def handle_perform_login_with_config_data(page: Page, username: str, password: str):
     """
     Perform the login action on the web page.
     """
-    page.fill('input[name="username"]', username)
-    page.fill('input[name="password"]', password)
-    page.click('button[type="submit"]')
+    page.fill(USERNAME_INPUT, username)
+    page.fill(PASSWORD_INPUT, password)
+    page.click(LOGIN_BUTTON)
 
     # Wait until the URL indicates the dashboard and the network is idle
     # page.wait_for_url('https://opensource-demo.orangehrmlive.com/web/index.php/dashboard/index', timeout=30000)
     # page.wait_for_url('https://opensource-demo.orangehrmlive.com/dashboard/index', timeout=30000)
     page.wait_for_load_state('networkidle')
+
+
+@timed_step('perform_login')
+async def handle_perform_login_with_config_data_async(page: AsyncPage, username: str, password: str):
+    """
+    Async version of handle_perform_login_with_config_data.
+    """
+    await page.fill(USERNAME_INPUT, username)
+    await page.fill(PASSWORD_INPUT, password)
+    await page.click(LOGIN_BUTTON)
+    await page.wait_for_load_state('networkidle')
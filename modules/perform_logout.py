@@ -1,37 +1,54 @@
-import os
+import logging
 
-from playwright.sync_api import Page
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Page as AsyncPage
 
+from modules.selectors import LOGOUT_MENU_ITEM, USER_DROPDOWN
+from utils.instrumentation import timed_step
+from utils.screenshot_service import get_screenshot_service
+from utils.wait_policy import expect_response, expect_response_async, wait_for_visible, wait_for_visible_async
 
+logger = logging.getLogger(__name__)
+
+
+@timed_step('perform_logout')
 def handle_perform_logout(page: Page):
     """ Perform the logout action on the web page."""
     try:
         print("Attempting to find and click on user dropdown...")
 
-        # Locate the user dropdown-----page.locator('span i')
-        """
-            Locate the user dropdown element by capturing all dropdowns and selecting the right one.
-            If there are multiple dropdowns, capture all and then select the one you need based on additional criteria like visibility or position
-            selector can be used when the exact text or attributes of the element are not known or are changing dynamically.
-            CSS Selector Breakdown
-            span: This targets all <span> elements on the page.
-            i: This targets all <i> elements that are children of the <span> elements.
-        """
-        user_dropdown = page.locator('span i')
-        if user_dropdown.is_visible():
-            user_dropdown.wait_for(state='visible', timeout=10000)
-            user_dropdown.click()
-            print("User dropdown clicked.")
-
-            page.wait_for_timeout(10000)
-            # Click the 'Logout' button
-            page.get_by_role('menuitem', name='Logout').click()
-            page.wait_for_load_state('networkidle')
-
-        else:
-            raise Exception("User dropdown not found.")
-
-    except TimeoutError:
+        # wait_for_visible raises a TimeoutError when the dropdown never shows up
+        user_dropdown = page.locator(USER_DROPDOWN)
+        wait_for_visible(user_dropdown, 'user dropdown')
+        user_dropdown.click()
+        print("User dropdown clicked.")
+
+        # Wait for the menu to open, then click the 'Logout' button
+        logout_item = page.locator(LOGOUT_MENU_ITEM)
+        wait_for_visible(logout_item, 'logout menu item')
+        with expect_response(page, '**/auth/logout', 'logout response'):
+            logout_item.click()
+
+    except PlaywrightTimeoutError:
         print("TimeoutError: The element could not be found or interacted with in time.")
-        page.screenshot(path=os.path.join('screenshots', 'logout_timeout_error.png'))
+        get_screenshot_service().capture(page, 'screenshots', 'logout_timeout_error.png', failure=True)
+        raise
+
+
+@timed_step('perform_logout')
+async def handle_perform_logout_async(page: AsyncPage):
+    """ Async version of handle_perform_logout. """
+    try:
+        user_dropdown = page.locator(USER_DROPDOWN)
+        await wait_for_visible_async(user_dropdown, 'user dropdown')
+        await user_dropdown.click()
+
+        logout_item = page.locator(LOGOUT_MENU_ITEM)
+        await wait_for_visible_async(logout_item, 'logout menu item')
+        async with expect_response_async(page, '**/auth/logout', 'logout response'):
+            await logout_item.click()
+
+    except PlaywrightTimeoutError:
+        logger.error("TimeoutError: The element could not be found or interacted with in time.")
+        await get_screenshot_service().capture_async(page, 'screenshots', 'logout_timeout_error.png', failure=True)
         raise
@@ -1,18 +1,41 @@
-import os
+import logging
 
 from playwright.sync_api import Page
+from playwright.async_api import Page as AsyncPage
 
+from config.config import Config
+from utils.instrumentation import timed_step
+from utils.screenshot_service import get_screenshot_service
+from utils.wait_policy import wait_for_url, wait_for_url_async
 
-def handle_perform_logout_redirection_to_login(page: Page, screenshots_dir: str):
-    page.wait_for_url('https://opensource-demo.orangehrmlive.com/web/index.php/auth/login', timeout=30000)
+logger = logging.getLogger(__name__)
+
+
+@timed_step('perform_logout_redirection_to_login')
+def handle_perform_logout_redirection_to_login(page: Page, screenshots_dir: str, username: str = None, group=None):
+    """Wait for the login page after logout; ``username`` and ``group`` are what the screenshot policy counts."""
+    wait_for_url(page, Config.BASE_URL, 'login page after logout', timeout=Config.REDIRECT_TIMEOUT)
     # page.wait_for_url('https://opensource-demo.orangehrmlive.com/auth/login', timeout=30000)
     try:
-        page.screenshot(path=os.path.join(screenshots_dir, "after_logout.png"))
+        get_screenshot_service().capture(page, screenshots_dir, "after_logout.png", user=username, group=group)
     except TimeoutError:
         print("Timeout waiting for redirect to the login page.")
         print("Current URL:", page.url)
         # Take screenshot in case of error
-        page.screenshot(path=os.path.join(screenshots_dir, "error.png"))
+        get_screenshot_service().capture(page, screenshots_dir, "error.png", failure=True)
+
+
+@timed_step('perform_logout_redirection_to_login')
+async def handle_perform_logout_redirection_to_login_async(page: AsyncPage, screenshots_dir: str, username: str = None,
+                                                           group=None):
+    """Async version of handle_perform_logout_redirection_to_login."""
+    await wait_for_url_async(page, Config.BASE_URL, 'login page after logout', timeout=Config.REDIRECT_TIMEOUT)
+    try:
+        await get_screenshot_service().capture_async(page, screenshots_dir, "after_logout.png", user=username,
+                                                     group=group)
+    except TimeoutError:
+        logger.error(f"Timeout waiting for redirect to the login page. Current URL: {page.url}")
+        await get_screenshot_service().capture_async(page, screenshots_dir, "error.png", failure=True)
 
 
 """
@@ -0,0 +1,17 @@
+"""
+Selectors of the OrangeHRM pages, shared by LoginPage, the handlers and the selector profiler.
+
+Keep them as narrow as the page allows: a selector that matches several elements makes Playwright
+scan and disambiguate on every action (see python -m utils.selector_profiler).
+"""
+
+# Login page
+USERNAME_INPUT = 'input[name="username"]'
+PASSWORD_INPUT = 'input[name="password"]'
+LOGIN_BUTTON = 'button[type="submit"]'
+ERROR_BANNER = "text='Invalid credentials'"
+
+# Dashboard header; the old 'span i' matched every icon inside any span of the page
+USER_DROPDOWN = 'span.oxd-userdropdown-tab'
+LOGOUT_MENU_ITEM = 'role=menuitem[name="Logout"]'
+
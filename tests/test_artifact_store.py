@@ -0,0 +1,65 @@
+"""
+Checks of the content-addressed artifact store: identical captures are stored once and the manifest
+still maps every (engine, user, step) to its blob.
+"""
+# pytest tests/test_artifact_store.py
+
+import os
+import tarfile
+
+from utils.artifact_store import ArtifactStore, latest_run, load_manifest, pack
+
+
+def test_identical_captures_are_stored_once(tmp_path):
+    """Two users with the same login page screenshot share one blob."""
+    store = ArtifactStore(str(tmp_path))
+    first = store.put(b'login page', 'chromium', 'admin', 'before_login')
+    second = store.put(b'login page', 'chromium', 'User1', 'before_login')
+    third = store.put(b'dashboard', 'chromium', 'admin', 'after_login')
+    store.save_manifest()
+
+    assert first == second != third
+    assert store.stats['new_blobs'] == 2
+    assert store.stats['bytes_deduplicated'] == len(b'login page')
+
+    manifest = load_manifest(str(tmp_path))
+    assert len(manifest['blobs']) == 2
+    assert ['chromium', 'User1', 'before_login', first] in manifest['entries']
+
+
+def test_manifests_of_several_processes_are_merged_and_packed(tmp_path):
+    """Each store writes its own manifest; pack merges them into one archive."""
+    chromium_store = ArtifactStore(str(tmp_path))
+    chromium_store.put(b'login page', 'chromium', 'admin', 'before_login')
+    chromium_store.save_manifest()
+    firefox_store = ArtifactStore(str(tmp_path))
+    firefox_store.manifest_path = os.path.join(str(tmp_path), 'manifests', 'firefox.json')
+    firefox_store.put(b'login page', 'firefox', 'admin', 'before_login')
+    firefox_store.save_manifest()
+
+    archive_path = pack(str(tmp_path), str(tmp_path / 'run.tar.gz'))
+
+    with tarfile.open(archive_path) as archive:
+        names = archive.getnames()
+    assert 'manifest.json' in names
+    assert len([name for name in names if name.startswith('blobs/')]) == 1
+    assert len(load_manifest(str(tmp_path))['entries']) == 2
+
+
+def test_pack_keeps_the_artifacts_of_one_run(tmp_path, monkeypatch):
+    """A store kept between builds packs only the screenshots of the requested run."""
+    monkeypatch.setenv('LOG_RUN_ID', 'build-1')
+    earlier_store = ArtifactStore(str(tmp_path))
+    earlier_store.manifest_path = os.path.join(str(tmp_path), 'manifests', 'build-1.json')
+    earlier_store.put(b'old dashboard', 'chromium', 'admin', 'after_login')
+    earlier_store.save_manifest()
+    monkeypatch.setenv('LOG_RUN_ID', 'build-2')
+    store = ArtifactStore(str(tmp_path))
+    store.put(b'login page', 'chromium', 'admin', 'before_login')
+    store.save_manifest()
+
+    assert latest_run(str(tmp_path)) == 'build-2'
+    archive_path = pack(str(tmp_path), str(tmp_path / 'run.tar.gz'), run='build-2')
+    with tarfile.open(archive_path) as archive:
+        assert len([name for name in archive.getnames() if name.startswith('blobs/')]) == 1
+    assert [entry[2] for entry in load_manifest(str(tmp_path), run='build-2')['entries']] == ['before_login']
@@ -0,0 +1,95 @@
+"""
+Checks of the async flow engine with fake engines and flows: the concurrency bound, a failing flow
+reported without cancelling the others, and an engine that fails to launch.
+"""
+# pytest tests/test_async_runner.py
+
+import asyncio
+import types
+
+import pytest
+
+from config.config import Config
+from utils import async_runner
+from utils.async_runner import iter_flows, run_flows
+from utils.concurrency import run_coroutine
+
+USERS = [{'username': f"user{number}", 'password': 'secret'} for number in range(1, 7)]
+
+
+class FakeBrowser:
+    async def close(self):
+        pass
+
+
+class FakeBrowserType:
+    def __init__(self, name, failing):
+        self.name = name
+        self.failing = failing
+        self.launches = 0
+
+    async def launch(self, headless=True):
+        self.launches += 1
+        if self.name in self.failing:
+            raise RuntimeError(f"Executable doesn't exist for {self.name}")
+        return FakeBrowser()
+
+
+def fake_async_playwright(failing=()):
+    playwright = types.SimpleNamespace(**{name: FakeBrowserType(name, failing)
+                                          for name in ('chromium', 'firefox', 'webkit')})
+
+    class Manager:
+        async def __aenter__(self):
+            return playwright
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    return playwright, Manager
+
+
+@pytest.fixture(autouse=True)
+def fake_flows(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'ADAPTIVE_CONCURRENCY', False)
+    monkeypatch.setattr(Config, 'CIRCUIT_BREAKER_THRESHOLD', 0)
+    monkeypatch.chdir(tmp_path)
+    state = {'in_flight': 0, 'peak': 0}
+
+    async def run_user_in_context(browser, index, user, screenshots_dir, breaker=None):
+        state['in_flight'] += 1
+        state['peak'] = max(state['peak'], state['in_flight'])
+        await asyncio.sleep(0.01)
+        state['in_flight'] -= 1
+        failed = user['username'] == 'user2'
+        return {'index': index, 'username': user['username'], 'status': 'failed' if failed else 'passed',
+                'error': 'AssertionError: Expected error message not found.' if failed else None}
+
+    monkeypatch.setattr(async_runner, 'run_user_in_context', run_user_in_context)
+    return state
+
+
+def test_flows_stay_within_the_concurrency_bound(fake_flows, monkeypatch):
+    playwright, manager = fake_async_playwright()
+    monkeypatch.setattr(async_runner, 'async_playwright', manager)
+    results = run_coroutine(run_flows(iter_flows(['chromium', 'firefox'], USERS), max_concurrency=3))
+
+    assert fake_flows['peak'] == 3
+    assert len(results) == 12
+    assert playwright.chromium.launches == playwright.firefox.launches == 1
+    # The failing flow is reported and every other flow still ran
+    assert [(result['username'], result['browser_name']) for result in results
+            if result['status'] == 'failed'] == [('user2', 'chromium'), ('user2', 'firefox')]
+
+
+def test_an_engine_that_fails_to_launch_fails_only_its_flows(fake_flows, monkeypatch):
+    playwright, manager = fake_async_playwright(failing=('webkit',))
+    monkeypatch.setattr(async_runner, 'async_playwright', manager)
+    results = run_coroutine(run_flows(iter_flows(['chromium', 'webkit'], USERS[:3]), max_concurrency=2))
+
+    webkit = [result for result in results if result['browser_name'] == 'webkit']
+    assert [result['status'] for result in webkit] == ['failed'] * 3
+    assert webkit[0]['error'] == "RuntimeError: Executable doesn't exist for webkit"
+    assert playwright.webkit.launches == 1
+    assert [result['status'] for result in results if result['browser_name'] == 'chromium'] == [
+        'passed', 'failed', 'passed']
@@ -0,0 +1,38 @@
+"""
+Checks of the benchmark baselines: runs are stored per commit and slowdowns beyond the threshold are reported.
+"""
+# pytest tests/test_benchmark_baselines.py
+
+import pytest
+
+from benchmarks.baselines import find_regressions, load_baseline, save_baseline
+
+
+def make_run(commit, created, navigate_p50, login_p50):
+    return {
+        'commit': commit,
+        'created': created,
+        'handlers': {'navigate_to_login_page': {'p50': navigate_p50}, 'perform_login': {'p50': login_p50}},
+        'models': {'async': {'p50': 2.0}},
+    }
+
+
+def test_only_slowdowns_beyond_threshold_and_noise_floor_regress():
+    baseline = make_run('aaa1111', 1, navigate_p50=0.100, login_p50=0.010)
+    # navigate +50% (50ms) regresses; login +100% is only 10ms and stays under the noise floor
+    current = make_run('bbb2222', 2, navigate_p50=0.150, login_p50=0.020)
+
+    regressions = find_regressions(current, baseline, threshold=0.2, min_delta_ms=20)
+
+    assert [regression['metric'] for regression in regressions] == ['handlers/navigate_to_login_page']
+    assert regressions[0]['change'] == pytest.approx(0.5)
+
+
+def test_latest_other_baseline_is_loaded(tmp_path):
+    save_baseline(make_run('aaa1111', 1, 0.1, 0.1), str(tmp_path))
+    save_baseline(make_run('bbb2222', 2, 0.1, 0.1), str(tmp_path))
+    save_baseline(make_run('ccc3333', 3, 0.1, 0.1), str(tmp_path))
+
+    assert load_baseline(baselines_dir=str(tmp_path), exclude='ccc3333')['commit'] == 'bbb2222'
+    assert load_baseline('aaa1111', baselines_dir=str(tmp_path))['commit'] == 'aaa1111'
+    assert load_baseline('missing', baselines_dir=str(tmp_path)) is None
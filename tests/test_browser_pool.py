@@ -0,0 +1,119 @@
+"""
+Checks of the browser pool with fake browser types (hits, misses, reconnects, websocket endpoints and
+merged stats), and that the async runners still work in a process whose pool already runs sync Playwright.
+"""
+# pytest tests/test_browser_pool.py
+
+import asyncio
+
+import pytest
+
+from config.config import Config
+from utils.async_runner import run_async_matrix
+from utils.browser_pool import BrowserPool, parse_ws_endpoints
+from utils.concurrency import run_coroutine
+from utils.instrumentation import current_labels, step_labels
+
+
+class FakeBrowser:
+    def __init__(self, how):
+        self.how = how
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+
+class FakeBrowserType:
+    def __init__(self):
+        self.calls = []
+
+    def launch(self, headless=True):
+        self.calls.append(('launch', headless))
+        return FakeBrowser('launch')
+
+    def connect(self, ws_endpoint):
+        self.calls.append(('connect', ws_endpoint))
+        return FakeBrowser('connect')
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = BrowserPool(ws_endpoints={'firefox': 'ws://127.0.0.1:3000/'})
+    browser_type = FakeBrowserType()
+    monkeypatch.setattr(pool, '_browser_type', lambda browser_name: browser_type)
+    pool.browser_type = browser_type
+    return pool
+
+
+def test_browsers_are_launched_once_per_engine_and_mode(fake_pool):
+    browser = fake_pool.acquire('chromium')
+    assert fake_pool.acquire('chromium') is browser
+    assert fake_pool.acquire('chromium', headless=False) is not browser
+
+    assert fake_pool.browser_type.calls == [('launch', True), ('launch', False)]
+    assert (fake_pool.stats['chromium/headless']['hits'], fake_pool.stats['chromium/headless']['misses']) == (1, 1)
+    with pytest.raises(ValueError, match='Unsupported browser'):
+        fake_pool.acquire('edge')
+
+
+def test_a_disconnected_browser_is_launched_again(fake_pool):
+    browser = fake_pool.acquire('webkit')
+    browser.connected = False
+    assert fake_pool.acquire('webkit') is not browser
+    assert fake_pool.stats['webkit/headless']['misses'] == 2
+
+
+def test_engines_with_an_endpoint_are_connected(fake_pool):
+    assert fake_pool.acquire('firefox').how == 'connect'
+    assert fake_pool.browser_type.calls == [('connect', 'ws://127.0.0.1:3000/')]
+
+
+def test_ws_endpoints_are_parsed():
+    assert parse_ws_endpoints(' chromium = ws://a:1/ ,, firefox=ws://b:2/?token=x=y ') == {
+        'chromium': 'ws://a:1/', 'firefox': 'ws://b:2/?token=x=y'}
+    assert parse_ws_endpoints('') == {}
+
+
+def test_stats_of_other_pools_are_summed(fake_pool):
+    fake_pool.acquire('chromium')
+    fake_pool.merge_stats({'chromium/headless': {'hits': 3, 'misses': 1, 'launch_seconds': 0.5},
+                           'firefox/headless': {'hits': 0, 'misses': 1, 'launch_seconds': 1.0}})
+    fake_pool.merge_stats({'firefox/headless': {'hits': 2, 'misses': 0, 'launch_seconds': 0.0}})
+
+    assert (fake_pool.stats['chromium/headless']['hits'], fake_pool.stats['chromium/headless']['misses']) == (3, 2)
+    assert fake_pool.stats['firefox/headless'] == {'hits': 2, 'misses': 1, 'launch_seconds': 1.0}
+
+
+@pytest.fixture
+def started_pool():
+    # Starting Playwright only needs its driver, no browser
+    pool = BrowserPool(ws_endpoints={})
+    pool._browser_type('chromium')
+    yield pool
+    pool.close()
+
+
+def test_async_runner_after_the_sync_pool_started(started_pool, monkeypatch):
+    monkeypatch.setattr(Config, 'HEALTH_CHECK', False)
+    coroutine = asyncio.sleep(0)
+    with pytest.raises(RuntimeError, match='running event loop'):
+        asyncio.run(coroutine)
+    coroutine.close()
+    assert run_async_matrix(['chromium'], [], max_concurrency=2) == []
+
+
+def test_run_coroutine_keeps_the_context(started_pool):
+    async def labels():
+        return current_labels()
+
+    with step_labels(engine='firefox'):
+        assert run_coroutine(labels()) == {'engine': 'firefox'}
+
+
+def test_run_coroutine_raises_the_error_of_the_coroutine(started_pool):
+    async def failing():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError, match='boom'):
+        run_coroutine(failing())
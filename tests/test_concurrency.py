@@ -0,0 +1,106 @@
+"""
+Checks of the adaptive concurrency controller: additive increase, halving on slow or timed out steps,
+memory and load, and the slots held by the flows.
+"""
+# pytest tests/test_concurrency.py
+
+import asyncio
+
+import pytest
+
+from config.config import Config
+from utils import concurrency, instrumentation
+from utils.concurrency import AdaptiveConcurrency, run_coroutine
+from utils.instrumentation import timed_step
+
+
+@pytest.fixture(autouse=True)
+def roomy_machine(monkeypatch):
+    monkeypatch.setattr(concurrency, 'machine_limit', lambda: 8)
+    monkeypatch.setattr(concurrency, 'available_memory_mb', lambda: 4096)
+    monkeypatch.setattr(concurrency, 'load_per_core', lambda: 0.2)
+    monkeypatch.setattr(Config, 'CONCURRENCY_START', 2)
+    monkeypatch.setattr(Config, 'CONCURRENCY_WINDOW', 4)
+    monkeypatch.setattr(Config, 'CONCURRENCY_LATENCY_TOLERANCE', 0.5)
+
+
+def observe_window(controller, wall, status='passed', step='perform_logout'):
+    for _ in range(max(Config.CONCURRENCY_WINDOW, controller.limit)):
+        controller.observe({'step': step, 'wall': wall, 'status': status})
+
+
+def test_fixed_without_adaptive_concurrency():
+    controller = AdaptiveConcurrency(6, adaptive=False)
+    assert controller.limit == controller.maximum == 6
+    with controller:
+        assert controller.observe not in instrumentation._step_listeners
+
+
+def test_raises_one_at_a_time_up_to_the_machine_limit():
+    controller = AdaptiveConcurrency(12, adaptive=True)
+    assert (controller.limit, controller.maximum) == (2, 8)
+    for _ in range(10):
+        observe_window(controller, 0.2)
+    assert controller.limit == controller.peak == 8
+    assert controller.back_offs == 0
+
+
+def test_halves_when_the_p95_degrades():
+    controller = AdaptiveConcurrency(12, adaptive=True)
+    for _ in range(4):
+        observe_window(controller, 0.2)
+    assert controller.limit == 6
+    observe_window(controller, 0.25)
+    assert controller.limit == 7
+    observe_window(controller, 0.5)
+    assert controller.limit == 3
+    assert controller.back_offs == 1
+
+
+def test_halves_on_a_timeout_and_close_to_the_wait_timeout(monkeypatch):
+    monkeypatch.setattr(Config, 'WAIT_TIMEOUT', 1000)
+    controller = AdaptiveConcurrency(12, adaptive=True)
+    observe_window(controller, 0.2)
+    observe_window(controller, 0.2, status='TimeoutError')
+    assert controller.limit == 1
+    controller = AdaptiveConcurrency(12, adaptive=True)
+    observe_window(controller, 0.6)
+    assert controller.limit == 1
+
+
+@pytest.mark.parametrize('memory, load', [(100, 0.2), (4096, 3.0)])
+def test_halves_on_low_memory_or_high_load(monkeypatch, memory, load):
+    monkeypatch.setattr(concurrency, 'available_memory_mb', lambda: memory)
+    monkeypatch.setattr(concurrency, 'load_per_core', lambda: load)
+    controller = AdaptiveConcurrency(12, adaptive=True)
+    controller.limit = 6
+    observe_window(controller, 0.2)
+    assert controller.limit == 3
+
+
+def test_slots_hold_the_flows_to_the_limit():
+    @timed_step('fake_flow_step')
+    async def flow_step():
+        await asyncio.sleep(0.001)
+
+    async def run():
+        controller = AdaptiveConcurrency(12, adaptive=True)
+        peak_in_flight = 0
+
+        async def flow():
+            nonlocal peak_in_flight
+            async with controller.slot():
+                peak_in_flight = max(peak_in_flight, controller.in_flight)
+                assert controller.in_flight <= controller.limit
+                await flow_step()
+
+        with controller:
+            assert controller.observe in instrumentation._step_listeners
+            await asyncio.gather(*(flow() for _ in range(40)))
+        assert controller.observe not in instrumentation._step_listeners
+        return controller, peak_in_flight
+
+    controller, peak_in_flight = run_coroutine(run())
+    assert controller.in_flight == 0
+    assert controller.limit > Config.CONCURRENCY_START
+    assert peak_in_flight <= controller.peak
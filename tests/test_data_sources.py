@@ -0,0 +1,64 @@
+"""
+Checks of the streaming user data sources: JSON Lines, CSV and JSON arrays are read row by row and validated.
+"""
+# pytest tests/test_data_sources.py
+
+import json
+
+import pytest
+
+from utils import data_sources
+from utils.data_sources import DataSourceError, iter_user_shard, iter_users
+
+USERS = [
+    {'username': 'admin', 'password': 'admin123', 'expected': 'success'},
+    {'username': 'invalid_user', 'password': 'invalid_password', 'expected': 'failure'},
+    {'username': '', 'password': '', 'expected': 'failure'},
+]
+
+
+def test_json_lines_and_csv_give_the_same_users(tmp_path):
+    jsonl_path = tmp_path / 'users.jsonl'
+    jsonl_path.write_text('\n'.join(json.dumps(user) for user in USERS) + '\n\n')
+    csv_path = tmp_path / 'users.csv'
+    csv_path.write_text('username,password,expected\n' + ''.join(
+        f"{user['username']},{user['password']},{user['expected']}\n" for user in USERS))
+
+    assert list(iter_users(str(jsonl_path))) == USERS
+    assert list(iter_users(str(csv_path))) == USERS
+
+
+def test_json_array_is_parsed_across_chunk_boundaries(tmp_path, monkeypatch):
+    # Force the raw_decode fallback with chunks far smaller than one user
+    monkeypatch.setattr(data_sources, 'ijson', None)
+    monkeypatch.setattr(data_sources, 'CHUNK_SIZE', 7)
+    wrapped_path = tmp_path / 'wrapped.json'
+    wrapped_path.write_text(json.dumps({'users': USERS}, indent=4))
+    array_path = tmp_path / 'array.json'
+    array_path.write_text(json.dumps(USERS))
+
+    assert list(iter_users(str(wrapped_path))) == USERS
+    assert list(iter_users(str(array_path))) == USERS
+
+
+def test_invalid_rows_are_reported_or_skipped(tmp_path):
+    path = tmp_path / 'users.jsonl'
+    path.write_text('{"username": "admin", "password": "admin123", "expected": "success"}\n'
+                    '{"username": "admin", "expected": "success"}\n'
+                    '{"username": "admin", "password": "x", "expected": "maybe"}\n')
+
+    users = iter_users(str(path))
+    assert next(users)['username'] == 'admin'
+    with pytest.raises(DataSourceError, match="row 2: 'password' is missing"):
+        next(users)
+    assert len(list(iter_users(str(path), skip_invalid=True))) == 1
+
+
+def test_shards_split_the_file_without_overlap(tmp_path):
+    path = tmp_path / 'users.jsonl'
+    path.write_text('\n'.join(json.dumps({**USERS[1], 'username': f"user{number}"}) for number in range(10)))
+
+    shards = [[user['username'] for user in iter_user_shard(str(path), index, 3)] for index in range(3)]
+
+    assert shards[0] == ['user0', 'user3', 'user6', 'user9']
+    assert sorted(sum(shards, [])) == sorted(f"user{number}" for number in range(10))
@@ -0,0 +1,65 @@
+"""
+Checks of the engine matrix without a browser: engines in spawned worker processes or one after another
+in this process, a failing engine reported with its traceback, and the worker logs replayed here.
+"""
+# pytest tests/test_engine_matrix.py
+
+import logging
+import os
+
+import pytest
+
+from config.config import Config
+from utils.engine_matrix import run_engine_matrix
+
+logger = logging.getLogger(__name__)
+
+# Engines the stub ran in this process
+ran_here = []
+
+
+def run_engine_stub(browser_name, headless):
+    """Module level, so the spawned workers can unpickle it."""
+    ran_here.append(browser_name)
+    logger.info(f"stub ran {browser_name} in process {os.getpid()}")
+    if browser_name == 'firefox':
+        raise RuntimeError('firefox did not start')
+
+
+@pytest.fixture(autouse=True)
+def isolated_run(monkeypatch, tmp_path):
+    ran_here.clear()
+    # Spawned workers read their settings from the environment
+    monkeypatch.setenv('LOG_DIR', str(tmp_path))
+    monkeypatch.setattr(Config, 'HEALTH_CHECK', False)
+    monkeypatch.setattr(Config, 'CIRCUIT_BREAKER_THRESHOLD', 0)
+
+
+def test_engines_run_in_worker_processes(caplog, tmp_path):
+    caplog.set_level(logging.INFO)
+    results = run_engine_matrix(run_engine_stub, ['chromium', 'firefox'], workers=2)
+
+    assert ran_here == []
+    assert [(result['browser_name'], result['status']) for result in results] == [('chromium', 'passed'),
+                                                                                  ('firefox', 'failed')]
+    assert results[1]['error'] == 'RuntimeError: firefox did not start'
+    assert 'RuntimeError' in results[1]['traceback']
+    replayed = [record for record in caplog.records if getattr(record, 'replayed', False)]
+    assert any('stub ran chromium in process' in record.getMessage() for record in replayed)
+    assert str(os.getpid()) not in ' '.join(record.getMessage() for record in replayed)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['engine-chromium.jsonl', 'engine-firefox.jsonl']
+
+
+def test_one_worker_runs_the_engines_here_one_after_another():
+    results = run_engine_matrix(run_engine_stub, ['chromium', 'firefox', 'webkit'], workers=1)
+
+    assert ran_here == ['chromium', 'firefox', 'webkit']
+    assert [result['status'] for result in results] == ['passed', 'failed', 'passed']
+    assert results[1]['error'] == 'RuntimeError: firefox did not start'
+
+
+def test_spawn_uses_a_worker_process_even_for_one_engine():
+    results = run_engine_matrix(run_engine_stub, ['chromium'], workers=1, spawn=True)
+
+    assert ran_here == []
+    assert results[0]['status'] == 'passed'
@@ -0,0 +1,135 @@
+"""
+Checks of the flight recorder: bounded buffer, trace chunks dropped on pass and written on failure, and videos.
+"""
+# pytest tests/test_flight_recorder.py
+
+import json
+import os
+
+import pytest
+
+from config.config import Config
+from utils.flight_recorder import FlightRecorder, record_case
+from utils.instrumentation import timed_step
+
+
+class FakeTracing:
+    def __init__(self):
+        self.calls = []
+
+    def start(self, **options):
+        self.calls.append(('start', options))
+
+    def start_chunk(self, title=None):
+        self.calls.append(('start_chunk', title))
+
+    def stop_chunk(self, path=None):
+        self.calls.append(('stop_chunk', path))
+        if path:
+            with open(path, 'wb') as trace_file:
+                trace_file.write(b'trace')
+
+
+class FakeVideo:
+    def __init__(self, path):
+        self._path = path
+
+    def path(self):
+        return self._path
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+        self.pages = []
+        self.listeners = {}
+
+    def on(self, event, listener):
+        self.listeners[event] = listener
+
+
+class FakePage:
+    def __init__(self, context, video_path=None):
+        self.context = context
+        self.video = FakeVideo(video_path) if video_path else None
+        self.listeners = {}
+        context.pages.append(self)
+
+    def on(self, event, listener):
+        self.listeners[event] = listener
+
+
+class FakeMessage:
+    type = 'log'
+
+    def __init__(self, text):
+        self.text = text
+
+
+@timed_step('fake_step')
+def fake_step():
+    pass
+
+
+def test_passing_case_writes_nothing(tmp_path):
+    context = FakeContext()
+    recorder = FlightRecorder(context, trace_mode='actions', output_dir=str(tmp_path))
+    with recorder.case('chromium-admin'):
+        fake_step()
+
+    assert context.tracing.calls == [('start', {'screenshots': False, 'snapshots': False, 'sources': False}),
+                                     ('start_chunk', 'chromium-admin'), ('stop_chunk', None)]
+    assert os.listdir(tmp_path) == []
+
+
+def test_failing_case_writes_trace_and_events(tmp_path):
+    context = FakeContext()
+    page = FakePage(context)
+    recorder = FlightRecorder(context, capacity=3, output_dir=str(tmp_path))
+    for number in range(5):
+        page.listeners['console'](FakeMessage(f"message {number}"))
+
+    with pytest.raises(AssertionError):
+        with recorder.case('chromium-admin'):
+            fake_step()
+            assert False, "Expected error message not found."
+
+    [failure_dir] = os.listdir(tmp_path)
+    assert os.path.exists(tmp_path / failure_dir / 'trace.zip')
+    with open(tmp_path / failure_dir / 'events.json') as events_file:
+        recording = json.load(events_file)
+    assert recording['error'].startswith('AssertionError: Expected error message not found.')
+    # The buffer keeps only the newest events
+    assert [event['kind'] for event in recording['events']] == ['console', 'case', 'step']
+    assert recording['events'][-1]['step'] == 'fake_step'
+
+
+def test_videos_are_kept_only_for_failed_contexts(tmp_path):
+    passing_video, failing_video = tmp_path / 'pass.webm', tmp_path / 'fail.webm'
+    passing_video.write_bytes(b'video')
+    failing_video.write_bytes(b'video')
+
+    passing = FakeContext()
+    passing_recorder = FlightRecorder(passing, trace_mode='off', output_dir=str(tmp_path / 'out'))
+    with passing_recorder.case('pass', FakePage(passing, str(passing_video))):
+        pass
+    passing_recorder.finish()
+
+    failing = FakeContext()
+    failing_recorder = FlightRecorder(failing, trace_mode='off', output_dir=str(tmp_path / 'out'))
+    with pytest.raises(RuntimeError):
+        with failing_recorder.case('fail', FakePage(failing, str(failing_video))):
+            raise RuntimeError("Login failed")
+    failing_recorder.finish()
+
+    assert not passing_video.exists() and not failing_video.exists()
+    [failure_dir] = os.listdir(tmp_path / 'out')
+    assert sorted(os.listdir(tmp_path / 'out' / failure_dir)) == ['events.json', 'fail.webm']
+
+
+def test_record_case_is_a_no_op_when_off(monkeypatch):
+    monkeypatch.setattr(Config, 'FLIGHT_RECORDER', False)
+    context = FakeContext()
+    with record_case(FakePage(context), 'chromium-admin'):
+        pass
+    assert context.tracing.calls == [] and context.listeners == {}
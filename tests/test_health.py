@@ -0,0 +1,102 @@
+"""
+Checks of the pre-flight probe against the local stand-in server and of the circuit breaker.
+"""
+# pytest tests/test_health.py
+
+import socket
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from config.config import Config
+from utils.health import (CircuitBreaker, CircuitOpenError, SiteUnavailableError, ensure_site_up,
+                          is_infrastructure_failure, probe_site, reset_probe_results)
+from utils.stand_in_server import LOGIN_PATH, StandInServer
+
+
+@pytest.fixture(autouse=True)
+def fresh_probes(monkeypatch):
+    monkeypatch.setattr(Config, 'HEALTH_CHECK', True)
+    reset_probe_results()
+    yield
+    reset_probe_results()
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}{LOGIN_PATH}"
+
+
+def test_probe_passes_for_a_site_that_answers():
+    with StandInServer() as server:
+        result = probe_site(server.url + LOGIN_PATH, timeout=5)
+        ensure_site_up(server.url + LOGIN_PATH)
+    assert result['ok'] and result['status'] == 200
+
+
+def test_probe_fails_for_server_errors_and_refused_connections():
+    with StandInServer(faults={'login': {'error_rate': 1}}) as server:
+        result = probe_site(server.url + LOGIN_PATH, timeout=5)
+    assert not result['ok'] and result['status'] == 503
+
+    url = closed_port_url()
+    assert not probe_site(url, timeout=5)['ok']
+    with pytest.raises(SiteUnavailableError, match='unavailable'):
+        ensure_site_up(url)
+
+
+def test_probe_runs_once_per_url():
+    with StandInServer() as server:
+        url = server.url + LOGIN_PATH
+        ensure_site_up(url)
+    # The server is gone, but the cached result of the first probe still holds
+    ensure_site_up(url)
+
+
+NAVIGATION_TIMEOUT = PlaywrightTimeoutError('Page.goto: Timeout 10000ms exceeded.\nCall log:\n'
+                                            'navigating to "https://example.com/web/index.php/auth/login"')
+
+
+def test_infrastructure_failures_are_told_from_assertions():
+    assert is_infrastructure_failure(Exception("Page.goto: net::ERR_CONNECTION_REFUSED at https://example.com"))
+    assert is_infrastructure_failure(RuntimeError("API login failed for user Admin (HTTP 503 at https://x)"))
+    assert is_infrastructure_failure(SiteUnavailableError("down"))
+    assert not is_infrastructure_failure(AssertionError("Expected error message not found."))
+    assert not is_infrastructure_failure(RuntimeError("Login token not found on the login page"))
+
+
+def test_navigation_timeouts_count_only_while_the_site_is_down(monkeypatch):
+    locator_timeout = PlaywrightTimeoutError('Locator.click: Timeout 10000ms exceeded.\nCall log:\n'
+                                             'waiting for locator("button[type=\'submit\']")')
+    monkeypatch.setattr(Config, 'BASE_URL', closed_port_url())
+    assert is_infrastructure_failure(NAVIGATION_TIMEOUT)
+    assert not is_infrastructure_failure(locator_timeout)
+
+    with StandInServer() as server:
+        monkeypatch.setattr(Config, 'BASE_URL', server.url + LOGIN_PATH)
+        assert not is_infrastructure_failure(NAVIGATION_TIMEOUT)
+        assert not is_infrastructure_failure(locator_timeout)
+
+
+def test_breaker_opens_after_consecutive_infrastructure_failures(monkeypatch):
+    monkeypatch.setattr(Config, 'BASE_URL', closed_port_url())
+    breaker = CircuitBreaker(threshold=2)
+    breaker.record(ConnectionError("refused"))
+    breaker.record(AssertionError("wrong banner"))
+    breaker.record(ConnectionError("refused"))
+    breaker.check()
+    breaker.record(NAVIGATION_TIMEOUT)
+
+    assert breaker.open
+    with pytest.raises(CircuitOpenError, match='2 consecutive'):
+        breaker.check()
+    assert breaker.stats == {'passed': 0, 'failed': 1, 'infrastructure': 3, 'skipped': 0}
+
+
+def test_breaker_with_threshold_zero_never_opens():
+    breaker = CircuitBreaker(threshold=0)
+    for _ in range(5):
+        breaker.record(ConnectionError("refused"))
+    breaker.check()
@@ -0,0 +1,73 @@
+"""
+Checks of the per-step instrumentation: records per step, user and engine, and the summary built from them.
+"""
+# pytest tests/test_instrumentation.py
+
+import asyncio
+import time
+
+import pytest
+
+from config.config import Config
+from utils.concurrency import run_coroutine
+from utils.instrumentation import (build_summary, histogram, reset_step_records, step_labels, step_records,
+                                   timed_step)
+
+
+@pytest.fixture
+def instrumented(monkeypatch):
+    monkeypatch.setattr(Config, 'INSTRUMENT', True)
+    reset_step_records()
+    yield
+    reset_step_records()
+
+
+@timed_step('sleepy_step')
+def sleepy_handler(seconds):
+    time.sleep(seconds)
+    return 'done'
+
+
+@timed_step('async_step')
+async def failing_handler_async():
+    await asyncio.sleep(0.01)
+    raise TimeoutError('element not found')
+
+
+def test_steps_are_recorded_with_their_labels(instrumented):
+    with step_labels(engine='chromium'):
+        with step_labels(user='Admin'):
+            assert sleepy_handler(0.02) == 'done'
+        with pytest.raises(TimeoutError):
+            run_coroutine(failing_handler_async())
+
+    sleepy, failing = step_records()
+    assert sleepy['step'] == 'sleepy_step' and sleepy['engine'] == 'chromium' and sleepy['user'] == 'Admin'
+    assert sleepy['wall'] >= 0.02
+    # No Playwright calls were made, so all of the time is harness time
+    assert sleepy['harness'] == sleepy['wall']
+    assert failing['status'] == 'TimeoutError' and 'user' not in failing
+
+
+def test_nothing_is_recorded_when_disabled(monkeypatch):
+    monkeypatch.setattr(Config, 'INSTRUMENT', False)
+    reset_step_records()
+    sleepy_handler(0)
+    assert step_records() == []
+
+
+def test_summary_groups_steps_and_builds_histograms():
+    records = [
+        {'step': 'perform_login', 'engine': 'firefox', 'user': 'Admin', 'wall': 0.8, 'playwright': 0.7,
+         'harness': 0.1, 'status': 'passed'},
+        {'step': 'perform_login', 'engine': 'webkit', 'user': 'Admin', 'wall': 12.0, 'playwright': 11.0,
+         'harness': 1.0, 'status': 'TimeoutError'},
+    ]
+    summary = build_summary(records)
+
+    login = summary['steps']['perform_login']
+    assert login['count'] == 2 and login['failed'] == 1
+    assert login['playwright'] == pytest.approx(11.7)
+    assert login['histogram']['<=1000ms'] == 1 and login['histogram']['>10000ms'] == 1
+    assert set(summary['by_engine']) == {'firefox/perform_login', 'webkit/perform_login'}
+    assert histogram([0.01, 0.05, 0.051])['<=50ms'] == 2
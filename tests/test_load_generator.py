@@ -0,0 +1,32 @@
+"""
+Checks of the load generator report: ramp offsets, throughput, latency percentiles and error rates.
+"""
+# pytest tests/test_load_generator.py
+
+import pytest
+
+from utils.load_generator import build_report, ramp_delays
+from utils.stats import percentile
+
+
+def test_virtual_users_are_spread_over_the_ramp():
+    assert ramp_delays(5, 8) == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert ramp_delays(3, 0) == [0.0, 0.0, 0.0]
+
+
+def test_report_counts_only_passed_iterations_in_latencies():
+    iterations = [
+        {'username': 'Admin', 'time_to_dashboard': value / 100, 'time_to_logout': 0.2, 'failed_step': None,
+         'error': None}
+        for value in range(1, 101)
+    ]
+    iterations.append({'username': 'Admin', 'time_to_dashboard': None, 'time_to_logout': None,
+                       'failed_step': 'login', 'error': 'TimeoutError: Timeout 10000ms exceeded.'})
+    report = build_report(iterations, elapsed=50.0, virtual_users=4)
+
+    assert report['iterations'] == 101
+    assert report['failed'] == 1
+    assert report['throughput_per_second'] == pytest.approx(2.0)
+    assert report['time_to_dashboard']['p50'] == pytest.approx(0.505)
+    assert report['time_to_dashboard']['p99'] == pytest.approx(percentile([v / 100 for v in range(1, 101)], 99))
+    assert report['errors'] == {'login: TimeoutError': 1}
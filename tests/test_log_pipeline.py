@@ -0,0 +1,88 @@
+"""
+Checks of the logging pipeline: tagged JSON records in the worker file, the time-ordered merge
+and the records of one run.
+"""
+# pytest tests/test_log_pipeline.py
+
+import json
+import logging
+
+import pytest
+
+from utils.instrumentation import step_labels, timed_step
+from utils.log_pipeline import format_entry, latest_run, merge_logs, run_id, setup_logging, stop_logging
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    # conftest runs the session pipeline; swap in one writing to a temporary directory
+    stop_logging()
+    setup_logging(console=False, log_dir=str(tmp_path))
+    yield tmp_path
+    stop_logging()
+    setup_logging(console=False)
+
+
+def write_log(log_dir, name, times, run=None, mode='w'):
+    with open(log_dir / name, mode) as log_file:
+        for created in times:
+            log_file.write(json.dumps({'time': created, 'level': 'INFO', 'logger': 'x', 'message': f"{name} {created}",
+                                       'worker': name.split('.')[0], 'run': run}) + '\n')
+
+
+@timed_step('logging_step')
+def logging_handler():
+    logger.info("inside the step")
+
+
+def test_records_are_tagged_with_engine_user_step_and_worker(pipeline):
+    with step_labels(engine='firefox', user='Admin'):
+        logging_handler()
+    logger.info("outside the step")
+    stop_logging()
+
+    with open(pipeline / 'main.jsonl') as log_file:
+        entries = [json.loads(line) for line in log_file if __name__ in line]
+    assert [(entry['message'], entry['engine'], entry['user'], entry['step'], entry['worker'])
+            for entry in entries] == [("inside the step", 'firefox', 'Admin', 'logging_step', 'main'),
+                                      ("outside the step", None, None, None, 'main')]
+    assert {entry['run'] for entry in entries} == {run_id()}
+
+
+def test_named_worker_writes_the_same_file_every_run(pipeline):
+    stop_logging()
+    setup_logging(console=False, log_dir=str(pipeline), worker='engine-firefox')
+    logger.info("from the engine worker")
+    stop_logging()
+
+    assert sorted(path.name for path in pipeline.iterdir()) == ['engine-firefox.jsonl', 'main.jsonl']
+    with open(pipeline / 'engine-firefox.jsonl') as log_file:
+        assert any(json.loads(line)['worker'] == 'engine-firefox' for line in log_file)
+
+
+def test_merge_orders_records_of_all_workers_and_rotations(tmp_path):
+    write_log(tmp_path, 'main.jsonl.2', [1.0, 4.0])
+    write_log(tmp_path, 'main.jsonl.1', [5.0])
+    write_log(tmp_path, 'main.jsonl', [9.0])
+    write_log(tmp_path, 'engine-firefox.jsonl', [2.0, 6.0])
+
+    assert [entry['time'] for entry in merge_logs(str(tmp_path))] == [1.0, 2.0, 4.0, 5.0, 6.0, 9.0]
+
+
+def test_merge_keeps_the_records_of_one_run(tmp_path):
+    write_log(tmp_path, 'main.jsonl.1', [1.0, 2.0], run='earlier')
+    write_log(tmp_path, 'main.jsonl', [3.0], run='earlier')
+    write_log(tmp_path, 'main.jsonl', [7.0, 9.0], run='latest', mode='a')
+    write_log(tmp_path, 'engine-webkit.jsonl', [8.0], run='latest')
+
+    assert latest_run(str(tmp_path)) == 'latest'
+    assert [entry['time'] for entry in merge_logs(str(tmp_path), run='latest')] == [7.0, 8.0, 9.0]
+    assert [entry['time'] for entry in merge_logs(str(tmp_path), run='earlier')] == [1.0, 2.0, 3.0]
+
+
+def test_text_lines_show_the_context():
+    line = format_entry({'time': 0.25, 'level': 'INFO', 'logger': 'utils.login_flow', 'message': 'Testing',
+                         'engine': 'webkit', 'user': None, 'step': None, 'worker': 'main'})
+    assert line.endswith(",250 - utils.login_flow - INFO - [engine=webkit worker=main] Testing")
@@ -0,0 +1,30 @@
+"""
+Checks of the sequential login flow: a failing user is reported without stopping the users after it.
+"""
+# pytest tests/test_login_flow.py
+
+import pytest
+
+from utils import login_flow
+from utils.login_flow import perform_test
+
+USERS = [{'username': f"user{number}", 'password': 'secret'} for number in range(1, 4)]
+
+
+def test_a_failing_user_does_not_stop_the_others(monkeypatch):
+    ran = []
+
+    def login_case(page, user, screenshots_dir):
+        ran.append(user['username'])
+        if user['username'] == 'user1':
+            raise RuntimeError('login page did not load')
+
+    monkeypatch.setattr(login_flow, 'perform_login_case', login_case)
+    with pytest.raises(AssertionError, match='failed for: user1$'):
+        perform_test(page=None, screenshots_dir='screenshots', users=iter(USERS))
+    assert ran == ['user1', 'user2', 'user3']
+
+
+def test_every_user_passing(monkeypatch):
+    monkeypatch.setattr(login_flow, 'perform_login_case', lambda page, user, screenshots_dir: None)
+    perform_test(page=None, screenshots_dir='screenshots', users=USERS)
@@ -0,0 +1,48 @@
+"""
+The login/logout test matrix: one test per engine, headless mode, data source and user.
+
+It replaces the four runner files that each looped over every engine and user inside one test.
+Narrow the matrix with HEADLESS_MODES and MATRIX_SOURCES, or select single cases by id.
+
+pytest needs every parameter at collection time, so the cases of the data files are held in memory
+here, unlike everywhere else the users are streamed. Run data files too large for that with
+python -m utils.login_flow, which streams them row by row.
+"""
+# pytest tests/test_login_matrix.py
+# pytest tests/test_login_matrix.py -k "firefox and json"
+# HEADLESS_MODES=true,false MATRIX_SOURCES=json pytest tests/test_login_matrix.py --html=report-matrix.html
+
+import pytest
+
+from utils.browser_pool import get_browser_pool
+from utils.flight_recorder import finish_flight_recorder, recorder_context_options
+from utils.instrumentation import step_labels
+from utils.login_flow import iter_login_cases, perform_login_case, setup_screenshot_directory
+from utils.network_policy import NetworkPolicy
+
+
+def pytest_generate_tests(metafunc):
+    if 'login_case' in metafunc.fixturenames:
+        # Parametrization takes a list; --shard selects from the collected cases, so it cannot cap this
+        cases = list(iter_login_cases())
+        metafunc.parametrize('login_case', cases, ids=[case.id for case in cases])
+
+
+@pytest.fixture
+def case_page(login_case):
+    """A page in a fresh (or cleared persistent) context of the case's engine, routed through the network profile."""
+    context = get_browser_pool().new_context(login_case.engine, headless=login_case.headless,
+                                             **recorder_context_options())
+    network_policy = NetworkPolicy().attach(context)
+    page = context.new_page()
+    yield page
+    get_browser_pool().release_context(context)
+    finish_flight_recorder(context)
+    network_policy.log_report(login_case.id)
+
+
+def test_login_logout(login_case, case_page):
+    """Log the user of the case in and out, following the rules of its data source."""
+    screenshots_dir = setup_screenshot_directory(login_case.engine)
+    with step_labels(engine=login_case.engine, user=login_case.user['username']):
+        perform_login_case(case_page, login_case.user, screenshots_dir, case_name=login_case.id)
@@ -0,0 +1,36 @@
+"""
+Direct API login: the login form token is parsed from the page and the credentials are posted without
+rendering the login page; the session cookie ends up in the browser context.
+"""
+# pytest tests/test_login_via_api.py
+
+import pytest
+
+from config.config import Config
+from modules.perform_login_via_api import handle_perform_login, handle_perform_login_via_api, parse_login_token
+
+
+def test_token_is_parsed_from_the_login_component_or_a_hidden_input():
+    component = '<auth-login :token="&quot;d6e1a.3f&amp;x&quot;" :is-demo-mode="true"></auth-login>'
+    hidden_input = '<form><input type="hidden" name="_token" value="abc123"><input name="username"></form>'
+
+    assert parse_login_token(component) == 'd6e1a.3f&x'
+    assert parse_login_token(hidden_input) == 'abc123'
+    with pytest.raises(RuntimeError):
+        parse_login_token('<form><input name="username"></form>')
+
+
+def test_api_login_opens_the_dashboard(page, stand_in_site):
+    handle_perform_login_via_api(page, 'Admin', 'admin123')
+    assert page.url == Config.DASHBOARD_URL
+
+
+def test_api_login_with_invalid_credentials_fails(page, stand_in_site):
+    with pytest.raises(RuntimeError, match='API login failed for user invalid_user'):
+        handle_perform_login_via_api(page, 'invalid_user', 'invalid_password')
+
+
+@pytest.mark.parametrize('strategy', ['ui', 'api'])
+def test_both_strategies_end_on_the_dashboard(page, stand_in_site, strategy):
+    handle_perform_login(page, 'Admin', 'admin123', strategy=strategy)
+    assert page.url == Config.DASHBOARD_URL
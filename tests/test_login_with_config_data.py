@@ -21,24 +21,26 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Now you can import from the modules folder
-import json
 import pytest
 
-from playwright.sync_api import sync_playwright, Page
+from playwright.sync_api import Page
 from config.config import Config
 from modules.navigate_to_login_page import handle_navigate_to_login_page
 from modules.perform_login_with_config_data import handle_perform_login_with_config_data
 from modules.perform_logout import handle_perform_logout
 from modules.perform_logout_redirection_to_login import handle_perform_logout_redirection_to_login
-from modules.close_browser import handle_close_browser
+from modules.close_browser import handle_close_browser_context
+from utils.screenshot_service import get_screenshot_service
+from utils.browser_pool import close_browser_pool, get_browser_pool
+from utils.data_sources import config_users
+from utils.health import ensure_site_up
+from utils.instrumentation import label_steps
 
 
 def setup_browser(headless=False):
-    """Initialize Playwright, launch the browser, and open a new page."""
-    playwright = sync_playwright().start()
-    browser = playwright.chromium.launch(headless=headless)
-    page = browser.new_page()
-    return playwright, browser, page
+    """Return a context of the pooled chromium browser (or its persistent profile) and a new page in it."""
+    context = get_browser_pool().new_context('chromium', headless=headless)
+    return context, context.new_page()
 
 
 def setup_screenshot_directory():
@@ -48,10 +50,9 @@ def setup_screenshot_directory():
     return screenshots_dir
 
 
-def capture_screenshot(page, screenshots_dir, filename):
-    """Capture a screenshot and save it to the specified directory."""
-    os.makedirs(screenshots_dir, exist_ok=True)
-    page.screenshot(path=os.path.join(screenshots_dir, filename))
+def capture_screenshot(page, screenshots_dir, filename, user=None, failure=False):
+    """Capture a screenshot if the screenshot policy allows it; it is saved to the directory in the background."""
+    get_screenshot_service().capture(page, screenshots_dir, filename, user=user, failure=failure)
 
 
 def navigate_to_login_page(page: Page):
@@ -66,63 +67,69 @@ def perform_logout(page: Page):
     handle_perform_logout(page)
 
 
-def perform_logout_redirection_to_login(page: Page, screenshots_dir: str):
-    handle_perform_logout_redirection_to_login(page, screenshots_dir)
+def perform_logout_redirection_to_login(page: Page, screenshots_dir: str, username: str = None):
+    handle_perform_logout_redirection_to_login(page, screenshots_dir, username)
 
 
-def close_browser(playwright, browser):
-    handle_close_browser(playwright, browser)
+def close_browser(page: Page):
+    handle_close_browser_context(page)
 
 
 def perform_test(page: Page, screenshots_dir: str):
     """Perform the login, capture screenshots, and perform logout for all users."""
 
     # Loop through all users in the Config
-    for user in Config.USERS:
+    for user in config_users():
         username = user['username']
         password = user['password']
+        label_steps(user=username)
 
         # Navigate to login page and wait for it to load
         navigate_to_login_page(page)
-        page.screenshot(path=os.path.join(screenshots_dir, f"before_login_{username}.png"))
+        capture_screenshot(page, screenshots_dir, f"before_login_{username}.png", user=username)
 
         try:
             # Perform login with the loaded credentials
             handle_perform_login_with_config_data(page, username, password)
-            page.screenshot(path=os.path.join(screenshots_dir, f"after_login_{username}.png"))
+            capture_screenshot(page, screenshots_dir, f"after_login_{username}.png", user=username)
 
             # Check if the login was successful
-            if page.url == 'https://opensource-demo.orangehrmlive.com/web/index.php/dashboard/index':
+            if page.url == Config.DASHBOARD_URL:
                 # Perform logout and capture a screenshot
                 perform_logout(page)
                 page.wait_for_url(Config.BASE_URL, timeout=30000)
-                page.screenshot(path=os.path.join(screenshots_dir, f"after_logout_{username}.png"))
+                capture_screenshot(page, screenshots_dir, f"after_logout_{username}.png", user=username)
             else:
                 # Handle login failure (e.g., stay on the login page or show an error)
                 print(f"Login failed for user {username}. Staying on login page.")
-                page.screenshot(path=os.path.join(screenshots_dir, f"login_failed_{username}.png"))
+                capture_screenshot(page, screenshots_dir, f"login_failed_{username}.png", user=username)
 
         except Exception as e:
             print(f"Error during login/logout tests for user {username}: {str(e)}")
-            page.screenshot(path=os.path.join(screenshots_dir, f"error_{username}.png"))
+            capture_screenshot(page, screenshots_dir, f"error_{username}.png", user=username, failure=True)
             raise
 
 
 def test_login_with_config_data():
     """Main test function to perform login and logout using config data."""
-    playwright, browser, page = setup_browser()  # This will default to headless=False
+    ensure_site_up()
+    context, page = setup_browser()  # This will default to headless=False
     screenshots_dir = setup_screenshot_directory()
 
     try:
         perform_test(page, screenshots_dir)
     except Exception as e:
         print(f"Error during login/logout tests: {str(e)}")
-        page.screenshot(path=os.path.join(screenshots_dir, "error.png"))
+        capture_screenshot(page, screenshots_dir, "error.png", failure=True)
         raise
     finally:
-        close_browser(playwright, browser)
+        get_screenshot_service().flush()
+        close_browser(page)
 
 
 # Entry point for running the tests directly
 if __name__ == "__main__":
-    test_login_with_config_data()
+    try:
+        test_login_with_config_data()
+    finally:
+        close_browser_pool()
@@ -22,33 +22,26 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Now you can import from the modules folder
-import json
 import pytest
-from playwright.sync_api import sync_playwright, Page
+from playwright.sync_api import Page
 
 from modules.navigate_to_login_page import handle_navigate_to_login_page
 from modules.perform_login_with_json_data import handle_perform_login_with_json_data
 from modules.perform_logout import handle_perform_logout
 from modules.perform_logout_redirection_to_login import handle_perform_logout_redirection_to_login
-from modules.close_browser import handle_close_browser
-
-
-def load_login_data():
-    """Load login data from a JSON file."""
-    json_file_path = os.path.join('test_data', 'json_login_data.json')
-
-    with open(json_file_path) as json_file:
-        data = json.load(json_file)
-
-    return data
+from utils.wait_policy import wait_for_error_banner
+from modules.close_browser import handle_close_browser_context
+from utils.screenshot_service import get_screenshot_service
+from utils.browser_pool import close_browser_pool, get_browser_pool
+from utils.data_sources import login_data_users
+from utils.health import CircuitBreaker, ensure_site_up
+from utils.instrumentation import label_steps
 
 
 def setup_browser(headless=False):
-    """Initialize Playwright, launch the browser, and open a new page."""
-    playwright = sync_playwright().start()
-    browser = playwright.chromium.launch(headless=headless)
-    page = browser.new_page()
-    return playwright, browser, page
+    """Return a context of the pooled chromium browser (or its persistent profile) and a new page in it."""
+    context = get_browser_pool().new_context('chromium', headless=headless)
+    return context, context.new_page()
 
 
 def setup_screenshot_directory():
@@ -58,10 +51,9 @@ def setup_screenshot_directory():
     return screenshots_dir
 
 
-def capture_screenshot(page, screenshots_dir, filename):
-    """Capture a screenshot and save it to the specified directory."""
-    os.makedirs(screenshots_dir, exist_ok=True)
-    page.screenshot(path=os.path.join(screenshots_dir, filename))
+def capture_screenshot(page, screenshots_dir, filename, user=None, failure=False):
+    """Capture a screenshot if the screenshot policy allows it; it is saved to the directory in the background."""
+    get_screenshot_service().capture(page, screenshots_dir, filename, user=user, failure=failure)
 
 
 def navigate_to_login_page(page: Page):
@@ -76,70 +68,74 @@ def perform_logout(page: Page):
     handle_perform_logout(page)
 
 
-def perform_logout_redirection_to_login(page: Page, screenshots_dir: str):
-    handle_perform_logout_redirection_to_login(page, screenshots_dir)
+def perform_logout_redirection_to_login(page: Page, screenshots_dir: str, username: str = None):
+    handle_perform_logout_redirection_to_login(page, screenshots_dir, username)
 
 
-def close_browser(playwright, browser):
-    handle_close_browser(playwright, browser)
+def close_browser(page: Page):
+    handle_close_browser_context(page)
 
 
 def perform_test(page: Page, screenshots_dir: str):
     """Perform the login, capture screenshots, and perform logout for all users."""
-    # Load login credentials from the JSON file
-    json_login_data = load_login_data()
-
-    # Loop through all users in the JSON data
-    for user in json_login_data['users']:
+    # Failed users are only logged, so stop once the site itself keeps failing
+    breaker = CircuitBreaker()
+    # Stream the users from the login data file one at a time
+    for user in login_data_users():
+        breaker.check()
         username = user['username']
         password = user['password']
         expected = user['expected']
+        label_steps(user=username)
 
         # Navigate to login page
         navigate_to_login_page(page)
-        capture_screenshot(page, screenshots_dir, f"before_login_{username}.png")
+        capture_screenshot(page, screenshots_dir, f"before_login_{username}.png", user=username)
 
         try:
             # Perform login with the loaded credentials
             perform_login_with_jason_data(page, username, password)
-            capture_screenshot(page, screenshots_dir, f"after_login_{username}.png")
+            capture_screenshot(page, screenshots_dir, f"after_login_{username}.png", user=username)
 
             # Check if the login should be successful
             if expected == "success":
                 # If expected success, perform logout
                 perform_logout(page)
-                capture_screenshot(page, screenshots_dir, f"after_logout_{username}.png")
+                capture_screenshot(page, screenshots_dir, f"after_logout_{username}.png", user=username)
                 # Verify redirection to login page after logout
-                perform_logout_redirection_to_login(page, screenshots_dir)
+                perform_logout_redirection_to_login(page, screenshots_dir, username)
             else:
-                # If expected failure, check for failure conditions
-                page.wait_for_timeout(2000)  # Wait for a moment to see the outcome
-                # Example: Check for an error message on the page
-                assert page.is_visible("text='Invalid credentials'"), "Expected error message not found."
+                # If expected failure, wait for the error message to render
+                assert wait_for_error_banner(page), "Expected error message not found."
 
         except Exception as e:
             print(f"Error during login attempt for user {username}: {str(e)}")
-            capture_screenshot(page, screenshots_dir, f"error_{username}.png")
-
-        # Wait before proceeding to the next user
-        page.wait_for_timeout(3000)  # Wait for 3 seconds before the next login attempt
+            capture_screenshot(page, screenshots_dir, f"error_{username}.png", user=username, failure=True)
+            breaker.record(e)
+        else:
+            breaker.record()
 
 
 def test_all_users_login():
     """Main test function to perform login and logout for all users."""
-    playwright, browser, page = setup_browser()  # This will default to headless=False
+    ensure_site_up()
+    context, page = setup_browser()  # This will default to headless=False
     screenshots_dir = setup_screenshot_directory()
 
     try:
         perform_test(page, screenshots_dir)
     except Exception as e:
         print(f"Error during login/logout tests: {str(e)}")
-        capture_screenshot(page, screenshots_dir, "error.png")
+        capture_screenshot(page, screenshots_dir, "error.png", failure=True)
         raise
     finally:
-        close_browser(playwright, browser)
+        get_screenshot_service().flush()
+        close_browser(page)
 
 
 # Entry point for running the tests directly
 if __name__ == "__main__":
-    test_all_users_login()
+    try:
+        test_all_users_login()
+    finally:
+        close_browser_pool()
@@ -0,0 +1,25 @@
+"""
+Logout tests that start from a cached, already authenticated session instead of logging in through the UI.
+The first run logs the user in once and stores the session under .auth/; later runs reuse it until it expires.
+"""
+# pytest tests/test_logout_with_cached_session.py
+
+import os
+
+from config.config import Config
+from modules.perform_logout import handle_perform_logout
+from modules.perform_logout_redirection_to_login import handle_perform_logout_redirection_to_login
+
+
+def test_logout_from_cached_session(authenticated_page, storage_state_cache):
+    """Log out from the dashboard of a cached session and verify the redirection to the login page."""
+    screenshots_dir = os.path.join('screenshots', 'cached_session')
+    os.makedirs(screenshots_dir, exist_ok=True)
+
+    assert authenticated_page.url == Config.DASHBOARD_URL
+
+    handle_perform_logout(authenticated_page)
+    handle_perform_logout_redirection_to_login(authenticated_page, screenshots_dir, Config.USERS[0]['username'])
+
+    # Logging out ends the server side session, so the cached state must not be reused
+    storage_state_cache.invalidate(Config.USERS[0]['username'])
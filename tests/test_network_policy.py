@@ -0,0 +1,93 @@
+"""
+Checks of the network policy: the decision of every profile per request, nothing attached for the empty
+profile, and the learned response sizes written to NETWORK_SIZES_FILE only when a size is new.
+"""
+# pytest tests/test_network_policy.py
+
+import json
+import types
+
+import pytest
+
+from config.config import Config
+from utils import network_policy
+from utils.network_policy import NetworkPolicy, save_known_sizes
+
+
+@pytest.fixture
+def sizes_file(monkeypatch, tmp_path):
+    path = tmp_path / 'network_sizes.json'
+    monkeypatch.setattr(Config, 'NETWORK_SIZES_FILE', str(path))
+    monkeypatch.setattr(network_policy, '_known_sizes', {})
+    monkeypatch.setattr(network_policy, '_known_sizes_loaded', False)
+    monkeypatch.setattr(network_policy, '_known_sizes_changed', False)
+    return path
+
+
+def response(url, content_length):
+    return types.SimpleNamespace(url=url, headers={'content-length': content_length})
+
+
+SITE = 'https://opensource-demo.orangehrmlive.com'
+
+
+@pytest.mark.parametrize('profile, url, resource_type, action', [
+    ('none', f"{SITE}/web/images/logo.png", 'image', None),
+    ('none', 'https://www.google-analytics.com/analytics.js', 'script', None),
+    ('lean', f"{SITE}/web/images/logo.png", 'image', 'block'),
+    ('lean', f"{SITE}/web/fonts/nunito.woff2", 'font', 'block'),
+    ('lean', f"{SITE}/web/dist/js/app.js", 'script', None),
+    ('lean', 'https://cdn.example.com/lib.js', 'script', None),
+    ('strict', f"{SITE}/web/images/logo.png", 'image', 'block'),
+    ('strict', 'https://cdn.example.com/lib.js', 'script', 'block'),
+    ('strict', f"{SITE}/web/dist/js/app.js", 'script', None),
+    ('strict', f"{SITE}/web/index.php/auth/validate", 'document', None),
+])
+def test_decide_per_profile(monkeypatch, sizes_file, profile, url, resource_type, action):
+    monkeypatch.setattr(Config, 'BASE_URL', f"{SITE}/web/index.php/auth/login")
+    assert NetworkPolicy(profile).decide(url, resource_type) == action
+
+
+def test_stub_patterns_answer_first_party_requests(monkeypatch, sizes_file):
+    monkeypatch.setattr(Config, 'BASE_URL', f"{SITE}/web/index.php/auth/login")
+    monkeypatch.setitem(Config.NETWORK_PROFILES, 'stubbed', {'stub_resource_types': ['stylesheet'],
+                                                             'stub_url_patterns': ['*/tracking/*']})
+    policy = NetworkPolicy('stubbed')
+    assert policy.decide(f"{SITE}/web/dist/css/app.css", 'stylesheet') == 'stub'
+    assert policy.decide(f"{SITE}/tracking/pixel", 'fetch') == 'stub'
+    assert policy.decide(f"{SITE}/web/index.php/dashboard/index", 'document') is None
+
+
+class FakeTarget:
+    def __init__(self):
+        self.handlers = []
+        self.routes = []
+
+    def on(self, event, handler):
+        self.handlers.append(event)
+
+    def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+
+def test_the_empty_profile_attaches_nothing(sizes_file):
+    target = FakeTarget()
+    NetworkPolicy('none').attach(target)
+    assert (target.handlers, target.routes) == ([], [])
+    NetworkPolicy('lean').attach(target)
+    assert (target.handlers, target.routes) == (['response'], ['**/*'])
+
+
+def test_sizes_are_saved_only_once_learned(sizes_file):
+    policy = NetworkPolicy('lean')
+    save_known_sizes()
+    assert not sizes_file.exists()
+
+    policy._learn_size(response('https://example.com/app.js', '2048'))
+    save_known_sizes()
+    assert json.loads(sizes_file.read_text()) == {'https://example.com/app.js': 2048}
+
+    sizes_file.unlink()
+    policy._learn_size(response('https://example.com/app.js', '2048'))
+    save_known_sizes()
+    assert not sizes_file.exists(), 'a size seen before is nothing new to write'
@@ -0,0 +1,188 @@
+"""
+Checks of the persistent browser profiles of the browser pool: one context per engine kept between flows,
+cookies and storage cleared in between, and the HTTP cache hits counted.
+"""
+# pytest tests/test_persistent_profile.py
+
+import os
+
+import pytest
+
+from config.config import Config
+from utils import browser_pool
+from utils.browser_pool import BrowserPool, add_flow_listener, format_pool_stats, profile_dir
+
+
+class FakeEmitter:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event, payload):
+        for handler in self.handlers.get(event, []):
+            handler(payload)
+
+    def remove_listener(self, event, handler):
+        self.handlers[event].remove(handler)
+
+
+class FakePage:
+    def __init__(self, context, url):
+        self.context = context
+        self.url = url
+        self.scripts = []
+
+    def evaluate(self, script):
+        self.scripts.append(script)
+
+    def close(self):
+        self.context.pages.remove(self)
+
+
+class FakeTracing:
+    def stop(self):
+        pass
+
+
+class FakeContext(FakeEmitter):
+    def __init__(self):
+        super().__init__()
+        self.pages = []
+        self.sessions = []
+        self.tracing = FakeTracing()
+        self.calls = []
+        self.browser = None
+
+    def new_page(self, url='about:blank'):
+        page = FakePage(self, url)
+        self.pages.append(page)
+        self.emit('page', page)
+        return page
+
+    def new_cdp_session(self, page):
+        session = FakeSession()
+        self.sessions.append(session)
+        return session
+
+    def clear_cookies(self):
+        self.calls.append('clear_cookies')
+
+    def clear_permissions(self):
+        self.calls.append('clear_permissions')
+
+    def unroute_all(self, behavior=None):
+        self.calls.append('unroute_all')
+
+    def close(self):
+        self.calls.append('close')
+
+
+class FakeSession(FakeEmitter):
+    def send(self, method):
+        self.sent = method
+
+
+class FakeBrowserType:
+    def __init__(self):
+        self.launches = []
+
+    def launch_persistent_context(self, user_data_dir, headless=True, **options):
+        self.launches.append(user_data_dir)
+        return FakeContext()
+
+
+class FakeBrowser:
+    def new_context(self, **options):
+        return FakeContext()
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'PERSISTENT_PROFILE', True)
+    monkeypatch.setattr(Config, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.delenv('PYTEST_XDIST_WORKER', raising=False)
+    pool = BrowserPool(ws_endpoints={})
+    browser_type = FakeBrowserType()
+    monkeypatch.setattr(pool, '_browser_type', lambda browser_name: browser_type)
+    monkeypatch.setattr(pool, 'acquire', lambda browser_name, headless=True: FakeBrowser())
+    monkeypatch.setattr(browser_pool, '_pool', pool)
+    pool.browser_type = browser_type
+    return pool
+
+
+def test_profile_dir_per_engine_mode_and_worker(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.delenv('PYTEST_XDIST_WORKER', raising=False)
+    assert profile_dir('firefox', headless=False) == os.path.join(str(tmp_path), 'firefox-headed')
+    monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw1')
+    assert profile_dir('chromium') == os.path.join(str(tmp_path), 'chromium-headless-gw1')
+
+
+def test_one_persistent_context_per_engine_cleared_between_flows(pool):
+    context = pool.new_context('chromium')
+    page = context.new_page(f"{Config.SITE_URL}/web/index.php/dashboard/index")
+    add_flow_listener(context, 'response', lambda response: None)
+    add_flow_listener(context, 'page', lambda page: None)
+    pool.release_context(context)
+
+    assert context.pages == []
+    assert page.scripts, 'local and session storage of the site are cleared'
+    assert context.handlers['response'] == []
+    assert len(context.handlers['page']) == 1, 'only the cache hit watcher of the pool is left'
+    assert 'close' not in context.calls
+    assert {'clear_cookies', 'clear_permissions', 'unroute_all'} <= set(context.calls)
+
+    assert pool.new_context('chromium') is context
+    assert pool.browser_type.launches == [profile_dir('chromium')]
+    stats = pool.stats['chromium/headless/profile']
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_a_second_flow_at_the_same_time_gets_a_fresh_context(pool):
+    context = pool.new_context('webkit')
+    other = pool.new_context('webkit')
+    assert other is not context
+    pool.release_context(other)
+    assert other.calls == ['close']
+    pool.release_context(context)
+    assert pool.new_context('webkit') is context
+
+
+def test_cache_hits_are_counted_on_chromium(pool):
+    context = pool.new_context('chromium')
+    context.new_page()
+    session = context.sessions[0]
+    session.emit('Network.requestServedFromCache', {'requestId': '1'})
+    session.emit('Network.responseReceived', {'requestId': '1', 'response': {}})
+    session.emit('Network.responseReceived', {'requestId': '2', 'response': {'fromDiskCache': True}})
+    session.emit('Network.responseReceived', {'requestId': '3', 'response': {'fromDiskCache': False}})
+    pool.release_context(context)
+
+    # The watcher of the pool stays registered once across flows
+    assert pool.new_context('chromium') is context
+    assert len(context.handlers['page']) == 1
+    context.new_page()
+    context.sessions[1].emit('Network.responseReceived', {'requestId': '4', 'response': {'fromDiskCache': True}})
+    pool.release_context(context)
+
+    stats = pool.stats['chromium/headless/profile']
+    assert (stats['responses'], stats['cache_hits']) == (4, 3)
+    assert '3 of 4 response(s) from the HTTP cache (75%)' in format_pool_stats(pool.stats)[0]
+
+
+def test_merged_stats_keep_the_cache_counts(pool):
+    pool.merge_stats({'chromium/headless/profile': {'hits': 2, 'misses': 1, 'launch_seconds': 0.5,
+                                                    'responses': 10, 'cache_hits': 8}})
+    pool.merge_stats({'chromium/headless/profile': {'hits': 1, 'misses': 1, 'launch_seconds': 0.5,
+                                                    'responses': 10, 'cache_hits': 9}})
+    assert pool.stats['chromium/headless/profile']['cache_hits'] == 17
+
+
+def test_new_contexts_without_persistent_profile(pool, monkeypatch):
+    monkeypatch.setattr(Config, 'PERSISTENT_PROFILE', False)
+    context = pool.new_context('chromium')
+    pool.release_context(context)
+    assert context.calls == ['close']
+    assert pool.browser_type.launches == []
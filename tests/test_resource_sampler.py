@@ -0,0 +1,126 @@
+"""
+Checks of the resource sampler: engines told from the browser command lines, samples summed per engine,
+the per engine and per step summary, step intervals kept per sampler, and the error without psutil.
+"""
+# pytest tests/test_resource_sampler.py
+
+import contextlib
+import types
+
+import pytest
+
+from utils import instrumentation, resource_sampler
+from utils.resource_sampler import ResourceSampler, build_summary, engine_of, format_summary
+
+MB = 2 ** 20
+
+
+class FakeProcess:
+    def __init__(self, pid, command_line, cpu, rss):
+        self.pid = pid
+        self.command_line = command_line
+        self.cpu = cpu
+        self.rss = rss
+
+    def cmdline(self):
+        return self.command_line
+
+    def cpu_percent(self, interval=None):
+        return self.cpu
+
+    def memory_info(self):
+        return types.SimpleNamespace(rss=self.rss)
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+
+def fake_psutil(children):
+    class NoSuchProcess(Exception):
+        pass
+
+    class Process:
+        def __init__(self, pid):
+            self.pid = pid
+
+        def children(self, recursive=False):
+            return children
+
+    return types.SimpleNamespace(Process=Process, NoSuchProcess=NoSuchProcess, AccessDenied=NoSuchProcess,
+                                 Error=Exception)
+
+
+def test_engine_of_reads_the_browser_build():
+    assert engine_of(['/root/.cache/ms-playwright/chromium-1124/chrome-linux/chrome', '--type=renderer']) == 'chromium'
+    assert engine_of(['/root/.cache/ms-playwright/chromium_headless_shell-1124/headless_shell']) == 'chromium'
+    assert engine_of(['/root/.cache/ms-playwright/firefox-1454/firefox/firefox', '-juggler-pipe']) == 'firefox'
+    assert engine_of(['/root/.cache/ms-playwright/webkit-2035/pw_run.sh']) == 'webkit'
+    assert engine_of(['node', '/site-packages/playwright/driver/package/cli.js', 'run-driver']) is None
+
+
+def test_sample_sums_the_processes_of_each_engine(monkeypatch):
+    children = [
+        FakeProcess(10, ['/ms-playwright/chromium-1124/chrome-linux/chrome'], 20.0, 100 * MB),
+        FakeProcess(11, ['/ms-playwright/chromium-1124/chrome-linux/chrome', '--type=renderer'], 30.0, 50 * MB),
+        FakeProcess(12, ['/ms-playwright/firefox-1454/firefox/firefox'], 5.0, 200 * MB),
+        FakeProcess(13, ['node', 'cli.js', 'run-driver'], 90.0, 80 * MB),
+    ]
+    monkeypatch.setattr(resource_sampler, 'psutil', fake_psutil(children))
+    sampler = ResourceSampler(interval=0.01, root_pid=1)
+    sampler.sample()
+    samples = {sample['engine']: sample for sample in sampler.samples}
+    assert set(samples) == {'chromium', 'firefox'}
+    assert samples['chromium']['cpu'] == 50.0
+    assert samples['chromium']['rss'] == 150 * MB
+    assert samples['chromium']['processes'] == 2
+    assert samples['firefox']['processes'] == 1
+
+
+def test_summary_per_engine_and_step():
+    samples = [
+        {'time': 1.0, 'engine': 'chromium', 'cpu': 10.0, 'rss': 100 * MB, 'processes': 2},
+        {'time': 2.0, 'engine': 'chromium', 'cpu': 50.0, 'rss': 300 * MB, 'processes': 3},
+        {'time': 2.0, 'engine': 'firefox', 'cpu': 20.0, 'rss': 400 * MB, 'processes': 1},
+    ]
+    intervals = [{'step': 'login', 'engine': 'chromium', 'start': 1.5, 'end': 2.5},
+                 {'step': 'navigate', 'engine': None, 'start': 0.5, 'end': 1.5}]
+    summary = build_summary(samples, intervals)
+
+    chromium = summary['by_engine']['chromium']
+    assert chromium['samples'] == 2
+    assert chromium['cpu_avg'] == 30.0 and chromium['cpu_peak'] == 50.0
+    assert chromium['rss_avg_mb'] == 200.0 and chromium['rss_peak_mb'] == 300.0
+    assert chromium['processes_peak'] == 3
+    # A step labelled with its engine only takes that engine's samples
+    assert set(summary['by_step']) == {'login/chromium', 'navigate/chromium'}
+    assert summary['by_step']['login/chromium']['cpu_peak'] == 50.0
+    assert len(format_summary(summary)) == 4
+
+
+def test_overlapping_and_unordered_steps_are_all_matched():
+    samples = [{'time': t, 'engine': 'webkit', 'cpu': t, 'rss': MB, 'processes': 1} for t in (4.0, 1.0, 3.0, 2.0)]
+    intervals = [{'step': 'logout', 'engine': None, 'start': 3.0, 'end': 4.0},
+                 {'step': 'flow', 'engine': None, 'start': 0.0, 'end': 5.0},
+                 {'step': 'login', 'engine': 'webkit', 'start': 1.0, 'end': 2.0}]
+    by_step = build_summary(samples, intervals)['by_step']
+    assert {step: usage['samples'] for step, usage in by_step.items()} == \
+        {'flow/webkit': 4, 'login/webkit': 2, 'logout/webkit': 2}
+
+
+def test_step_intervals_belong_to_the_sampler(monkeypatch):
+    monkeypatch.setattr(resource_sampler, 'psutil', fake_psutil([]))
+    first = ResourceSampler(interval=60).start()
+    assert first._record_step_interval in instrumentation._step_listeners
+    first._record_step_interval({'step': 'login', 'engine': 'chromium', 'wall': 0.5})
+    first.stop()
+    assert first._record_step_interval not in instrumentation._step_listeners
+
+    second = ResourceSampler(interval=60)
+    assert len(first.step_intervals) == 1 and second.step_intervals == []
+
+
+def test_without_psutil_the_sampler_refuses_to_start(monkeypatch):
+    monkeypatch.setattr(resource_sampler, 'psutil', None)
+    with pytest.raises(RuntimeError, match='psutil'):
+        ResourceSampler(interval=0.01).start()
+    assert build_summary([], []) == {'version': 1, 'by_engine': {}, 'by_step': {}}
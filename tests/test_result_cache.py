@@ -0,0 +1,113 @@
+"""
+Checks of the result cache keys, including the code deciding pass or fail, their TTL and the selection of
+the cases a change affects.
+"""
+# pytest tests/test_result_cache.py
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import utils.result_cache as result_cache
+from config.config import Config
+from utils.login_flow import LoginCase
+from utils.result_cache import ResultCache, case_key, case_modules, impacted_case_ids
+
+ADMIN = {'username': 'Admin', 'password': 'admin123', 'expected': None}
+WRONG_PASSWORD = {'username': 'Admin', 'password': 'wrong', 'expected': 'failure'}
+
+
+def test_logout_handlers_only_count_for_users_that_log_out():
+    config_case = LoginCase('chromium', True, 'config', 1, ADMIN)
+    failure_case = LoginCase('chromium', True, 'json', 1, WRONG_PASSWORD)
+
+    assert 'modules/perform_logout.py' in case_modules(config_case)
+    assert 'modules/perform_login_with_config_data.py' in case_modules(config_case)
+    assert 'modules/perform_logout.py' not in case_modules(failure_case)
+    # Imported files belong to the handlers that import them, also those of utils/ and config/
+    assert 'modules/selectors.py' in case_modules(failure_case)
+    assert 'utils/wait_policy.py' in case_modules(config_case)
+    assert 'config/config.py' in case_modules(failure_case)
+
+
+def test_key_changes_with_the_inputs_of_the_case(monkeypatch):
+    case = LoginCase('chromium', True, 'config', 1, ADMIN)
+    key = case_key(case)
+
+    assert case_key(LoginCase('chromium', True, 'config', 2, ADMIN)) == key
+    assert case_key(case._replace(engine='firefox')) != key
+    assert case_key(case._replace(user={**ADMIN, 'password': 'other'})) != key
+    monkeypatch.setattr(Config, 'BASE_URL', 'http://127.0.0.1:1/web/index.php/auth/login')
+    assert case_key(case) != key
+
+
+def test_handler_fingerprint_ignores_comments(tmp_path, monkeypatch):
+    (tmp_path / 'modules').mkdir()
+    handler = tmp_path / 'modules' / 'handler.py'
+    monkeypatch.setattr(result_cache, 'PROJECT_DIR', str(tmp_path))
+    fingerprints = []
+    for source in ("x = 1\n", "# the answer\nx = 1  # still one\n", "x = 2\n"):
+        handler.write_text(source)
+        result_cache._parse.cache_clear()
+        result_cache.module_fingerprint.cache_clear()
+        fingerprints.append(result_cache.module_fingerprint('modules/handler.py'))
+    result_cache._parse.cache_clear()
+    result_cache.module_fingerprint.cache_clear()
+
+    assert fingerprints[0] == fingerprints[1] != fingerprints[2]
+
+
+@pytest.mark.parametrize('path', result_cache.CASE_RUNNER_FILES)
+def test_key_changes_with_the_code_deciding_the_result(path, tmp_path, monkeypatch):
+    case = LoginCase('chromium', True, 'json', 1, WRONG_PASSWORD)
+    key = case_key(case)
+    assert path not in case_modules(case)
+
+    # The same project, with an edit to the file that asserts the expected outcome
+    for relative in set(case_modules(case)) | set(result_cache.CASE_RUNNER_FILES):
+        copy = tmp_path / relative
+        copy.parent.mkdir(parents=True, exist_ok=True)
+        copy.write_text((Path(result_cache.PROJECT_DIR) / relative).read_text(encoding='utf-8'), encoding='utf-8')
+    with (tmp_path / path).open('a', encoding='utf-8') as edited:
+        edited.write("\nEXPECTED_OUTCOMES = ('success',)\n")
+    monkeypatch.setattr(result_cache, 'PROJECT_DIR', str(tmp_path))
+    result_cache._parse.cache_clear()
+    result_cache.module_fingerprint.cache_clear()
+    try:
+        assert case_key(case) != key
+    finally:
+        result_cache._parse.cache_clear()
+        result_cache.module_fingerprint.cache_clear()
+
+
+def test_cached_passes_expire_after_the_ttl(tmp_path):
+    path = str(tmp_path / 'results.json')
+    cache = ResultCache(path, ttl_hours=1)
+    cache.store('fresh', 'tests/test_login_matrix.py::test_login_logout[a]')
+    cache.store('old', 'tests/test_login_matrix.py::test_login_logout[b]')
+    cache.entries['old']['passed_at'] = time.time() - 2 * 3600
+    cache.save()
+
+    reloaded = ResultCache(path, ttl_hours=1)
+    assert reloaded.passed_at('fresh') is not None
+    assert reloaded.passed_at('old') is None
+    assert 'old' not in reloaded.entries
+
+
+@pytest.mark.parametrize('changed, expected', [
+    (['modules/perform_logout.py'], {'config-case'}),
+    (['modules/selectors.py'], {'config-case', 'json-case'}),
+    (['utils/wait_policy.py'], {'config-case'}),
+    (['test_data/json_login_data.json'], {'json-case'}),
+    (['test_data/users.csv'], {'config-case'}),
+    (['README.md'], None),
+    (['utils/login_flow.py'], None),
+])
+def test_changes_select_the_cases_using_the_changed_files(changed, expected, monkeypatch):
+    monkeypatch.setattr(LoginCase, 'id', property(lambda case: f"{case.source}-case"))
+    monkeypatch.setattr(Config, 'USERS_FILE', os.path.join(result_cache.PROJECT_DIR, 'test_data', 'users.csv'))
+    cases = [LoginCase('chromium', True, 'config', 1, ADMIN),
+             LoginCase('chromium', True, 'json', 1, WRONG_PASSWORD)]
+    assert impacted_case_ids(cases, changed) == expected
@@ -0,0 +1,77 @@
+"""
+Checks of the screenshot service with a fake page: what each capture policy captures, and flush()
+waiting for the background writes.
+"""
+# pytest tests/test_screenshot_service.py
+
+import time
+
+import pytest
+
+from utils.screenshot_service import ScreenshotService
+
+
+class FakePage:
+    def __init__(self):
+        self.captures = 0
+
+    def screenshot(self, **options):
+        self.captures += 1
+        return b'png'
+
+
+@pytest.fixture
+def service_for():
+    services = []
+
+    def create(policy, first_n=2):
+        service = ScreenshotService(policy=policy, first_n=first_n, image_type='png', max_workers=2)
+        services.append(service)
+        return service
+
+    yield create
+    for service in services:
+        service.close()
+
+
+def capture_users(service, page, screenshots_dir, users):
+    return [service.capture(page, str(screenshots_dir), f"after_login_{user}.png", user=user) is not None
+            for user in users]
+
+
+def test_always_captures_everything(service_for, tmp_path):
+    service, page = service_for('always'), FakePage()
+    assert capture_users(service, page, tmp_path, ['a', 'b', 'c']) == [True, True, True]
+    assert page.captures == 3
+
+
+def test_on_failure_captures_only_failures(service_for, tmp_path):
+    service, page = service_for('on_failure'), FakePage()
+    assert capture_users(service, page, tmp_path, ['a', 'b']) == [False, False]
+    assert service.capture(page, str(tmp_path), 'error.png', failure=True) is not None
+    assert (page.captures, service.stats['skipped']) == (1, 2)
+
+
+def test_first_n_captures_the_first_users_of_each_directory(service_for, tmp_path):
+    service, page = service_for('first_n', first_n=2), FakePage()
+    assert capture_users(service, page, tmp_path / 'chromium', ['a', 'b', 'c', 'a', 'c']) == [
+        True, True, False, True, False]
+    # Every directory counts its own users, and failures are always captured
+    assert capture_users(service, page, tmp_path / 'firefox', ['c']) == [True]
+    assert service.capture(page, str(tmp_path / 'chromium'), 'error.png', user='c', failure=True) is not None
+    assert service.should_capture('chromium', user=None) is False
+
+
+def test_flush_waits_for_the_background_writes(service_for, tmp_path, monkeypatch):
+    service = service_for('always')
+    write = service._write
+
+    def slow_write(path, data):
+        time.sleep(0.05)
+        return write(path, data)
+
+    monkeypatch.setattr(service, '_write', slow_write)
+    capture_users(service, FakePage(), tmp_path, ['a', 'b', 'c'])
+    service.flush()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['after_login_a.png', 'after_login_b.png',
+                                                                 'after_login_c.png']
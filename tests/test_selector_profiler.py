@@ -0,0 +1,96 @@
+"""
+Checks of the selector profiler: the measuring hooks and the slow/ambiguous flags of the report.
+"""
+# pytest tests/test_selector_profiler.py
+
+import pytest
+
+from config.config import Config
+from utils.concurrency import run_coroutine
+from utils.selector_profiler import (_wrap_locator_method, _wrap_locator_method_async, build_report, format_report,
+                                     reset_selector_records, selector_records)
+
+
+class FakeLocator:
+    def __init__(self, selector, matches):
+        self._selector = selector
+        self.matches = matches
+        self.calls = []
+
+    def count(self):
+        self.calls.append('count')
+        return self.matches
+
+    def click(self):
+        self.calls.append('click')
+
+    def wait_for(self):
+        self.calls.append('wait_for')
+
+
+class FakeAsyncLocator:
+    def __init__(self, selector, matches):
+        self._selector = selector
+        self.matches = matches
+
+    async def count(self):
+        return self.matches
+
+    async def click(self):
+        pass
+
+
+_wrap_locator_method(FakeLocator, 'click')
+_wrap_locator_method(FakeLocator, 'wait_for')
+_wrap_locator_method_async(FakeAsyncLocator, 'click')
+
+
+@pytest.fixture
+def profiling(monkeypatch):
+    monkeypatch.setattr(Config, 'PROFILE_SELECTORS', True)
+    reset_selector_records()
+    yield
+    reset_selector_records()
+
+
+def test_clicks_are_measured_before_and_waits_after_the_action(profiling):
+    button = FakeLocator('button[type="submit"]', 1)
+    button.click()
+    menu = FakeLocator('span.oxd-userdropdown-tab', 1)
+    menu.wait_for()
+
+    assert button.calls == ['count', 'click']
+    assert menu.calls == ['wait_for', 'count']
+    assert [(record['selector'], record['action'], record['matches']) for record in selector_records()] == [
+        ('button[type="submit"]', 'click', 1), ('span.oxd-userdropdown-tab', 'wait_for', 1)]
+
+
+def test_async_locators_are_measured(profiling):
+    run_coroutine(FakeAsyncLocator('span i', 3).click())
+    assert [(record['selector'], record['matches']) for record in selector_records()] == [('span i', 3)]
+
+
+def test_nothing_is_measured_when_profiling_is_off(monkeypatch):
+    monkeypatch.setattr(Config, 'PROFILE_SELECTORS', False)
+    reset_selector_records()
+    button = FakeLocator('button[type="submit"]', 1)
+    button.click()
+    assert button.calls == ['click']
+    assert selector_records() == []
+
+
+def test_report_flags_slow_and_ambiguous_selectors():
+    records = [
+        {'selector': 'span i', 'action': 'click', 'resolve': 0.004, 'matches': 5},
+        {'selector': 'input[name="username"]', 'action': 'fill', 'resolve': 0.003, 'matches': 1},
+        {'selector': "text='Invalid credentials'", 'action': 'wait_for', 'resolve': 0.2, 'matches': 1},
+        {'selector': "text='Invalid credentials'", 'action': 'wait_for', 'resolve': 0.3, 'matches': 1},
+    ]
+    report = build_report(records, slow_ms=100)
+
+    assert report['selectors']['span i']['flags'] == ['ambiguous']
+    assert report['selectors']["text='Invalid credentials'"]['flags'] == ['slow']
+    assert report['selectors']['input[name="username"]']['flags'] == []
+    lines = format_report(report)
+    assert lines[-1].startswith('input[name="username"]: 1 resolve(s)')
+    assert 'span i: 1 resolve(s)' in lines[0] and lines[0].endswith('5 match(es) [ambiguous]')
@@ -0,0 +1,51 @@
+"""
+Checks of the shard planner: longest cases first onto the least loaded shard, and merging shard results.
+"""
+# pytest tests/test_sharding.py
+
+import pytest
+
+from utils.sharding import merge_histories, merge_junit, parse_shard, plan_shards, save_history, update_history
+
+
+def test_shards_are_balanced_by_history():
+    history = {f"t{number}": {'seconds': seconds, 'runs': 3}
+               for number, seconds in enumerate([8, 7, 6, 5, 4, 3, 2, 1])}
+    shards = plan_shards(sorted(history), history, 2)
+
+    assert [shard['seconds'] for shard in shards] == [18, 18]
+    assert sorted(sum((shard['nodeids'] for shard in shards), [])) == sorted(history)
+    # The plan only depends on ids and history, so it is the same in any collection order
+    assert plan_shards(sorted(history, reverse=True), history, 2) == shards
+
+
+def test_cases_without_history_get_the_median_estimate():
+    history = {'slow': {'seconds': 10, 'runs': 1}, 'fast': {'seconds': 2, 'runs': 1}}
+    shards = plan_shards(['slow', 'fast', 'new'], history, 3)
+    assert {shard['seconds'] for shard in shards} == {10, 6, 2}
+
+
+def test_parse_shard():
+    assert parse_shard('2/3') == (2, 3)
+    with pytest.raises(ValueError):
+        parse_shard('4/3')
+    with pytest.raises(ValueError):
+        parse_shard('first')
+
+
+def test_histories_and_reports_of_shards_merge(tmp_path):
+    first = update_history({'a': {'seconds': 1.0, 'runs': 1}, 'b': {'seconds': 1.0, 'runs': 1}}, {'a': 3.0})
+    second = update_history({'a': {'seconds': 1.0, 'runs': 1}, 'b': {'seconds': 1.0, 'runs': 1}}, {'b': 5.0})
+    save_history(first, str(tmp_path / 'first.json'))
+    save_history(second, str(tmp_path / 'second.json'))
+
+    merged = merge_histories([str(tmp_path / 'first.json'), str(tmp_path / 'second.json')])
+    assert merged == {'a': {'seconds': 2.0, 'runs': 2}, 'b': {'seconds': 3.0, 'runs': 2}}
+
+    for number, failures in ((1, 0), (2, 1)):
+        (tmp_path / f"shard-{number}.xml").write_text(
+            f'<testsuites><testsuite name="pytest" tests="2" failures="{failures}" errors="0" skipped="0" '
+            f'time="1.5"><testcase name="t{number}"/></testsuite></testsuites>')
+    report = merge_junit([str(tmp_path / 'shard-1.xml'), str(tmp_path / 'shard-2.xml')]).getroot()
+    assert report.get('tests') == '4' and report.get('failures') == '1' and report.get('time') == '3.000'
+    assert len(report.findall('testsuite')) == 2
@@ -0,0 +1,57 @@
+"""
+Login/logout flow against the local stand-in server, plus checks of its latency and error injection.
+These tests run offline and do not depend on the public demo site.
+"""
+# pytest tests/test_stand_in_server.py
+
+import os
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from config.config import Config
+from modules.navigate_to_login_page import handle_navigate_to_login_page
+from modules.perform_login_with_config_data import handle_perform_login_with_config_data
+from modules.perform_logout import handle_perform_logout
+from modules.perform_logout_redirection_to_login import handle_perform_logout_redirection_to_login
+from utils.stand_in_server import LOGIN_PATH, StandInServer
+from utils.wait_policy import wait_for_error_banner
+
+
+def test_login_and_logout_on_stand_in(page, stand_in_site):
+    """A valid user reaches the dashboard and is redirected to the login page after logout."""
+    screenshots_dir = os.path.join('screenshots', 'stand_in')
+    os.makedirs(screenshots_dir, exist_ok=True)
+
+    handle_navigate_to_login_page(page)
+    handle_perform_login_with_config_data(page, 'Admin', 'admin123')
+    assert page.url == Config.DASHBOARD_URL
+
+    handle_perform_logout(page)
+    handle_perform_logout_redirection_to_login(page, screenshots_dir, 'Admin')
+    assert page.url == Config.BASE_URL
+
+
+def test_invalid_credentials_on_stand_in(page, stand_in_site):
+    """An invalid user stays on the login page and sees the error message."""
+    handle_navigate_to_login_page(page)
+    handle_perform_login_with_config_data(page, 'invalid_user', 'invalid_password')
+
+    assert page.url == Config.BASE_URL
+    assert wait_for_error_banner(page), "Expected error message not found."
+
+
+def test_injected_latency_and_errors():
+    """Route faults delay or fail only the configured route."""
+    faults = {'login': {'latency_ms': 300}, 'dashboard': {'error_rate': 1}}
+    with StandInServer(faults=faults) as server:
+        start = time.perf_counter()
+        with urllib.request.urlopen(server.url + LOGIN_PATH) as response:
+            assert response.status == 200
+        assert time.perf_counter() - start >= 0.3
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(server.url + '/web/index.php/dashboard/index')
+        assert error.value.code == 503
@@ -0,0 +1,22 @@
+"""
+Checks that cached sessions are kept apart per site under test.
+"""
+# pytest tests/test_storage_state_cache.py
+
+import os
+
+from config.config import Config
+from utils.storage_state_cache import StorageStateCache
+
+
+def test_sessions_are_cached_per_site(monkeypatch, tmp_path):
+    cache = StorageStateCache(cache_dir=str(tmp_path))
+    monkeypatch.setattr(Config, 'SITE_URL', 'https://opensource-demo.orangehrmlive.com')
+    demo_path = cache.path_for('Admin')
+    os.makedirs(os.path.dirname(demo_path))
+    open(demo_path, 'w').close()
+    assert cache.is_fresh('Admin')
+
+    monkeypatch.setattr(Config, 'SITE_URL', 'http://127.0.0.1:8123')
+    assert cache.path_for('Admin') == os.path.join(str(tmp_path), '127.0.0.1_8123', 'Admin.json')
+    assert not cache.is_fresh('Admin')
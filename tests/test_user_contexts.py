@@ -0,0 +1,97 @@
+"""
+Checks of the per-user contexts without a browser: every user runs in a context of its own, and a user
+whose flow or context fails gets a failed result while the others still run.
+"""
+# pytest tests/test_user_contexts.py
+
+import pytest
+
+from config.config import Config
+from utils import user_contexts
+from utils.concurrency import run_coroutine
+from utils.screenshot_service import get_screenshot_service
+from utils.user_contexts import run_users_in_contexts
+
+USERS = [{'username': name, 'password': 'secret'} for name in ('alice', 'bob', 'carol', 'dave')]
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+
+    async def screenshot(self, **options):
+        return b'png'
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, failing_calls=()):
+        self.contexts = []
+        self.calls = 0
+        self.failing_calls = failing_calls
+
+    async def new_context(self, **options):
+        self.calls += 1
+        if self.calls in self.failing_calls:
+            raise RuntimeError('Target page, context or browser has been closed')
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+@pytest.fixture(autouse=True)
+def quiet_run(monkeypatch):
+    monkeypatch.setattr(Config, 'NETWORK_PROFILE', 'none')
+    monkeypatch.setattr(Config, 'FLIGHT_RECORDER', False)
+    monkeypatch.setattr(Config, 'ADAPTIVE_CONCURRENCY', False)
+    monkeypatch.setattr(Config, 'CIRCUIT_BREAKER_THRESHOLD', 0)
+
+
+def test_each_user_runs_in_its_own_context(monkeypatch, tmp_path):
+    pages = {}
+
+    async def flow(page, user, screenshots_dir, group=None):
+        pages[user['username']] = page
+        if user['username'] == 'bob':
+            raise AssertionError('Expected error message not found.')
+
+    monkeypatch.setattr(user_contexts, 'perform_user_flow', flow)
+    browser = FakeBrowser()
+    results = run_coroutine(run_users_in_contexts(browser, iter(USERS), str(tmp_path), max_concurrency=2))
+
+    assert len({id(page.context) for page in pages.values()}) == len(USERS)
+    assert all(context.closed for context in browser.contexts)
+    assert [(result['username'], result['status']) for result in results] == [
+        ('alice', 'passed'), ('bob', 'failed'), ('carol', 'passed'), ('dave', 'passed')]
+    assert results[1]['error'] == 'AssertionError: Expected error message not found.'
+    get_screenshot_service().flush()
+    assert (tmp_path / '0002_bob' / 'error.png').exists()
+
+
+def test_a_context_that_cannot_be_created_fails_only_its_user(monkeypatch, tmp_path):
+    async def flow(page, user, screenshots_dir, group=None):
+        pass
+
+    monkeypatch.setattr(user_contexts, 'perform_user_flow', flow)
+    browser = FakeBrowser(failing_calls=(1,))
+    results = run_coroutine(run_users_in_contexts(browser, USERS, str(tmp_path), max_concurrency=2))
+
+    assert [result['status'] for result in results] == ['failed', 'passed', 'passed', 'passed']
+    assert results[0]['error'].startswith('RuntimeError: Target page, context or browser has been closed')
+    assert len(browser.contexts) == 3 and all(context.closed for context in browser.contexts)
@@ -0,0 +1,78 @@
+"""
+Checks of the condition based waits with fake locators: the time and outcome of every wait, the error
+banner returning False on a timeout, and the summary per wait label.
+"""
+# pytest tests/test_wait_policy.py
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from utils.wait_policy import (ERROR_BANNER_SELECTOR, format_wait_summary, reset_wait_records, timed_wait,
+                               wait_for_error_banner, wait_for_visible, wait_summary)
+
+
+class FakeLocator:
+    def __init__(self, visible=True):
+        self.visible = visible
+        self.waits = []
+
+    def wait_for(self, state, timeout):
+        self.waits.append((state, timeout))
+        if not self.visible:
+            raise PlaywrightTimeoutError(f"Locator.wait_for: Timeout {timeout}ms exceeded.")
+
+
+class FakePage:
+    def __init__(self, banner_visible):
+        self.banner = FakeLocator(banner_visible)
+        self.selectors = []
+
+    def locator(self, selector):
+        self.selectors.append(selector)
+        return self.banner
+
+
+@pytest.fixture(autouse=True)
+def fresh_records():
+    reset_wait_records()
+    yield
+    reset_wait_records()
+
+
+def test_timed_wait_records_met_and_timed_out_waits():
+    with timed_wait('dashboard'):
+        pass
+    with pytest.raises(PlaywrightTimeoutError):
+        with timed_wait('dashboard'):
+            raise PlaywrightTimeoutError("Timeout 10ms exceeded.")
+
+    entry = wait_summary()['dashboard']
+    assert (entry['count'], entry['timeouts']) == (2, 1)
+    assert entry['max'] <= entry['total']
+
+
+def test_wait_for_visible_passes_the_timeout_and_raises_on_timeout():
+    wait_for_visible(FakeLocator(), 'menu', timeout=250)
+    with pytest.raises(PlaywrightTimeoutError):
+        wait_for_visible(FakeLocator(visible=False), 'menu', timeout=250)
+    assert wait_summary()['menu']['timeouts'] == 1
+
+
+def test_error_banner_returns_false_instead_of_raising():
+    shown, missing = FakePage(banner_visible=True), FakePage(banner_visible=False)
+    assert wait_for_error_banner(shown, timeout=100)
+    assert not wait_for_error_banner(missing, timeout=100)
+    assert missing.selectors == [ERROR_BANNER_SELECTOR]
+    assert missing.banner.waits == [('visible', 100)]
+
+    entry = wait_summary()['error banner']
+    assert (entry['count'], entry['timeouts']) == (2, 1)
+
+
+def test_summary_lines_put_the_most_costly_wait_first():
+    summary = {'menu': {'count': 2, 'total': 0.2, 'max': 0.15, 'timeouts': 0},
+               'error banner': {'count': 1, 'total': 5.0, 'max': 5.0, 'timeouts': 1}}
+    assert format_wait_summary(summary) == [
+        "Wait 'error banner': 1 time(s), 5.00s total, 5.00s max, 1 timeout(s)",
+        "Wait 'menu': 2 time(s), 0.20s total, 0.15s max, 0 timeout(s)",
+    ]
@@ -0,0 +1,142 @@
+"""
+Content-addressed store for screenshots and other run artifacts.
+
+Every capture is hashed (sha256) and stored once under blobs/<first two hex digits>/<digest>.<ext>,
+however many users, engines or steps produced the same image. A manifest maps each
+(engine, user, step) to its blob. Each process writes its own manifest file, so engine workers never
+contend for one file; load_manifest() merges them. Manifests carry the run id of the log pipeline
+(LOG_RUN_ID), so a store kept between builds still packs one run: the latest by default, or --run.
+
+# python -m utils.artifact_store pack artifacts artifacts.tar.gz
+# python -m utils.artifact_store pack artifacts artifacts.tar.gz --run 20261018-130041-4242
+# python -m utils.artifact_store stats artifacts
+"""
+import argparse
+import hashlib
+import json
+import os
+import tarfile
+import threading
+import time
+
+from config.config import Config
+from utils.log_pipeline import run_id
+
+
+class ArtifactStore:
+    def __init__(self, root=None):
+        self.root = root or Config.ARTIFACT_STORE_DIR
+        self.manifest_path = os.path.join(self.root, 'manifests', f"{os.getpid()}-{int(time.time() * 1000)}.json")
+        self.blobs = {}
+        self.entries = []
+        self.stats = {'puts': 0, 'new_blobs': 0, 'bytes_written': 0, 'bytes_deduplicated': 0}
+        self._lock = threading.Lock()
+
+    def blob_path(self, digest: str, ext: str):
+        return os.path.join(self.root, 'blobs', digest[:2], f"{digest}.{ext}")
+
+    def put(self, data: bytes, engine: str, user, step: str, ext='png'):
+        """Store the data once and record it for (engine, user, step); returns the digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest, ext)
+        with self._lock:
+            self.stats['puts'] += 1
+            self.entries.append([engine, user, step, digest])
+            self.blobs[digest] = {'size': len(data), 'ext': ext}
+
+        if os.path.exists(path):
+            with self._lock:
+                self.stats['bytes_deduplicated'] += len(data)
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Another worker may write the same blob at the same time; the content is identical either way
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as blob_file:
+            blob_file.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            self.stats['new_blobs'] += 1
+            self.stats['bytes_written'] += len(data)
+        return digest
+
+    def save_manifest(self):
+        """Write the manifest of this process."""
+        with self._lock:
+            manifest = {'version': 1, 'run': run_id(), 'created': time.time(), 'blobs': dict(self.blobs),
+                        'entries': list(self.entries)}
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with open(self.manifest_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, separators=(',', ':'))
+        return self.manifest_path
+
+
+def _iter_manifests(root: str):
+    manifests_dir = os.path.join(root, 'manifests')
+    if not os.path.isdir(manifests_dir):
+        return
+    for filename in sorted(os.listdir(manifests_dir)):
+        if filename.endswith('.json'):
+            with open(os.path.join(manifests_dir, filename)) as manifest_file:
+                yield json.load(manifest_file)
+
+
+def latest_run(root: str):
+    """Run id of the newest manifest in the store, or None when there is none."""
+    newest = max(_iter_manifests(root), key=lambda manifest: manifest.get('created', 0), default=None)
+    return newest.get('run') if newest else None
+
+
+def load_manifest(root: str, run=None):
+    """Merge the manifests of every process that wrote to the store, of ``run`` only if given."""
+    merged = {'version': 1, 'blobs': {}, 'entries': []}
+    for manifest in _iter_manifests(root):
+        if run is not None and manifest.get('run') != run:
+            continue
+        merged['blobs'].update(manifest['blobs'])
+        merged['entries'].extend(manifest['entries'])
+    return merged
+
+
+def pack(root: str, archive_path: str, run=None):
+    """Pack the blobs and one merged manifest (of ``run`` if given) into a single gzip compressed tar archive."""
+    manifest = load_manifest(root, run)
+    merged_path = os.path.join(root, 'manifest.json')
+    with open(merged_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, separators=(',', ':'))
+
+    with tarfile.open(archive_path, 'w:gz') as archive:
+        archive.add(merged_path, arcname='manifest.json')
+        for digest, blob in sorted(manifest['blobs'].items()):
+            archive.add(os.path.join(root, 'blobs', digest[:2], f"{digest}.{blob['ext']}"),
+                        arcname=f"blobs/{digest[:2]}/{digest}.{blob['ext']}")
+    return archive_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or pack the content-addressed artifact store.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    pack_parser = subparsers.add_parser('pack', help='pack a run into one .tar.gz archive')
+    pack_parser.add_argument('root')
+    pack_parser.add_argument('archive')
+    runs = pack_parser.add_mutually_exclusive_group()
+    runs.add_argument('--run', help='id of the run to pack (default: the latest run)')
+    runs.add_argument('--all-runs', action='store_true', help='pack the artifacts of every run in the store')
+    stats_parser = subparsers.add_parser('stats', help='show how much deduplication saved')
+    stats_parser.add_argument('root')
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        run = None if args.all_runs else args.run or latest_run(args.root)
+        print(f"Packed {pack(args.root, args.archive, run)} ({os.path.getsize(args.archive) / 1024:.1f} KiB)")
+    else:
+        manifest = load_manifest(args.root)
+        sizes = {digest: blob['size'] for digest, blob in manifest['blobs'].items()}
+        total = sum(sizes[entry[3]] for entry in manifest['entries'])
+        stored = sum(sizes.values())
+        print(f"{len(manifest['entries'])} artifact(s) in {len(sizes)} blob(s): "
+              f"{stored / 1024:.1f} KiB stored for {total / 1024:.1f} KiB captured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from playwright.async_api import async_playwright
+
+from utils.concurrency import AdaptiveConcurrency, run_coroutine
+from utils.health import CircuitBreaker, ensure_site_up
+from utils.instrumentation import step_labels
+from utils.screenshot_service import get_screenshot_service
+from utils.user_contexts import run_user_in_context
+
+logger = logging.getLogger(__name__)
+
+
+def iter_flows(browser_names, users):
+    """Yield (browser_name, index, user) for every user on every browser, one user at a time."""
+    for index, user in enumerate(users, start=1):
+        for browser_name in browser_names:
+            yield browser_name, index, user
+
+
+async def run_flows(flows, headless=True, max_concurrency=12, screenshots_root='screenshots'):
+    """
+    Interleave many login/logout flows on the current event loop.
+
+    ``flows`` yields (browser_name, index, user). Every engine is launched once, on first use,
+    and every flow runs in its own browser context, with at most ``max_concurrency`` flows in flight
+    (fewer while the adaptive concurrency controller holds them back). An engine that fails to launch
+    fails its own flows only; the other engines keep running.
+    """
+    browsers = {}
+    launch_errors = {}
+    launch_locks = {}
+    pending_flows = iter(flows)
+    results = []
+    breaker = CircuitBreaker()
+    controller = AdaptiveConcurrency(max_concurrency)
+
+    async with async_playwright() as playwright:
+
+        async def get_browser(browser_name):
+            # Flows waiting for the same engine share a single launch
+            lock = launch_locks.setdefault(browser_name, asyncio.Lock())
+            async with lock:
+                if browser_name in launch_errors:
+                    raise launch_errors[browser_name]
+                if browser_name not in browsers:
+                    try:
+                        if browser_name not in ('chromium', 'firefox', 'webkit'):
+                            raise ValueError(f"Unsupported browser: {browser_name}")
+                        logger.info(f"Launching {browser_name} browser, headless={headless}")
+                        browsers[browser_name] = await getattr(playwright, browser_name).launch(headless=headless)
+                    except Exception as e:
+                        logger.error(f"Could not launch {browser_name}: {str(e)}")
+                        launch_errors[browser_name] = e
+                        raise
+            return browsers[browser_name]
+
+        async def worker():
+            for browser_name, index, user in pending_flows:
+                screenshots_dir = os.path.join(screenshots_root, browser_name)
+                os.makedirs(screenshots_dir, exist_ok=True)
+                # Once the breaker is open no further engine gets launched
+                async with controller.slot():
+                    try:
+                        browser = None if breaker.open else await get_browser(browser_name)
+                    except Exception as e:
+                        result = {'index': index, 'username': user['username'], 'status': 'failed',
+                                  'error': f"{type(e).__name__}: {e}", 'infrastructure': False,
+                                  'screenshots_dir': screenshots_dir, 'duration': 0.0}
+                    else:
+                        with step_labels(engine=browser_name):
+                            result = await run_user_in_context(browser, index, user, screenshots_dir, breaker)
+                result['browser_name'] = browser_name
+                results.append(result)
+
+        try:
+            with controller:
+                await asyncio.gather(*(worker() for _ in range(controller.maximum)))
+        finally:
+            for browser in browsers.values():
+                await browser.close()
+
+    return sorted(results, key=lambda result: (result['index'], result['browser_name']))
+
+
+def run_async_matrix(browser_names, users, headless=True, max_concurrency=12):
+    """Run every user on every browser from a single thread and event loop and return the results."""
+    ensure_site_up()
+    start = time.perf_counter()
+    results = run_coroutine(run_flows(iter_flows(browser_names, users), headless=headless,
+                                      max_concurrency=max_concurrency))
+    get_screenshot_service().flush()
+
+    failed = sum(1 for result in results if result['status'] == 'failed')
+    skipped = sum(1 for result in results if result['status'] == 'skipped')
+    logger.info(f"{len(results)} flow(s) on {', '.join(browser_names)} in {time.perf_counter() - start:.1f}s, "
+                f"{failed} failed, {skipped} skipped, at most {max_concurrency} concurrent, "
+                f"{threading.active_count()} Python thread(s)")
+    return results
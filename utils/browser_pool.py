@@ -0,0 +1,252 @@
+"""
+Pool of warm browsers shared by every test module of a pytest process (or pytest-xdist worker).
+
+Browsers are launched lazily, one per (engine, headless) pair, and handed out again on later requests
+instead of each module starting its own Playwright and browser. Tests isolate themselves with a new
+context per flow. The Python Playwright API has no launch_server(), so to share browsers between
+processes start a Playwright server outside of pytest and list its websocket endpoints in
+BROWSER_WS_ENDPOINTS (e.g. "chromium=ws://127.0.0.1:3000/"); the pool then connect()s to it.
+
+With PERSISTENT_PROFILE=1, new_context() hands out one persistent context per engine instead, launched
+with launch_persistent_context() on PROFILE_DIR/<engine>-<mode>, so the HTTP disk cache (the site's
+JS/CSS bundles) survives from one user to the next and from one run to the next. Cookies, permissions
+and local/session storage are cleared whenever the context is handed out or released, which keeps users
+isolated. Flows listen to the context through add_flow_listener(), which lets release_context() remove
+their handlers again. Cache hits are counted on chromium (through CDP) and show up in the pool stats.
+Routing a context through a network profile turns the browser's cache off, so use it with
+NETWORK_PROFILE=none.
+"""
+import logging
+import os
+import time
+
+from playwright.sync_api import Error as PlaywrightError, sync_playwright
+
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+CLEAR_STORAGE_SCRIPT = "() => { localStorage.clear(); sessionStorage.clear(); }"
+
+
+def parse_ws_endpoints(value: str):
+    """Parse "chromium=ws://...,firefox=ws://..." into a dict."""
+    endpoints = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        browser_name, _, endpoint = item.partition('=')
+        endpoints[browser_name.strip()] = endpoint.strip()
+    return endpoints
+
+
+def format_pool_stats(stats: dict):
+    """Return one summary line per pooled browser."""
+    lines = []
+    for key, entry in sorted(stats.items()):
+        requests = entry['hits'] + entry['misses']
+        line = (f"{key}: {requests} request(s), {entry['hits']} hit(s), {entry['misses']} miss(es), "
+                f"{entry['launch_seconds']:.2f}s launching")
+        if entry.get('responses'):
+            line += (f", {entry['cache_hits']} of {entry['responses']} response(s) from the HTTP cache "
+                     f"({entry['cache_hits'] / entry['responses']:.0%})")
+        lines.append(line)
+    return lines
+
+
+class BrowserPool:
+    def __init__(self, ws_endpoints=None):
+        self.ws_endpoints = parse_ws_endpoints(Config.BROWSER_WS_ENDPOINTS) if ws_endpoints is None else ws_endpoints
+        self.stats = {}
+        self._playwright = None
+        self._browsers = {}
+        self._profiles = {}
+        self._profiles_in_use = set()
+        self._flow_listeners = {}
+
+    def _stats_for(self, key: str):
+        return self.stats.setdefault(key, {'hits': 0, 'misses': 0, 'launch_seconds': 0.0})
+
+    def _browser_type(self, browser_name: str):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        return getattr(self._playwright, browser_name)
+
+    def acquire(self, browser_name: str, headless=True):
+        """Return a connected browser for the engine, launching (or connecting) it on first use."""
+        if browser_name not in ('chromium', 'firefox', 'webkit'):
+            raise ValueError(f"Unsupported browser: {browser_name}")
+
+        key = f"{browser_name}/{'headless' if headless else 'headed'}"
+        stats = self._stats_for(key)
+        browser = self._browsers.get(key)
+        if browser is not None and browser.is_connected():
+            stats['hits'] += 1
+            return browser
+
+        stats['misses'] += 1
+        browser_type = self._browser_type(browser_name)
+
+        start = time.perf_counter()
+        if browser_name in self.ws_endpoints:
+            logger.info(f"Connecting to {browser_name} browser at {self.ws_endpoints[browser_name]}")
+            browser = browser_type.connect(self.ws_endpoints[browser_name])
+        else:
+            logger.info(f"Launching {browser_name} browser, headless={headless}")
+            browser = browser_type.launch(headless=headless)
+        stats['launch_seconds'] += time.perf_counter() - start
+
+        self._browsers[key] = browser
+        return browser
+
+    def new_context(self, browser_name: str, headless=True, **context_options):
+        """
+        Return a context for one flow: a new context of the pooled browser, or with PERSISTENT_PROFILE the
+        engine's persistent context, cleared. Hand it back with release_context() instead of closing it.
+        """
+        if not Config.PERSISTENT_PROFILE:
+            return self.acquire(browser_name, headless=headless).new_context(**context_options)
+
+        key = f"{browser_name}/{'headless' if headless else 'headed'}/profile"
+        if key in self._profiles_in_use:
+            # A persistent profile can be open only once; a second flow at the same time gets a fresh context
+            return self.acquire(browser_name, headless=headless).new_context(**context_options)
+        stats = self._stats_for(key)
+        context = self._profiles.get(key)
+        if context is not None:
+            stats['hits'] += 1
+        else:
+            if browser_name not in ('chromium', 'firefox', 'webkit'):
+                raise ValueError(f"Unsupported browser: {browser_name}")
+            stats['misses'] += 1
+            user_data_dir = profile_dir(browser_name, headless)
+            logger.info(f"Launching {browser_name} with the persistent profile {user_data_dir}, headless={headless}")
+            start = time.perf_counter()
+            # The context options only apply to the launch; later flows share the context as it is
+            context = self._browser_type(browser_name).launch_persistent_context(
+                user_data_dir, headless=headless, **context_options)
+            stats['launch_seconds'] += time.perf_counter() - start
+            self._profiles[key] = context
+            if browser_name == 'chromium':
+                self._count_cache_hits(context, stats)
+        # Cookies of an earlier run are stored in the profile too
+        context.clear_cookies()
+        self._profiles_in_use.add(key)
+        return context
+
+    def _count_cache_hits(self, context, stats: dict):
+        """Count the responses of every page of the context and those chromium served from its cache."""
+        stats.setdefault('responses', 0)
+        stats.setdefault('cache_hits', 0)
+
+        def watch(page):
+            served_from_cache = set()
+            session = context.new_cdp_session(page)
+            session.on('Network.requestServedFromCache', lambda event: served_from_cache.add(event['requestId']))
+            session.on('Network.responseReceived', lambda event: count(event, served_from_cache))
+            session.send('Network.enable')
+
+        def count(event, served_from_cache):
+            stats['responses'] += 1
+            if event['requestId'] in served_from_cache or event['response'].get('fromDiskCache'):
+                stats['cache_hits'] += 1
+
+        context.on('page', watch)
+
+    def _profile_key(self, context):
+        return next((key for key, profile in self._profiles.items() if profile is context), None)
+
+    def track_listener(self, context, event: str, handler):
+        """Remember a flow's handler on a persistent context so release_context() can remove it."""
+        key = self._profile_key(context)
+        if key is not None:
+            self._flow_listeners.setdefault(key, []).append((event, handler))
+
+    def release_context(self, context):
+        """Close a context from new_context(); a persistent one is cleared and kept for the next flow."""
+        key = self._profile_key(context)
+        if key is None:
+            context.close()
+            return
+        for page in context.pages:
+            try:
+                if page.url.startswith(Config.SITE_URL):
+                    page.evaluate(CLEAR_STORAGE_SCRIPT)
+            except PlaywrightError as e:
+                logger.debug(f"Could not clear the storage of {page.url}: {str(e)}")
+            page.close()
+        try:
+            # Tracing a flow started (the flight recorder) must not carry over to the next one
+            context.tracing.stop()
+        except PlaywrightError:
+            pass
+        context.unroute_all(behavior='ignoreErrors')
+        for event, handler in self._flow_listeners.pop(key, []):
+            context.remove_listener(event, handler)
+        context.clear_cookies()
+        context.clear_permissions()
+        self._profiles_in_use.discard(key)
+
+    def merge_stats(self, stats: dict):
+        """Add the stats of a pool that lived in another process (e.g. an engine matrix worker)."""
+        for key, other in stats.items():
+            entry = self._stats_for(key)
+            for name, value in other.items():
+                entry[name] = entry.get(name, 0) + value
+
+    def close(self):
+        """Close every persistent context and pooled browser and stop Playwright."""
+        for context in self._profiles.values():
+            try:
+                context.close()
+            except Exception as e:
+                logger.warning(f"Error while closing persistent context: {str(e)}")
+        self._profiles.clear()
+        self._profiles_in_use.clear()
+        self._flow_listeners.clear()
+        for browser in self._browsers.values():
+            try:
+                browser.close()
+            except Exception as e:
+                logger.warning(f"Error while closing pooled browser: {str(e)}")
+        self._browsers.clear()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+def profile_dir(browser_name: str, headless=True):
+    """user_data_dir of the engine's persistent profile; pytest-xdist workers get one each."""
+    name = f"{browser_name}-{'headless' if headless else 'headed'}"
+    if os.environ.get('PYTEST_XDIST_WORKER'):
+        name += f"-{os.environ['PYTEST_XDIST_WORKER']}"
+    return os.path.abspath(os.path.join(Config.PROFILE_DIR, name))
+
+
+def add_flow_listener(target, event: str, handler):
+    """
+    Listen to an event of a page or context for one flow. On a persistent context of the pool the
+    handler is removed again when the context is released, so it never sees the next flow's events.
+    """
+    target.on(event, handler)
+    if _pool is not None:
+        _pool.track_listener(target, event, handler)
+
+
+def get_browser_pool():
+    """Return the browser pool of this process, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
+
+
+def close_browser_pool():
+    """Close the pool of this process and return its stats."""
+    global _pool
+    if _pool is None:
+        return {}
+    stats = _pool.stats
+    _pool.close()
+    _pool = None
+    return stats
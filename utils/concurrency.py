@@ -0,0 +1,186 @@
+"""
+Adaptive concurrency for the runners that drive many browser contexts on one event loop.
+
+With ADAPTIVE_CONCURRENCY=1 the async runner and run_users_in_contexts start CONCURRENCY_START flows
+at a time and adjust the limit every CONCURRENCY_WINDOW handler steps (additive increase,
+multiplicative decrease):
+- back off to half when a step timed out, when the p95 of a step grew more than
+  CONCURRENCY_LATENCY_TOLERANCE over its p95 at the lowest concurrency seen, when a step's p95 uses
+  more than half of WAIT_TIMEOUT, when less than CONCURRENCY_MIN_FREE_MB of memory is left or when
+  the load per core is above CONCURRENCY_MAX_LOAD;
+- otherwise allow one more flow, up to the machine limit (CPU cores and available memory, at
+  CONTEXT_MEMORY_MB per context) and the ASYNC_CONCURRENCY / USER_CONCURRENCY setting.
+The limit it settled on is logged at the end of the run. Without ADAPTIVE_CONCURRENCY the configured
+number of flows runs at once, as before.
+
+The runners enter asyncio through run_coroutine(): the sync Playwright of the browser pool keeps an
+event loop running on the main thread for the whole session, so there it moves to a worker thread.
+# ADAPTIVE_CONCURRENCY=1 EXECUTION_MODE=async python -m utils.login_flow --source json
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+
+from config.config import Config
+from utils.instrumentation import add_step_listener, remove_step_listener
+from utils.stats import percentile
+
+try:
+    import psutil
+except ImportError:  # optional, /proc/meminfo is read instead
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# A step whose p95 takes more than this share of WAIT_TIMEOUT is close to timing out
+TIMEOUT_HEADROOM = 0.5
+
+
+def run_coroutine(coroutine):
+    """asyncio.run() the coroutine; on a fresh loop in a worker thread when this thread already runs an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    outcome = {}
+    context = contextvars.copy_context()
+
+    def run():
+        try:
+            outcome['result'] = context.run(asyncio.run, coroutine)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, name='asyncio-runner')
+    thread.start()
+    thread.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def available_memory_mb():
+    """Memory available to new processes in MB, or None when it cannot be told."""
+    if psutil is not None:
+        return psutil.virtual_memory().available / 2 ** 20
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def load_per_core():
+    """One minute load average divided by the number of cores, or None where there is no load average."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+def machine_limit():
+    """How many contexts the machine can hold: two per core, and no more than the available memory allows."""
+    limit = 2 * (os.cpu_count() or 1)
+    memory = available_memory_mb()
+    if memory is not None:
+        limit = min(limit, int(memory // Config.CONTEXT_MEMORY_MB))
+    return max(1, limit)
+
+
+class AdaptiveConcurrency:
+    """Limit of the flows in flight on one event loop; adjusted from the step timings when adaptive."""
+
+    def __init__(self, max_concurrency: int, adaptive=None):
+        self.adaptive = Config.ADAPTIVE_CONCURRENCY if adaptive is None else adaptive
+        self.maximum = max(1, max_concurrency)
+        if self.adaptive:
+            self.maximum = min(self.maximum, machine_limit())
+            self.limit = min(max(1, Config.CONCURRENCY_START), self.maximum)
+        else:
+            self.limit = self.maximum
+        self.peak = self.limit
+        self.back_offs = 0
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+        self._window = {}
+        self._window_size = 0
+        self._timed_out = False
+        self._baseline = {}
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait until fewer than ``limit`` flows are in flight and hold a place for one flow."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                # A raised limit is picked up here too, since steps only end inside flows
+                self._condition.notify_all()
+
+    def observe(self, record):
+        """Step listener: collect the step timings and adjust the limit once a window is full."""
+        if 'Timeout' in record['status']:
+            self._timed_out = True
+        self._window.setdefault(record['step'], []).append(record['wall'])
+        self._window_size += 1
+        if self._window_size >= max(Config.CONCURRENCY_WINDOW, self.limit):
+            self._adjust()
+
+    def _degradation(self):
+        """Why the current limit is too high, or None."""
+        if self._timed_out:
+            return 'a step timed out'
+        for step, walls in self._window.items():
+            p95 = percentile(walls, 95)
+            if p95 * 1000 > TIMEOUT_HEADROOM * Config.WAIT_TIMEOUT:
+                return f"{step} p95 {p95 * 1000:.0f}ms is close to the {Config.WAIT_TIMEOUT}ms timeout"
+            baseline = self._baseline.get(step)
+            if baseline is not None and p95 > baseline * (1 + Config.CONCURRENCY_LATENCY_TOLERANCE):
+                return f"{step} p95 {p95 * 1000:.0f}ms against {baseline * 1000:.0f}ms"
+        memory = available_memory_mb()
+        if memory is not None and memory < Config.CONCURRENCY_MIN_FREE_MB:
+            return f"{memory:.0f}MB of memory left"
+        load = load_per_core()
+        if load is not None and load > Config.CONCURRENCY_MAX_LOAD:
+            return f"load {load:.2f} per core"
+        return None
+
+    def _adjust(self):
+        reason = self._degradation()
+        if reason is not None:
+            self.limit = max(1, self.limit // 2)
+            self.back_offs += 1
+            logger.warning(f"Backing off to {self.limit} concurrent flow(s): {reason}")
+        else:
+            # The fastest p95 seen so far is what a step costs without contention
+            for step, walls in self._window.items():
+                p95 = percentile(walls, 95)
+                self._baseline[step] = min(self._baseline.get(step, p95), p95)
+            if self.limit < self.maximum:
+                self.limit += 1
+                self.peak = max(self.peak, self.limit)
+                logger.info(f"Raising to {self.limit} concurrent flow(s)")
+        self._window = {}
+        self._window_size = 0
+        self._timed_out = False
+
+    def __enter__(self):
+        if self.adaptive:
+            add_step_listener(self.observe)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.adaptive:
+            remove_step_listener(self.observe)
+            logger.info(f"Adaptive concurrency settled on {self.limit} concurrent flow(s) "
+                        f"(peak {self.peak}, upper bound {self.maximum}, {self.back_offs} back-off(s))")
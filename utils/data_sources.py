@@ -0,0 +1,155 @@
+"""
+Streaming sources of login test users.
+
+Users are read one row at a time from JSON Lines (.jsonl, .ndjson), CSV (.csv) or JSON (.json) files,
+so corpora with hundreds of thousands of rows never sit in memory as a whole. JSON files may hold a
+top-level array or an object with a "users" array, like test_data/json_login_data.json; they are
+parsed incrementally with ijson when it is installed, otherwise with json.JSONDecoder.raw_decode
+over fixed size chunks. Every row is validated as it goes by.
+"""
+import csv
+import json
+import logging
+import os
+import re
+
+from config.config import Config
+
+try:
+    import ijson
+except ImportError:  # optional, faster incremental JSON parsing
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+EXPECTED_VALUES = ('success', 'failure')
+
+CHUNK_SIZE = 64 * 1024
+
+_SEPARATORS = re.compile(r'[\s,]*')
+
+
+class DataSourceError(ValueError):
+    """A data file that cannot be read, or a row that is not a valid user."""
+
+
+def validate_user(row, where: str, require_expected=True):
+    """Return the row as a user dict, or raise DataSourceError naming ``where`` (file and row)."""
+    if not isinstance(row, dict):
+        raise DataSourceError(f"{where}: expected an object with username and password, got {type(row).__name__}")
+    for field in ('username', 'password'):
+        if not isinstance(row.get(field), str):
+            raise DataSourceError(f"{where}: '{field}' is missing or not a string")
+    # Empty CSV cells count as missing
+    expected = row.get('expected') or None
+    if expected is None and require_expected:
+        raise DataSourceError(f"{where}: 'expected' is missing")
+    if expected is not None and expected not in EXPECTED_VALUES:
+        raise DataSourceError(f"{where}: 'expected' must be one of {', '.join(EXPECTED_VALUES)}, got {expected!r}")
+    return {**row, 'expected': expected}
+
+
+def _iter_json_lines(data_file, path: str):
+    for line_number, line in enumerate(data_file, start=1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                raise DataSourceError(f"{path} line {line_number}: {e.msg}") from e
+
+
+def _iter_csv(data_file, path: str):
+    reader = csv.DictReader(data_file)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _iter_json_array(data_file, path: str):
+    """Yield the items of the first array in the file (the top-level one, or "users"), one at a time."""
+    if ijson is not None:
+        first = data_file.read(1)
+        while first.isspace():
+            first = data_file.read(1)
+        data_file.seek(0)
+        prefix = 'item' if first == '[' else 'users.item'
+        yield from enumerate(ijson.items(data_file.buffer, prefix), start=1)
+        return
+
+    decoder = json.JSONDecoder()
+    buffer = ''
+    while '[' not in buffer:
+        chunk = data_file.read(CHUNK_SIZE)
+        if not chunk:
+            raise DataSourceError(f"{path}: no JSON array found")
+        buffer += chunk
+    buffer = buffer[buffer.index('[') + 1:]
+    position = 0
+    item_number = 0
+    at_end_of_file = False
+    while True:
+        position = _SEPARATORS.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            if position == len(buffer):
+                raise json.JSONDecodeError('Incomplete item', buffer, position)
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            # The item may continue in the next chunk
+            if at_end_of_file:
+                raise DataSourceError(f"{path} item {item_number + 1}: {e.msg}") from e
+            chunk = data_file.read(CHUNK_SIZE)
+            at_end_of_file = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        item_number += 1
+        yield item_number, item
+
+
+_READERS = {
+    '.jsonl': _iter_json_lines,
+    '.ndjson': _iter_json_lines,
+    '.csv': _iter_csv,
+    '.json': _iter_json_array,
+}
+
+
+def iter_users(path: str, require_expected=True, skip_invalid=False):
+    """
+    Lazily yield validated users from a .jsonl, .ndjson, .csv or .json file.
+
+    Invalid rows raise DataSourceError, or are logged and skipped with ``skip_invalid``.
+    """
+    reader = _READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise DataSourceError(f"{path}: unsupported data file type, use one of {', '.join(_READERS)}")
+    with open(path, newline='' if reader is _iter_csv else None, encoding='utf-8') as data_file:
+        for row_number, row in reader(data_file, path):
+            try:
+                yield validate_user(row, f"{path} row {row_number}", require_expected)
+            except DataSourceError as e:
+                if not skip_invalid:
+                    raise
+                logger.warning(f"Skipping invalid user: {str(e)}")
+
+
+def iter_user_shard(path: str, index: int, count: int, **options):
+    """Yield every ``count``-th user of the file, starting with row ``index``; shards 0..count-1 cover it all."""
+    for row_number, user in enumerate(iter_users(path, **options)):
+        if row_number % count == index:
+            yield user
+
+
+def config_users():
+    """Users of the config data runners: streamed from USERS_FILE when set, otherwise Config.USERS."""
+    if Config.USERS_FILE:
+        yield from iter_users(Config.USERS_FILE, require_expected=False)
+        return
+    for number, user in enumerate(Config.USERS, start=1):
+        yield validate_user(user, f"Config.USERS entry {number}", require_expected=False)
+
+
+def login_data_users():
+    """Users of the JSON data runners, streamed from LOGIN_DATA_FILE."""
+    return iter_users(Config.LOGIN_DATA_FILE)
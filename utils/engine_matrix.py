@@ -0,0 +1,124 @@
+import logging
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.browser_pool import close_browser_pool, get_browser_pool
+from utils.health import CircuitBreaker, CircuitOpenError
+from utils.log_pipeline import setup_logging, stop_logging
+from utils.instrumentation import merge_step_records, step_labels, step_records
+
+logger = logging.getLogger(__name__)
+
+
+class _RecordCollector(logging.Handler):
+    """Keep the log records of a worker process so the parent can replay them."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append({
+            'created': record.created,
+            'name': record.name,
+            'levelno': record.levelno,
+            'message': record.getMessage(),
+        })
+
+
+def _run_engine_in_worker(run_engine, browser_name: str, headless: bool):
+    """Run one engine inside a worker process and return its result and captured logs."""
+    # The worker writes its own log file; the collected records are replayed in the parent for display only
+    root_logger = logging.getLogger()
+    collector = _RecordCollector()
+    root_logger.handlers = [collector]
+    root_logger.setLevel(logging.INFO)
+    # A stable file name per engine, so the files of earlier runs are rotated instead of piling up
+    setup_logging(console=False, worker=f"engine-{browser_name}")
+
+    start = time.perf_counter()
+    result = {'browser_name': browser_name, 'status': 'passed', 'error': None}
+    try:
+        with step_labels(engine=browser_name):
+            run_engine(browser_name, headless)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+    finally:
+        # The pool dies with the worker; hand its stats and step timings back to the parent
+        result['pool_stats'] = close_browser_pool()
+        result['step_records'] = step_records()
+        stop_logging()
+    result['duration'] = time.perf_counter() - start
+    result['logs'] = collector.records
+    return result
+
+
+def _replay_logs(results):
+    """Re-emit the worker log records in time order through the parent's handlers."""
+    records = [record for result in results for record in result.pop('logs', [])]
+    for record in sorted(records, key=lambda r: r['created']):
+        log_record = logging.LogRecord(record['name'], record['levelno'], __file__, 0, record['message'], None, None)
+        log_record.created = record['created']
+        log_record.replayed = True
+        log_record.msecs = (record['created'] - int(record['created'])) * 1000
+        logging.getLogger(record['name']).handle(log_record)
+
+
+def run_engine_matrix(run_engine, browser_names, headless=True, workers=3, spawn=False):
+    """
+    Run ``run_engine(browser_name, headless)`` for every browser, one worker process per engine.
+
+    ``run_engine`` must be a module level function so it can be pickled into the workers.
+    With ``workers`` set to 1 the engines run one after another in the current process, unless
+    ``spawn`` asks for the worker processes anyway (e.g. to measure them with a single engine).
+    Returns one result dict per browser with its status, error and duration.
+    """
+    workers = max(1, min(workers, len(browser_names)))
+    logger.info(f"Running {', '.join(browser_names)} with {workers} worker(s), headless={headless}")
+    start = time.perf_counter()
+
+    if workers == 1 and not spawn:
+        results = []
+        # Engines that run one after another stop being launched once the site keeps failing
+        breaker = CircuitBreaker()
+        for browser_name in browser_names:
+            engine_start = time.perf_counter()
+            result = {'browser_name': browser_name, 'status': 'passed', 'error': None}
+            try:
+                breaker.check()
+                with step_labels(engine=browser_name):
+                    run_engine(browser_name, headless)
+            except CircuitOpenError as e:
+                breaker.record(e)
+                result['status'] = 'skipped'
+                result['error'] = str(e)
+            except Exception as e:
+                breaker.record(e)
+                result['status'] = 'failed'
+                result['error'] = f"{type(e).__name__}: {e}"
+            else:
+                breaker.record()
+            result['duration'] = time.perf_counter() - engine_start
+            results.append(result)
+    else:
+        # "spawn" keeps the workers free of any Playwright state from the parent and
+        # behaves the same on the Windows Jenkins agent and the Linux Azure agents.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [executor.submit(_run_engine_in_worker, run_engine, browser_name, headless)
+                       for browser_name in browser_names]
+            results = [future.result() for future in futures]
+        _replay_logs(results)
+        for result in results:
+            get_browser_pool().merge_stats(result.pop('pool_stats'))
+            merge_step_records(result.pop('step_records'))
+
+    for result in results:
+        logger.info(f"{result['browser_name']}: {result['status']} in {result['duration']:.1f}s")
+        if result.get('traceback'):
+            logger.error(f"{result['browser_name']} failed:\n{result['traceback']}")
+    logger.info(f"Engine matrix finished in {time.perf_counter() - start:.1f}s")
+    return results
@@ -0,0 +1,210 @@
+"""
+Failure-triggered flight recorder for browser contexts.
+
+With FLIGHT_RECORDER=1 every context that runs a login case keeps a bounded ring buffer
+(FLIGHT_RECORDER_EVENTS entries) of console messages, page errors, responses, failed requests,
+navigations and handler steps, and runs Playwright tracing in chunks: one chunk per case, with DOM
+snapshots only when FLIGHT_RECORDER_TRACE=snapshots. Nothing is written while cases pass; a passing
+chunk is dropped. When a case raises (an exception or a failed assertion), its trace chunk, the
+buffer and the error land in FLIGHT_RECORDER_DIR/<case>-<time>/, and with FLIGHT_RECORDER_VIDEO=1
+the context's video is kept too (videos of passing contexts are deleted once the context closed).
+Open a trace with:
+# playwright show-trace flight_recordings/<case>-<time>/trace.zip
+"""
+import collections
+import contextvars
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from config.config import Config
+from utils.browser_pool import add_flow_listener
+from utils.instrumentation import add_step_listener
+
+logger = logging.getLogger(__name__)
+
+TRACE_MODES = ('off', 'actions', 'snapshots')
+
+# Hidden directory the contexts record their videos into until the recorder keeps or deletes them
+VIDEO_DIR_NAME = '.videos'
+
+_current_recorder = contextvars.ContextVar('flight_recorder', default=None)
+_recorders = {}
+
+
+def _record_step(record):
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add('step', step=record['step'], status=record['status'], wall=round(record['wall'], 3))
+
+
+def recorder_context_options():
+    """Options for browser.new_context(): a video directory when FLIGHT_RECORDER_VIDEO is on."""
+    if Config.FLIGHT_RECORDER and Config.FLIGHT_RECORDER_VIDEO:
+        return {'record_video_dir': os.path.join(Config.FLIGHT_RECORDER_DIR, VIDEO_DIR_NAME)}
+    return {}
+
+
+class FlightRecorder:
+    """Ring buffer and chunked tracing of one browser context (sync or async API)."""
+
+    def __init__(self, context, capacity=None, trace_mode=None, output_dir=None):
+        self.context = context
+        self.events = collections.deque(maxlen=capacity or Config.FLIGHT_RECORDER_EVENTS)
+        self.trace_mode = trace_mode or Config.FLIGHT_RECORDER_TRACE
+        if self.trace_mode not in TRACE_MODES:
+            raise ValueError(f"Unknown trace mode: {self.trace_mode}, use one of {', '.join(TRACE_MODES)}")
+        self.output_dir = output_dir or Config.FLIGHT_RECORDER_DIR
+        self.failure_dirs = []
+        self.videos = set()
+        self.tracing = False
+        add_step_listener(_record_step)
+        add_flow_listener(context, 'page', self._attach_page)
+        for page in context.pages:
+            self._attach_page(page)
+
+    def add(self, kind: str, **details):
+        self.events.append({'time': time.time(), 'kind': kind, **details})
+
+    def _attach_page(self, page):
+        # Handlers only read event properties, so they never wait on the browser
+        page.on('console', lambda message: self.add('console', type=message.type, text=message.text))
+        page.on('pageerror', lambda error: self.add('pageerror', message=error.message))
+        page.on('response', lambda response: self.add('response', method=response.request.method,
+                                                       url=response.url, status=response.status))
+        page.on('requestfailed', lambda request: self.add('requestfailed', method=request.method, url=request.url,
+                                                          failure=request.failure))
+        page.on('framenavigated', self._on_navigation)
+
+    def _on_navigation(self, frame):
+        if frame.parent_frame is None:
+            self.add('navigation', url=frame.url)
+
+    def _trace_options(self):
+        return {'screenshots': False, 'snapshots': self.trace_mode == 'snapshots', 'sources': False}
+
+    def _failure_dir(self, name: str):
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', name) or 'case'
+        path = os.path.join(self.output_dir, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        os.makedirs(path, exist_ok=True)
+        self.failure_dirs.append(path)
+        return path
+
+    def _write_events(self, failure_dir: str, name: str, error):
+        with open(os.path.join(failure_dir, 'events.json'), 'w') as events_file:
+            json.dump({'case': name, 'error': f"{type(error).__name__}: {error}", 'events': list(self.events)},
+                      events_file, indent=2)
+        logger.error(f"Flight recorder: {name} failed, recording saved to {failure_dir}")
+
+    def _note_video(self, page):
+        if page.video is not None:
+            self.videos.add(page.video.path())
+
+    @contextmanager
+    def case(self, name: str, page=None):
+        """Record one case; its trace chunk and the buffer are written only if the block raises."""
+        if self.trace_mode != 'off':
+            if not self.tracing:
+                self.context.tracing.start(**self._trace_options())
+                self.tracing = True
+            self.context.tracing.start_chunk(title=name)
+        self.add('case', name=name)
+        token = _current_recorder.set(self)
+        try:
+            yield self
+        except BaseException as e:
+            failure_dir = self._failure_dir(name)
+            if self.trace_mode != 'off':
+                self.context.tracing.stop_chunk(path=os.path.join(failure_dir, 'trace.zip'))
+            self._write_events(failure_dir, name, e)
+            raise
+        else:
+            if self.trace_mode != 'off':
+                self.context.tracing.stop_chunk()
+        finally:
+            _current_recorder.reset(token)
+            if page is not None:
+                self._note_video(page)
+
+    @asynccontextmanager
+    async def case_async(self, name: str, page=None):
+        """Async version of case."""
+        if self.trace_mode != 'off':
+            if not self.tracing:
+                await self.context.tracing.start(**self._trace_options())
+                self.tracing = True
+            await self.context.tracing.start_chunk(title=name)
+        self.add('case', name=name)
+        token = _current_recorder.set(self)
+        try:
+            yield self
+        except BaseException as e:
+            failure_dir = self._failure_dir(name)
+            if self.trace_mode != 'off':
+                await self.context.tracing.stop_chunk(path=os.path.join(failure_dir, 'trace.zip'))
+            self._write_events(failure_dir, name, e)
+            raise
+        else:
+            if self.trace_mode != 'off':
+                await self.context.tracing.stop_chunk()
+        finally:
+            _current_recorder.reset(token)
+            if page is not None and page.video is not None:
+                self.videos.add(await page.video.path())
+
+    def finish(self):
+        """Keep the videos of a context with a failed case and delete the others; call after the context closed."""
+        for video in self.videos:
+            if not os.path.exists(video):
+                continue
+            if self.failure_dirs:
+                shutil.move(video, os.path.join(self.failure_dirs[-1], os.path.basename(video)))
+            else:
+                os.remove(video)
+        self.videos.clear()
+
+
+def get_flight_recorder(context):
+    """Return the recorder of the context, attaching one on first use."""
+    recorder = _recorders.get(id(context))
+    if recorder is None or recorder.context is not context:
+        recorder = _recorders[id(context)] = FlightRecorder(context)
+    return recorder
+
+
+@contextmanager
+def record_case(page, name: str):
+    """Record the case running on ``page`` when FLIGHT_RECORDER is on; a no-op otherwise."""
+    if not Config.FLIGHT_RECORDER:
+        yield
+        return
+    with get_flight_recorder(page.context).case(name, page):
+        yield
+
+
+@asynccontextmanager
+async def record_case_async(page, name: str):
+    """Async version of record_case."""
+    if not Config.FLIGHT_RECORDER:
+        yield
+        return
+    async with get_flight_recorder(page.context).case_async(name, page):
+        yield
+
+
+def finish_flight_recorder(context):
+    """Settle the videos of a closed context and forget its recorder."""
+    recorder = _recorders.pop(id(context), None)
+    if recorder is not None:
+        recorder.finish()
+
+
+def close_flight_recorders():
+    """Settle every recorder left, e.g. at the end of the pytest session."""
+    for recorder in list(_recorders.values()):
+        recorder.finish()
+    _recorders.clear()
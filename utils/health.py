@@ -0,0 +1,173 @@
+"""
+Pre-flight probe of the target site and a circuit breaker for infrastructure failures.
+
+ensure_site_up() sends one plain HTTP request to Config.BASE_URL before any browser is launched and
+raises SiteUnavailableError when the site cannot be reached or answers with a 5xx, so an outage costs
+seconds instead of every user on every engine timing out in turn. The result is cached per URL for
+the life of the process.
+
+A CircuitBreaker counts consecutive infrastructure failures (connection errors, 5xx, and navigation
+timeouts while a fresh probe of the site fails too) and opens after Config.CIRCUIT_BREAKER_THRESHOLD
+of them; the remaining users and engines are then skipped instead of run. Assertion failures and
+locator or expect timeouts mean the site answered, so they are counted apart and close the streak again.
+# python -m utils.health
+# python -m utils.health --url https://staging.example.com/web/index.php/auth/login
+"""
+import argparse
+import logging
+import re
+import time
+import urllib.error
+import urllib.request
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from config.config import Config
+from utils.log_pipeline import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Playwright and handler error messages that point at the site or network rather than at the test
+_INFRASTRUCTURE_MESSAGE = re.compile(
+    r'net::ERR_|NS_ERROR_|Could not connect|Connection refused|Connection reset|HTTP 5\d\d', re.IGNORECASE)
+
+# Playwright timeouts of a page load rather than of a locator or expect
+_NAVIGATION_TIMEOUT = re.compile(
+    r'\b(Page|Frame)\.(goto|reload|go_back|go_forward|wait_for_url|wait_for_load_state|expect_navigation):|'
+    r'navigating to|waiting for navigation', re.IGNORECASE)
+
+_probe_results = {}
+_circuit_breaker = None
+
+
+class SiteUnavailableError(ConnectionError):
+    """The target site failed the pre-flight probe, or too many flows in a row failed on infrastructure."""
+
+
+class CircuitOpenError(SiteUnavailableError):
+    """Raised for the flows skipped while the circuit breaker is open."""
+
+
+def probe_site(url=None, timeout=None):
+    """Request ``url`` (default Config.BASE_URL) once; any answer below 500 counts as up."""
+    url = url or Config.BASE_URL
+    result = {'url': url, 'ok': False, 'status': None, 'error': None}
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout or Config.HEALTH_TIMEOUT) as response:
+            result['status'] = response.status
+    except urllib.error.HTTPError as e:
+        result['status'] = e.code
+    except (urllib.error.URLError, OSError) as e:
+        result['error'] = str(getattr(e, 'reason', e))
+    result['seconds'] = time.perf_counter() - start
+    result['ok'] = result['status'] is not None and result['status'] < 500
+    return result
+
+
+def describe_probe(result):
+    return result['error'] or f"HTTP {result['status']}"
+
+
+def ensure_site_up(url=None):
+    """Raise SiteUnavailableError unless ``url`` passed its probe; probes each URL once per process."""
+    url = url or Config.BASE_URL
+    if not Config.HEALTH_CHECK:
+        return
+    if url not in _probe_results:
+        result = _probe_results[url] = probe_site(url)
+        logger.info(f"Pre-flight probe of {url}: {describe_probe(result)} "
+                    f"in {result['seconds'] * 1000:.0f}ms")
+    result = _probe_results[url]
+    if not result['ok']:
+        raise SiteUnavailableError(f"{url} is unavailable ({describe_probe(result)})")
+
+
+def reset_probe_results():
+    _probe_results.clear()
+
+
+def is_infrastructure_failure(error):
+    """
+    Tell failures of the site or network (connection errors, 5xx) from real test failures. A timeout
+    only counts when a page load timed out and a fresh probe of Config.BASE_URL fails as well; a
+    locator or expect timeout means the site answered without what the test looked for.
+    """
+    if error is None or isinstance(error, AssertionError):
+        return False
+    if isinstance(error, PlaywrightTimeoutError):
+        return bool(_NAVIGATION_TIMEOUT.search(str(error))) and not probe_site()['ok']
+    if isinstance(error, TimeoutError):
+        return not probe_site()['ok']
+    if isinstance(error, ConnectionError):
+        return True
+    return bool(_INFRASTRUCTURE_MESSAGE.search(str(error)))
+
+
+class CircuitBreaker:
+    """Open after ``threshold`` consecutive infrastructure failures; a threshold of 0 never opens."""
+
+    def __init__(self, threshold=None):
+        self.threshold = Config.CIRCUIT_BREAKER_THRESHOLD if threshold is None else threshold
+        self.consecutive = 0
+        self.last_error = None
+        self.stats = {'passed': 0, 'failed': 0, 'infrastructure': 0, 'skipped': 0}
+
+    @property
+    def open(self):
+        return 0 < self.threshold <= self.consecutive
+
+    def record(self, error=None, infrastructure=None):
+        """
+        Count the outcome of one flow: None for a pass, otherwise the exception it raised.
+        ``infrastructure`` passes an is_infrastructure_failure() result the caller already has.
+        """
+        if infrastructure is None:
+            infrastructure = is_infrastructure_failure(error)
+        if isinstance(error, CircuitOpenError):
+            self.stats['skipped'] += 1
+        elif infrastructure:
+            self.stats['infrastructure'] += 1
+            self.consecutive += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            if self.consecutive == self.threshold:
+                logger.error(f"Circuit breaker opened after {self.consecutive} consecutive infrastructure "
+                             f"failures, skipping the rest; last: {self.last_error}")
+        else:
+            self.stats['failed' if error is not None else 'passed'] += 1
+            self.consecutive = 0
+
+    def check(self):
+        """Raise CircuitOpenError while the breaker is open."""
+        if self.open:
+            raise CircuitOpenError(f"Skipped after {self.consecutive} consecutive infrastructure failures "
+                                   f"(last: {self.last_error})")
+
+    def format_stats(self):
+        state = 'open' if self.open else 'closed'
+        return (f"{self.stats['passed']} passed, {self.stats['failed']} failed, "
+                f"{self.stats['infrastructure']} infrastructure failure(s), {self.stats['skipped']} skipped "
+                f"(circuit {state})")
+
+
+def get_circuit_breaker():
+    """Return the circuit breaker shared by the test session."""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        _circuit_breaker = CircuitBreaker()
+    return _circuit_breaker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that the target site answers before running the suite.')
+    parser.add_argument('--url', default=None, help='URL to probe (default: Config.BASE_URL)')
+    args = parser.parse_args()
+    setup_logging()
+
+    result = probe_site(args.url)
+    logger.info(f"{result['url']}: {describe_probe(result)} in {result['seconds'] * 1000:.0f}ms")
+    raise SystemExit(0 if result['ok'] else 1)
+
+
+if __name__ == "__main__":
+    main()
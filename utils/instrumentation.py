@@ -0,0 +1,281 @@
+"""
+Per-step timing of the modules/ handlers.
+
+Every handler decorated with @timed_step records, per call, its wall time, the time spent waiting on
+Playwright and the rest (harness overhead: Python code, logging, screenshot queueing). Records carry
+the engine and user set with step_labels(), so a run can be broken down per step, user and engine.
+
+Playwright time is measured at the two points every call goes through: SyncBase._sync for the sync
+API (the caller is blocked until the browser answers) and Channel.inner_send, the protocol round
+trip, for the async API. Both are private Playwright internals; if they move, steps still get wall
+times and the Playwright share is reported as 0.
+
+Enable with INSTRUMENT=1; the summary is written to INSTRUMENTATION_FILE at the end of the session.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from config.config import Config
+from utils.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (in ms) of the histogram buckets; the last bucket is open ended
+HISTOGRAM_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_labels = contextvars.ContextVar('instrumentation_labels', default={})
+_active_steps = contextvars.ContextVar('instrumentation_active_steps', default=())
+_in_sync_call = contextvars.ContextVar('instrumentation_in_sync_call', default=False)
+# Name of the innermost running step, kept even when nothing is recorded (log records are tagged with it)
+_current_step = contextvars.ContextVar('instrumentation_current_step', default=None)
+
+_records = []
+_records_lock = threading.Lock()
+_hooks_installed = False
+_step_listeners = []
+
+
+@contextmanager
+def step_labels(**labels):
+    """Label the steps recorded inside the block, e.g. ``with step_labels(engine='chromium', user='Admin'):``."""
+    token = _labels.set({**_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+def label_steps(**labels):
+    """Label every step recorded from here on in the current context, e.g. at the top of a loop over users."""
+    _labels.set({**_labels.get(), **labels})
+
+
+def current_labels():
+    """The labels set with step_labels() / label_steps() in the current context."""
+    return _labels.get()
+
+
+def current_step():
+    """Name of the handler step running in the current context, or None."""
+    return _current_step.get()
+
+
+def _add_playwright_time(seconds: float):
+    for step in _active_steps.get():
+        step['playwright'] += seconds
+
+
+def install_playwright_hooks():
+    """Wrap the Playwright call paths once so steps can tell browser time from harness time."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+    try:
+        from playwright._impl._connection import Channel
+        from playwright._impl._sync_base import SyncBase
+    except ImportError:
+        logger.warning("Playwright internals not found; steps are recorded with wall time only")
+        return
+
+    original_sync = SyncBase._sync
+    original_inner_send = Channel.inner_send
+
+    def _sync(self, coro):
+        __tracebackhide__ = True
+        if not _active_steps.get() or _in_sync_call.get():
+            return original_sync(self, coro)
+        token = _in_sync_call.set(True)
+        start = time.perf_counter()
+        try:
+            return original_sync(self, coro)
+        finally:
+            _add_playwright_time(time.perf_counter() - start)
+            _in_sync_call.reset(token)
+
+    async def inner_send(self, method, params, return_as_dict):
+        # Sync API calls are already timed as a whole in _sync
+        if not _active_steps.get() or _in_sync_call.get():
+            return await original_inner_send(self, method, params, return_as_dict)
+        start = time.perf_counter()
+        try:
+            return await original_inner_send(self, method, params, return_as_dict)
+        finally:
+            _add_playwright_time(time.perf_counter() - start)
+
+    SyncBase._sync = _sync
+    Channel.inner_send = inner_send
+
+
+def add_step_listener(listener):
+    """Call ``listener(record)`` after every handler step, also when INSTRUMENT is off (e.g. the flight recorder)."""
+    if listener not in _step_listeners:
+        _step_listeners.append(listener)
+
+
+def remove_step_listener(listener):
+    if listener in _step_listeners:
+        _step_listeners.remove(listener)
+
+
+def _start_step(step: str):
+    if Config.INSTRUMENT:
+        install_playwright_hooks()
+    record = {'step': step, **_labels.get(), 'wall': 0.0, 'playwright': 0.0, 'status': 'passed',
+              'start': time.perf_counter()}
+    token = _active_steps.set(_active_steps.get() + (record,))
+    return record, token
+
+
+def _finish_step(record, token, error=None):
+    _active_steps.reset(token)
+    record['wall'] = time.perf_counter() - record.pop('start')
+    # Concurrent calls inside one async step can overlap, so Playwright time is capped at the wall time
+    record['playwright'] = min(record['playwright'], record['wall'])
+    record['harness'] = record['wall'] - record['playwright']
+    if error is not None:
+        record['status'] = type(error).__name__
+    if Config.INSTRUMENT:
+        with _records_lock:
+            _records.append(record)
+    for listener in _step_listeners:
+        listener(record)
+
+
+def timed_step(step: str):
+    """Decorate a sync or async handler so every call is recorded as ``step`` when INSTRUMENT is on (or listened to)."""
+
+    def decorator(handler):
+        if inspect.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def async_wrapper(*args, **kwargs):
+                step_token = _current_step.set(step)
+                try:
+                    if not Config.INSTRUMENT and not _step_listeners:
+                        return await handler(*args, **kwargs)
+                    record, token = _start_step(step)
+                    try:
+                        result = await handler(*args, **kwargs)
+                    except BaseException as e:
+                        _finish_step(record, token, e)
+                        raise
+                    _finish_step(record, token)
+                    return result
+                finally:
+                    _current_step.reset(step_token)
+
+            return async_wrapper
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            step_token = _current_step.set(step)
+            try:
+                if not Config.INSTRUMENT and not _step_listeners:
+                    return handler(*args, **kwargs)
+                record, token = _start_step(step)
+                try:
+                    result = handler(*args, **kwargs)
+                except BaseException as e:
+                    _finish_step(record, token, e)
+                    raise
+                _finish_step(record, token)
+                return result
+            finally:
+                _current_step.reset(step_token)
+
+        return wrapper
+
+    return decorator
+
+
+def step_records():
+    """Return a copy of the step records of this process."""
+    with _records_lock:
+        return list(_records)
+
+
+def merge_step_records(records):
+    """Add step records of a worker process to this process."""
+    with _records_lock:
+        _records.extend(records)
+
+
+def reset_step_records():
+    with _records_lock:
+        _records.clear()
+
+
+def histogram(walls):
+    """Count wall times (in seconds) per HISTOGRAM_BUCKETS_MS bucket, keyed by the bucket label."""
+    labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+    counts = dict.fromkeys(labels, 0)
+    for wall in walls:
+        index = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if wall * 1000 <= bound),
+                     len(HISTOGRAM_BUCKETS_MS))
+        counts[labels[index]] += 1
+    return counts
+
+
+def _totals(records):
+    return {
+        'count': len(records),
+        'failed': sum(1 for record in records if record['status'] != 'passed'),
+        'wall': sum(record['wall'] for record in records),
+        'playwright': sum(record['playwright'] for record in records),
+        'harness': sum(record['harness'] for record in records),
+    }
+
+
+def _group(records, *keys):
+    groups = {}
+    for record in records:
+        groups.setdefault('/'.join(str(record.get(key, '-')) for key in keys), []).append(record)
+    return groups
+
+
+def build_summary(records=None):
+    """Aggregate step records per step, per engine and step, and per user and step."""
+    records = step_records() if records is None else records
+    steps = {}
+    for step, step_group in sorted(_group(records, 'step').items()):
+        walls = [record['wall'] for record in step_group]
+        steps[step] = {**_totals(step_group), 'wall_percentiles': summarize(walls), 'histogram': histogram(walls)}
+    return {
+        'version': 1,
+        'totals': _totals(records),
+        'steps': steps,
+        'by_engine': {key: _totals(group) for key, group in sorted(_group(records, 'engine', 'step').items())},
+        'by_user': {key: _totals(group) for key, group in sorted(_group(records, 'user', 'step').items())},
+    }
+
+
+def write_summary(path=None, records=None):
+    """Write the JSON summary (plus the raw records) and return its path."""
+    path = path or Config.INSTRUMENTATION_FILE
+    records = step_records() if records is None else records
+    summary = build_summary(records)
+    summary['records'] = records
+    with open(path, 'w') as summary_file:
+        json.dump(summary, summary_file, indent=2)
+    return path
+
+
+def format_summary(summary):
+    """Render the per-step totals and histograms as report lines."""
+    lines = []
+    for step, stats in summary['steps'].items():
+        share = stats['playwright'] / stats['wall'] if stats['wall'] else 0
+        lines.append(f"{step}: {stats['count']} call(s), {stats['wall']:.2f}s wall, "
+                     f"{stats['playwright']:.2f}s Playwright ({share:.0%}), {stats['harness']:.2f}s harness, "
+                     f"p95 {stats['wall_percentiles']['p95'] * 1000:.0f}ms")
+        widest = max(stats['histogram'].values()) or 1
+        for bucket, count in stats['histogram'].items():
+            if count:
+                lines.append(f"  {bucket:>9} {'#' * max(1, round(count * 30 / widest))} {count}")
+    return lines
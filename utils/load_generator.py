@@ -0,0 +1,182 @@
+"""
+Load generation mode built from the login/logout handlers.
+
+K virtual users are started one after another over the ramp time; each keeps one browser context
+of a shared browser for the whole run and repeats navigate, login and logout until the duration
+is over. Every iteration records time-to-dashboard (navigate until the dashboard is shown) and
+time-to-logout (logout click until the login page is back). The report has throughput, latency
+percentiles and the error rate per step.
+
+# python -m utils.load_generator --stand-in --users 20 --ramp 10 --duration 60
+# python -m utils.load_generator --site-url https://staging.example.com --users 50 --output load_report.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from playwright.async_api import async_playwright
+
+from config.config import Config
+from modules.navigate_to_login_page import handle_navigate_to_login_page_async
+from modules.perform_login_with_config_data import handle_perform_login_with_config_data_async
+from modules.perform_logout import handle_perform_logout_async
+from utils.log_pipeline import setup_logging
+from utils.stand_in_server import StandInServer
+from utils.stats import summarize
+from utils.wait_policy import wait_for_url_async
+
+logger = logging.getLogger(__name__)
+
+
+def ramp_delays(virtual_users: int, ramp_seconds: float):
+    """Start offsets in seconds of each virtual user, spread evenly over the ramp time."""
+    if virtual_users <= 1 or ramp_seconds <= 0:
+        return [0.0] * virtual_users
+    step = ramp_seconds / (virtual_users - 1)
+    return [index * step for index in range(virtual_users)]
+
+
+def build_report(iterations, elapsed: float, virtual_users: int):
+    """Summarize iteration records into throughput, latency percentiles and error rates."""
+    passed = [iteration for iteration in iterations if iteration['error'] is None]
+    errors = {}
+    for iteration in iterations:
+        if iteration['error'] is not None:
+            key = f"{iteration['failed_step']}: {iteration['error'].split(':')[0]}"
+            errors[key] = errors.get(key, 0) + 1
+
+    return {
+        'virtual_users': virtual_users,
+        'elapsed_seconds': elapsed,
+        'iterations': len(iterations),
+        'passed': len(passed),
+        'failed': len(iterations) - len(passed),
+        'error_rate': (len(iterations) - len(passed)) / len(iterations) if iterations else 0.0,
+        'throughput_per_second': len(passed) / elapsed if elapsed > 0 else 0.0,
+        'time_to_dashboard': summarize(iteration['time_to_dashboard'] for iteration in passed),
+        'time_to_logout': summarize(iteration['time_to_logout'] for iteration in passed),
+        'errors': errors,
+    }
+
+
+def format_report(report):
+    """Render the report as log lines with latencies in milliseconds."""
+    lines = [f"{report['virtual_users']} virtual user(s), {report['iterations']} iteration(s) in "
+             f"{report['elapsed_seconds']:.1f}s: {report['throughput_per_second']:.2f} logins/s, "
+             f"error rate {report['error_rate']:.1%}"]
+    for step in ('time_to_dashboard', 'time_to_logout'):
+        summary = report[step]
+        if summary['count']:
+            lines.append(f"  {step}: p50 {summary['p50'] * 1000:.0f}ms, p95 {summary['p95'] * 1000:.0f}ms, "
+                         f"p99 {summary['p99'] * 1000:.0f}ms, max {summary['max'] * 1000:.0f}ms")
+    for error, count in sorted(report['errors'].items(), key=lambda item: -item[1]):
+        lines.append(f"  {count}x {error}")
+    return lines
+
+
+async def run_iteration(page, user: dict):
+    """One navigate/login/logout iteration; returns its timings and the step that failed, if any."""
+    iteration = {'username': user['username'], 'time_to_dashboard': None, 'time_to_logout': None,
+                 'failed_step': None, 'error': None}
+    step = 'login'
+    try:
+        start = time.perf_counter()
+        await handle_navigate_to_login_page_async(page)
+        await handle_perform_login_with_config_data_async(page, user['username'], user['password'])
+        if page.url != Config.DASHBOARD_URL:
+            raise AssertionError(f"Login did not reach the dashboard (at {page.url})")
+        iteration['time_to_dashboard'] = time.perf_counter() - start
+
+        step = 'logout'
+        start = time.perf_counter()
+        await handle_perform_logout_async(page)
+        await wait_for_url_async(page, Config.BASE_URL, 'login page after logout')
+        iteration['time_to_logout'] = time.perf_counter() - start
+    except Exception as e:
+        iteration['failed_step'] = step
+        iteration['error'] = f"{type(e).__name__}: {e}"
+    return iteration
+
+
+async def virtual_user(browser, user: dict, start_delay: float, deadline: float, iterations: list):
+    """Wait for the ramp offset, then repeat iterations in one pooled context until the deadline."""
+    await asyncio.sleep(start_delay)
+    context = await browser.new_context()
+    page = await context.new_page()
+    try:
+        while time.perf_counter() < deadline:
+            iteration = await run_iteration(page, user)
+            iterations.append(iteration)
+            if iteration['error'] is not None:
+                # Start the next iteration from a clean session rather than a half logged in page
+                await context.clear_cookies()
+    finally:
+        await context.close()
+
+
+async def generate_load(users, virtual_users=10, ramp_seconds=10.0, duration_seconds=60.0, browser_name='chromium',
+                        headless=True):
+    """Run the load and return the report; virtual users take their credentials from ``users`` in turn."""
+    if browser_name not in ('chromium', 'firefox', 'webkit'):
+        raise ValueError(f"Unsupported browser: {browser_name}")
+    iterations = []
+    async with async_playwright() as playwright:
+        browser = await getattr(playwright, browser_name).launch(headless=headless)
+        try:
+            start = time.perf_counter()
+            deadline = start + duration_seconds
+            await asyncio.gather(*(
+                virtual_user(browser, users[index % len(users)], delay, deadline, iterations)
+                for index, delay in enumerate(ramp_delays(virtual_users, ramp_seconds))
+            ))
+            elapsed = time.perf_counter() - start
+        finally:
+            await browser.close()
+    return build_report(iterations, elapsed, virtual_users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate login/logout load and report latency percentiles.')
+    parser.add_argument('--users', type=int, default=10, help='number of virtual users')
+    parser.add_argument('--ramp', type=float, default=10, help='seconds over which the virtual users start')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of load, ramp included')
+    parser.add_argument('--browser', default='chromium')
+    parser.add_argument('--headed', action='store_true')
+    parser.add_argument('--site-url', help='site to load, defaults to SITE_URL')
+    parser.add_argument('--stand-in', action='store_true', help='load a local stand-in server instead')
+    parser.add_argument('--credentials', action='append', default=[],
+                        help='username:password of a virtual user, may be repeated (defaults to the first Config user)')
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    args = parser.parse_args()
+    setup_logging()
+
+    users = [dict(zip(('username', 'password'), value.split(':', 1))) for value in args.credentials]
+    users = users or [Config.USERS[0]]
+
+    server = None
+    if args.stand_in:
+        faults = json.loads(Config.STAND_IN_FAULTS) if Config.STAND_IN_FAULTS else None
+        server = StandInServer(faults=faults).start()
+        Config.use_site(server.url)
+    elif args.site_url:
+        Config.use_site(args.site_url)
+
+    try:
+        logger.info(f"Loading {Config.BASE_URL} with {args.users} virtual user(s) on {args.browser}")
+        report = asyncio.run(generate_load(users, args.users, args.ramp, args.duration, args.browser,
+                                           headless=not args.headed))
+    finally:
+        if server is not None:
+            server.stop()
+
+    for line in format_report(report):
+        logger.info(line)
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
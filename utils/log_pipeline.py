@@ -0,0 +1,224 @@
+"""
+Non-blocking structured logging.
+
+setup_logging() puts a QueueHandler on the root logger: the thread that logs only tags the record
+with the engine, user and step of its context plus the worker id, and queues it. A QueueListener
+thread does the formatting and writing: JSON lines to a size-rotated file per worker
+(LOG_DIR/<worker>.jsonl, LOG_MAX_BYTES x LOG_BACKUPS) and, for the command line tools, the usual
+text lines to the console. Engine worker processes write their own files (engine-<browser>.jsonl),
+so nothing contends for a shared log file. File names stay the same from run to run, so LOG_MAX_BYTES
+and LOG_BACKUPS bound the whole directory. Every record carries the id of its run (LOG_RUN_ID, which
+the worker processes inherit), and the merge tool turns the files into one time-ordered log of the
+latest run, or of every run with --all-runs:
+# python -m utils.log_pipeline merge logs/ --output run.jsonl
+# python -m utils.log_pipeline merge logs/ --text
+# python -m utils.log_pipeline merge logs/ --run 20261018-130041-4242
+"""
+import argparse
+import atexit
+import glob
+import heapq
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import time
+
+from config.config import Config
+from utils.instrumentation import current_labels, current_step
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Fields every JSON record carries besides time, level, logger and message
+CONTEXT_FIELDS = ('engine', 'user', 'step', 'worker')
+
+_queue_handler = None
+_listener = None
+_worker_name = None
+
+
+def worker_id():
+    """
+    Name of this process' log file: the name given to setup_logging() (e.g. engine-firefox), the
+    pytest-xdist worker (gw0, ...), 'main' for the main process, otherwise the process name.
+    """
+    if _worker_name:
+        return _worker_name
+    if os.environ.get('PYTEST_XDIST_WORKER'):
+        return os.environ['PYTEST_XDIST_WORKER']
+    process = multiprocessing.current_process()
+    if process.name == 'MainProcess':
+        return 'main'
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', process.name)
+
+
+def run_id():
+    """Id of the current run; set by the first process that logs and inherited by its worker processes."""
+    if not os.environ.get('LOG_RUN_ID'):
+        os.environ['LOG_RUN_ID'] = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    return os.environ['LOG_RUN_ID']
+
+
+class ContextFilter(logging.Filter):
+    """Tag records with the engine, user and step of the context; runs in the thread that logs."""
+
+    def filter(self, record):
+        labels = current_labels()
+        record.engine = labels.get('engine')
+        record.user = labels.get('user')
+        record.step = current_step()
+        record.worker = worker_id()
+        record.run = run_id()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message (with any traceback) and the context fields."""
+
+    def format(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **{field: getattr(record, field, None) for field in CONTEXT_FIELDS},
+            'run': getattr(record, 'run', None),
+        }
+        return json.dumps(entry)
+
+
+def _not_replayed(record):
+    # Records a worker process already wrote to its own file are replayed in the parent only for display
+    return not getattr(record, 'replayed', False)
+
+
+def log_file_path(log_dir=None):
+    return os.path.join(log_dir or Config.LOG_DIR, f"{worker_id()}.jsonl")
+
+
+def setup_logging(console=True, level=logging.INFO, log_dir=None, worker=None):
+    """
+    Route the root logger through the queue; console=False leaves the console to pytest, ``worker``
+    names the log file instead of worker_id(). Idempotent.
+    """
+    global _queue_handler, _listener, _worker_name
+    if _listener is not None:
+        return _listener
+    _worker_name = worker
+    run_id()
+    path = log_file_path(log_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=Config.LOG_MAX_BYTES,
+                                                        backupCount=Config.LOG_BACKUPS, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+    file_handler.addFilter(_not_replayed)
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_handler.addFilter(ContextFilter())
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Records still queued when the process exits would be lost
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(_queue_handler)
+    if root_logger.level == logging.NOTSET or root_logger.level > level:
+        root_logger.setLevel(level)
+    return _listener
+
+
+def stop_logging():
+    """Write out the queued records and detach the pipeline."""
+    global _queue_handler, _listener, _worker_name
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _queue_handler = _listener = _worker_name = None
+
+
+def _rotation_order(path: str):
+    # worker.jsonl.3 is older than worker.jsonl.1, which is older than worker.jsonl
+    suffix = path.rsplit('.', 1)[-1]
+    return -int(suffix) if suffix.isdigit() else 0
+
+
+def _iter_worker_entries(paths):
+    for path in sorted(paths, key=_rotation_order):
+        with open(path, encoding='utf-8') as log_file:
+            for line in log_file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _files_by_worker(log_dir):
+    files_by_worker = {}
+    for path in glob.glob(os.path.join(log_dir, '*.jsonl*')):
+        worker = os.path.basename(path).split('.jsonl')[0]
+        files_by_worker.setdefault(worker, []).append(path)
+    return files_by_worker
+
+
+def latest_run(log_dir=None):
+    """Run id of the newest record in the directory, or None when there is none."""
+    newest = None
+    for path in glob.glob(os.path.join(log_dir or Config.LOG_DIR, '*.jsonl')):
+        for entry in _iter_worker_entries([path]):
+            if newest is None or entry['time'] >= newest['time']:
+                newest = entry
+    return newest.get('run') if newest else None
+
+
+def merge_logs(log_dir=None, run=None):
+    """Yield the records of every worker file (and its rotated backups) in time order, of ``run`` only if given."""
+    log_dir = log_dir or Config.LOG_DIR
+    # Each worker's records are already in time order, so a k-way merge is enough
+    entries = heapq.merge(*(_iter_worker_entries(paths) for paths in _files_by_worker(log_dir).values()),
+                          key=lambda entry: entry['time'])
+    yield from (entry for entry in entries if run is None or entry.get('run') == run)
+
+
+def format_entry(entry):
+    """Render a JSON record as a console style text line."""
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['time']))
+    context = ' '.join(f"{field}={entry[field]}" for field in CONTEXT_FIELDS if entry.get(field))
+    milliseconds = int(entry['time'] % 1 * 1000)
+    return f"{timestamp},{milliseconds:03d} - {entry['logger']} - {entry['level']} - [{context}] {entry['message']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge the per-worker JSON logs into one time-ordered log.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    merge_parser = subparsers.add_parser('merge', help='merge every worker log of a directory')
+    merge_parser.add_argument('log_dir', nargs='?', default=None, help='directory of the worker logs (LOG_DIR)')
+    merge_parser.add_argument('--output', help='file to write (default: standard output)')
+    merge_parser.add_argument('--text', action='store_true', help='write text lines instead of JSON')
+    runs = merge_parser.add_mutually_exclusive_group()
+    runs.add_argument('--run', help='id of the run to merge (default: the latest run)')
+    runs.add_argument('--all-runs', action='store_true', help='merge the records of every run')
+    args = parser.parse_args()
+
+    run = None if args.all_runs else args.run or latest_run(args.log_dir)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for entry in merge_logs(args.log_dir, run):
+            output.write((format_entry(entry) if args.text else json.dumps(entry)) + '\n')
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
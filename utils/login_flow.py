@@ -0,0 +1,217 @@
+"""
+The login/logout flow shared by the test matrix, the engine runners and the benchmarks.
+
+iter_login_cases() expands engines x headless modes x data sources x users into one LoginCase per
+combination; tests/test_login_matrix.py turns every case into its own pytest item, so selection,
+sharding and parallel workers act on single cases; pytest holds all of them in memory. run_suite()
+runs a whole data source in one go with the process, per-context or async execution models and
+streams its users, so it is the way to run data files of any size:
+# python -m utils.login_flow --source json
+# EXECUTION_MODE=async python -m utils.login_flow --source config --headed
+"""
+import argparse
+import functools
+import logging
+import os
+import re
+from typing import NamedTuple
+
+from playwright.sync_api import Page
+
+from config.config import Config
+from modules.close_browser import handle_close_browser_context
+from modules.navigate_to_login_page import handle_navigate_to_login_page
+from modules.perform_login_with_config_data import handle_perform_login_with_config_data
+from modules.perform_login_with_json_data import handle_perform_login_with_json_data
+from modules.perform_logout import handle_perform_logout
+from modules.perform_logout_redirection_to_login import handle_perform_logout_redirection_to_login
+from utils.async_runner import run_async_matrix
+from utils.browser_pool import get_browser_pool
+from utils.data_sources import config_users, login_data_users
+from utils.engine_matrix import run_engine_matrix
+from utils.flight_recorder import finish_flight_recorder, record_case, recorder_context_options
+from utils.health import ensure_site_up
+from utils.instrumentation import label_steps
+from utils.log_pipeline import setup_logging
+from utils.network_policy import NetworkPolicy, save_known_sizes
+from utils.screenshot_service import get_screenshot_service
+from utils.user_contexts import run_users_concurrently
+from utils.wait_policy import log_wait_summary, wait_for_error_banner
+
+logger = logging.getLogger(__name__)
+
+# Data source name -> function streaming its users
+DATA_SOURCES = {
+    'config': config_users,
+    'json': login_data_users,
+}
+
+
+class LoginCase(NamedTuple):
+    engine: str
+    headless: bool
+    source: str
+    index: int
+    user: dict
+
+    @property
+    def id(self):
+        username = re.sub(r'[^A-Za-z0-9_.-]', '_', self.user['username']) or 'user'
+        mode = 'headless' if self.headless else 'headed'
+        return f"{self.engine}-{mode}-{self.source}-{self.index:04d}_{username}"
+
+
+def parse_headless_modes(value: str):
+    """Parse "true,false" into [True, False]."""
+    return [mode.strip().lower() in ('1', 'true', 'yes') for mode in value.split(',') if mode.strip()]
+
+
+def iter_login_cases(browser_names=None, headless_modes=None, sources=None):
+    """Yield one LoginCase per (engine, headless mode, data source, user); users are streamed once per source."""
+    browser_names = browser_names or Config.BROWSER_NAMES
+    headless_modes = parse_headless_modes(Config.HEADLESS_MODES) if headless_modes is None else headless_modes
+    sources = sources or [source.strip() for source in Config.MATRIX_SOURCES.split(',') if source.strip()]
+    for source in sources:
+        if source not in DATA_SOURCES:
+            raise ValueError(f"Unknown data source: {source}")
+        for index, user in enumerate(DATA_SOURCES[source](), start=1):
+            for browser_name in browser_names:
+                for headless in headless_modes:
+                    yield LoginCase(browser_name, headless, source, index, user)
+
+
+def setup_screenshot_directory(browser_name):
+    """Set up the directory to store screenshots for the specified browser."""
+    screenshots_dir = f'screenshots/{browser_name}'
+    os.makedirs(screenshots_dir, exist_ok=True)
+    return screenshots_dir
+
+
+def capture_screenshot(page: Page, screenshots_dir: str, filename: str, user=None, failure=False):
+    """Capture a screenshot if the screenshot policy allows it; it is saved to the directory in the background."""
+    if get_screenshot_service().capture(page, screenshots_dir, filename, user=user, failure=failure):
+        logger.info(f"Capturing screenshot: {filename}")
+
+
+def perform_login_case(page: Page, user: dict, screenshots_dir: str, case_name=None):
+    """
+    Log one user in and out, capturing screenshots along the way.
+
+    Users with an ``expected`` value follow the JSON data rules (a failure must show the error message);
+    users without one follow the config data rules (a login that does not reach the dashboard is only logged).
+    With FLIGHT_RECORDER=1 a failure also saves the trace and recent events of the case (``case_name``).
+    """
+    username = user['username']
+    expected = user.get('expected')
+    logger.info(f"Starting login/logout test for user: {username}")
+
+    with record_case(page, case_name or username):
+        handle_navigate_to_login_page(page)
+        capture_screenshot(page, screenshots_dir, f"before_login_{username}.png", user=username)
+
+        try:
+            if expected is None:
+                handle_perform_login_with_config_data(page, username, user['password'])
+            else:
+                handle_perform_login_with_json_data(page, username, user['password'])
+            capture_screenshot(page, screenshots_dir, f"after_login_{username}.png", user=username)
+
+            if expected == "success" or (expected is None and page.url == Config.DASHBOARD_URL):
+                logger.info(f"Login successful for user: {username}")
+                handle_perform_logout(page)
+                capture_screenshot(page, screenshots_dir, f"after_logout_{username}.png", user=username)
+                handle_perform_logout_redirection_to_login(page, screenshots_dir, username)
+            elif expected is None:
+                logger.warning(f"Login failed for user {username}. Staying on login page.")
+                capture_screenshot(page, screenshots_dir, f"login_failed_{username}.png", user=username)
+            else:
+                assert wait_for_error_banner(page), "Expected error message not found."
+
+        except Exception as e:
+            logger.error(f"Error during login/logout tests for user {username}: {str(e)}")
+            capture_screenshot(page, screenshots_dir, f"error_{username}.png", user=username, failure=True)
+            raise
+
+
+def perform_test(page: Page, screenshots_dir: str, users):
+    """
+    Perform the login, capture screenshots, and perform logout for every user, one after another.
+
+    A failing user does not stop the others; the users that failed are reported once all of them ran.
+    """
+    failed = []
+    for user in users:
+        label_steps(user=user['username'])
+        try:
+            perform_login_case(page, user, screenshots_dir)
+        except Exception as e:
+            logger.error(f"Login/logout test failed for user {user['username']}, continuing: {str(e)}")
+            failed.append(user['username'])
+    assert not failed, "Login/logout tests failed for: " + ", ".join(failed)
+
+
+def run_engine(browser_name: str, headless=True, source='config'):
+    """Run every user of the data source on one browser; executed in its own worker process by the engine matrix."""
+    logger.info(f"Testing with {browser_name}...")
+    ensure_site_up()
+    screenshots_dir = setup_screenshot_directory(browser_name)
+
+    if Config.USER_CONCURRENCY > 1:
+        # Drive several users at once, each in its own context of a single browser
+        results = run_users_concurrently(browser_name, DATA_SOURCES[source](), screenshots_dir, headless=headless,
+                                         max_concurrency=Config.USER_CONCURRENCY)
+        failed = [result for result in results if result['status'] != 'passed']
+        assert not failed, "Login/logout tests failed or were skipped for: " + ", ".join(
+            result['username'] for result in failed)
+        return
+
+    # Route the requests of the engine's new context through the configured network profile
+    page = get_browser_pool().new_context(browser_name, headless=headless, **recorder_context_options()).new_page()
+    network_policy = NetworkPolicy().attach(page.context)
+    try:
+        perform_test(page, screenshots_dir, DATA_SOURCES[source]())
+    except Exception as e:
+        logger.error(f"Error during login/logout tests with {browser_name}: {str(e)}")
+        capture_screenshot(page, screenshots_dir, "error.png", failure=True)
+        raise
+    finally:
+        get_screenshot_service().flush()
+        network_policy.log_report(browser_name)
+        save_known_sizes()
+        handle_close_browser_context(page)
+        finish_flight_recorder(page.context)
+        log_wait_summary()
+
+
+def run_suite(source='config', headless=True):
+    """Run every user of the data source on every Config.BROWSER_NAMES engine with the configured execution model."""
+    # Fail in seconds, before any browser or worker process starts, when the site is down
+    ensure_site_up()
+    if Config.EXECUTION_MODE == 'async':
+        # Interleave every user on every browser on one event loop instead of one process per browser
+        results = run_async_matrix(Config.BROWSER_NAMES, DATA_SOURCES[source](), headless=headless,
+                                   max_concurrency=Config.ASYNC_CONCURRENCY)
+        return [f"{result['username']} on {result['browser_name']} ({result['error']})"
+                for result in results if result['status'] != 'passed']
+
+    # Run every browser in its own worker process; ENGINE_WORKERS=1 runs them one after another
+    results = run_engine_matrix(functools.partial(run_engine, source=source), Config.BROWSER_NAMES,
+                                headless=headless, workers=Config.ENGINE_WORKERS)
+    return [f"{result['browser_name']} ({result['error']})" for result in results if result['status'] != 'passed']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a whole data source with the configured execution model.')
+    parser.add_argument('--source', choices=sorted(DATA_SOURCES), default='config')
+    parser.add_argument('--headed', action='store_true')
+    args = parser.parse_args()
+    setup_logging()
+
+    failures = run_suite(args.source, headless=not args.headed)
+    for failure in failures:
+        logger.error(f"Failed: {failure}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
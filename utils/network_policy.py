@@ -0,0 +1,155 @@
+"""
+Request routing that keeps assets the assertions never look at off the critical path.
+
+A profile from Config.NETWORK_PROFILES decides per request whether it is blocked (aborted), stubbed
+(answered with an empty 200 response) or passed on:
+- block_resource_types / stub_resource_types: Playwright resource types such as image, font or media
+- block_url_patterns / stub_url_patterns: fnmatch patterns matched against the full URL
+- block_third_party: block every request that does not go to the host of Config.BASE_URL
+
+Bytes saved are estimated from the content-length seen for the same URL when it was not blocked,
+in this run or an earlier one (kept in Config.NETWORK_SIZES_FILE); other blocked requests are
+counted as unknown_size. The empty profile 'none' leaves the requests alone and learns nothing.
+"""
+import fnmatch
+import json
+import logging
+import os
+import threading
+from urllib.parse import urlparse
+
+from config.config import Config
+from utils.browser_pool import add_flow_listener
+
+logger = logging.getLogger(__name__)
+
+_known_sizes = {}
+_known_sizes_loaded = False
+# Whether a size was learned since the file was last written
+_known_sizes_changed = False
+_lock = threading.Lock()
+
+
+def _load_known_sizes():
+    global _known_sizes_loaded
+    with _lock:
+        if _known_sizes_loaded:
+            return
+        _known_sizes_loaded = True
+        if os.path.exists(Config.NETWORK_SIZES_FILE):
+            try:
+                with open(Config.NETWORK_SIZES_FILE) as sizes_file:
+                    _known_sizes.update(json.load(sizes_file))
+            except ValueError:
+                logger.warning(f"Ignoring unreadable {Config.NETWORK_SIZES_FILE}")
+
+
+def save_known_sizes():
+    """Persist the response sizes learned so far, so later runs can estimate the bytes they saved."""
+    global _known_sizes_changed
+    with _lock:
+        if not _known_sizes_changed:
+            return
+        sizes = dict(_known_sizes)
+        _known_sizes_changed = False
+    # Engine workers may save at the same time; write aside and swap the file in
+    temp_path = f"{Config.NETWORK_SIZES_FILE}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as sizes_file:
+        json.dump(sizes, sizes_file)
+    os.replace(temp_path, Config.NETWORK_SIZES_FILE)
+
+
+class NetworkPolicy:
+    def __init__(self, profile_name=None):
+        self.profile_name = profile_name or Config.NETWORK_PROFILE
+        if self.profile_name not in Config.NETWORK_PROFILES:
+            raise ValueError(f"Unknown network profile: {self.profile_name}")
+        self.profile = Config.NETWORK_PROFILES[self.profile_name]
+        self.target_host = urlparse(Config.BASE_URL).hostname
+        self.stats = {'requests': 0, 'blocked': 0, 'stubbed': 0, 'bytes_saved': 0, 'unknown_size': 0}
+        _load_known_sizes()
+
+    @property
+    def enabled(self):
+        return bool(self.profile)
+
+    def decide(self, url: str, resource_type: str):
+        """Return 'block', 'stub' or None for a request."""
+        if resource_type in self.profile.get('block_resource_types', ()):
+            return 'block'
+        if any(fnmatch.fnmatch(url, pattern) for pattern in self.profile.get('block_url_patterns', ())):
+            return 'block'
+        if self.profile.get('block_third_party') and urlparse(url).hostname != self.target_host:
+            return 'block'
+        if resource_type in self.profile.get('stub_resource_types', ()):
+            return 'stub'
+        if any(fnmatch.fnmatch(url, pattern) for pattern in self.profile.get('stub_url_patterns', ())):
+            return 'stub'
+        return None
+
+    def _count(self, url: str, action):
+        self.stats['requests'] += 1
+        if action is None:
+            return
+        self.stats['blocked' if action == 'block' else 'stubbed'] += 1
+        size = _known_sizes.get(url)
+        if size is None:
+            self.stats['unknown_size'] += 1
+        else:
+            self.stats['bytes_saved'] += size
+
+    def _learn_size(self, response):
+        global _known_sizes_changed
+        content_length = response.headers.get('content-length')
+        if content_length and content_length.isdigit():
+            with _lock:
+                if _known_sizes.get(response.url) != int(content_length):
+                    _known_sizes[response.url] = int(content_length)
+                    _known_sizes_changed = True
+
+    def handle_route(self, route):
+        request = route.request
+        action = self.decide(request.url, request.resource_type)
+        self._count(request.url, action)
+        if action == 'block':
+            route.abort('blockedbyclient')
+        elif action == 'stub':
+            route.fulfill(status=200, body='')
+        else:
+            route.fallback()
+
+    async def handle_route_async(self, route):
+        request = route.request
+        action = self.decide(request.url, request.resource_type)
+        self._count(request.url, action)
+        if action == 'block':
+            await route.abort('blockedbyclient')
+        elif action == 'stub':
+            await route.fulfill(status=200, body='')
+        else:
+            await route.fallback()
+
+    def attach(self, target):
+        """Route every request of a page or browser context through the policy; an empty profile adds nothing."""
+        if not self.enabled:
+            return self
+        add_flow_listener(target, 'response', self._learn_size)
+        target.route('**/*', self.handle_route)
+        return self
+
+    async def attach_async(self, target):
+        """Async version of attach."""
+        if not self.enabled:
+            return self
+        target.on('response', self._learn_size)
+        await target.route('**/*', self.handle_route_async)
+        return self
+
+    def log_report(self, flow: str):
+        """Log requests blocked, stubbed and bytes saved for one flow."""
+        if not self.enabled:
+            return
+        logger.info(f"Network profile '{self.profile_name}' for {flow}: {self.stats['requests']} request(s), "
+                    f"{self.stats['blocked']} blocked, {self.stats['stubbed']} stubbed, "
+                    f"{self.stats['bytes_saved'] / 1024:.1f} KiB saved "
+                    f"({self.stats['unknown_size']} blocked request(s) of unknown size)")
@@ -0,0 +1,187 @@
+"""
+CPU and memory of the browser processes, per engine and per handler step.
+
+A ResourceSampler thread walks the process tree of the test run every RESOURCE_SAMPLE_INTERVAL seconds
+and adds up CPU% and RSS of the browser processes per engine. Browsers launched by the browser pool,
+the runners and the engine worker processes are all descendants of this process; the engine is told
+by the Playwright browser build the executable comes from (ms-playwright/chromium-*, firefox-*, ...),
+so renderer and GPU helper processes count towards their browser. Samples are matched with the
+handler steps that ran at the same time in this process, which gives the usage per step.
+
+CPU% is relative to one core, like top: two busy cores read 200%. Needs psutil (requirements.txt);
+starting the sampler without it raises an error rather than silently recording nothing.
+# RESOURCE_SAMPLER=1 pytest tests/test_login_matrix.py
+"""
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from config.config import Config
+from utils.instrumentation import add_step_listener, remove_step_listener
+from utils.stats import summarize
+
+try:
+    import psutil
+except ImportError:  # only needed to sample; importing the module must not require it
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+_BROWSER_BUILD = re.compile(r'ms-playwright[/\\](chromium_headless_shell|chromium|firefox|webkit)-')
+
+_ENGINES = {'chromium_headless_shell': 'chromium'}
+
+
+def engine_of(command_line):
+    """Engine a browser process belongs to, from its command line; None for any other process."""
+    for part in command_line:
+        match = _BROWSER_BUILD.search(part)
+        if match:
+            return _ENGINES.get(match.group(1), match.group(1))
+    return None
+
+
+class ResourceSampler:
+    """Sample CPU% and RSS of the browser processes per engine on a background thread."""
+
+    def __init__(self, interval=None, root_pid=None):
+        self.interval = interval or Config.RESOURCE_SAMPLE_INTERVAL
+        self.root_pid = root_pid or os.getpid()
+        self.samples = []
+        self.step_intervals = []
+        self._step_intervals_lock = threading.Lock()
+        self._processes = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _browser_processes(self):
+        """The browser processes below the root, reusing Process objects so cpu_percent() measures deltas."""
+        current = {}
+        for process in psutil.Process(self.root_pid).children(recursive=True):
+            known = self._processes.get(process.pid)
+            if known is not None:
+                current[process.pid] = known
+                continue
+            try:
+                engine = engine_of(process.cmdline())
+                process.cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            if engine is not None:
+                current[process.pid] = (process, engine)
+        self._processes = current
+        return current.values()
+
+    def sample(self):
+        """Take one sample: per engine the summed CPU%, RSS and process count."""
+        usage = {}
+        for process, engine in self._browser_processes():
+            try:
+                with process.oneshot():
+                    cpu, rss = process.cpu_percent(None), process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            totals = usage.setdefault(engine, {'cpu': 0.0, 'rss': 0, 'processes': 0})
+            totals['cpu'] += cpu
+            totals['rss'] += rss
+            totals['processes'] += 1
+        now = time.time()
+        for engine, totals in usage.items():
+            self.samples.append({'time': now, 'engine': engine, **totals})
+
+    def _record_step_interval(self, record):
+        end = time.time()
+        with self._step_intervals_lock:
+            self.step_intervals.append({'step': record['step'], 'engine': record.get('engine'),
+                                        'start': end - record['wall'], 'end': end})
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except psutil.Error as e:
+                logger.debug(f"Resource sample failed: {str(e)}")
+
+    def start(self):
+        if psutil is None:
+            raise RuntimeError("RESOURCE_SAMPLER needs psutil to sample the browser processes: pip install psutil")
+        add_step_listener(self._record_step_interval)
+        self._thread = threading.Thread(target=self._run, name='resource-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        remove_step_listener(self._record_step_interval)
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def summary(self, step_intervals=None):
+        return build_summary(self.samples, self.step_intervals if step_intervals is None else step_intervals)
+
+
+def _usage(samples):
+    cpu = summarize([sample['cpu'] for sample in samples])
+    rss = summarize([sample['rss'] for sample in samples])
+    return {
+        'samples': len(samples),
+        'cpu_avg': cpu['mean'],
+        'cpu_peak': cpu['max'],
+        'rss_avg_mb': rss['mean'] / 2 ** 20,
+        'rss_peak_mb': rss['max'] / 2 ** 20,
+        'processes_peak': max(sample['processes'] for sample in samples),
+    }
+
+
+def build_summary(samples, step_intervals):
+    """Peak and average usage per engine, and per step and engine over the samples taken during the step."""
+    by_engine, by_step = {}, {}
+    # Sweep the samples and the intervals together in time order, keeping only the intervals still open
+    intervals = sorted(step_intervals, key=lambda interval: interval['start'])
+    next_interval = 0
+    open_intervals = []
+    for sample in sorted(samples, key=lambda sample: sample['time']):
+        while next_interval < len(intervals) and intervals[next_interval]['start'] <= sample['time']:
+            heapq.heappush(open_intervals, (intervals[next_interval]['end'], next_interval))
+            next_interval += 1
+        while open_intervals and open_intervals[0][0] < sample['time']:
+            heapq.heappop(open_intervals)
+        by_engine.setdefault(sample['engine'], []).append(sample)
+        for _, index in open_intervals:
+            interval = intervals[index]
+            if interval['engine'] in (None, sample['engine']):
+                by_step.setdefault(f"{interval['step']}/{sample['engine']}", []).append(sample)
+    return {
+        'version': 1,
+        'by_engine': {engine: _usage(group) for engine, group in sorted(by_engine.items())},
+        'by_step': {key: _usage(group) for key, group in sorted(by_step.items())},
+    }
+
+
+def write_summary(summary, path=None):
+    path = path or Config.RESOURCE_FILE
+    with open(path, 'w') as summary_file:
+        json.dump(summary, summary_file, indent=2)
+    return path
+
+
+def format_summary(summary):
+    lines = []
+    for section in ('by_engine', 'by_step'):
+        for key, usage in summary[section].items():
+            lines.append(f"{key}: CPU avg {usage['cpu_avg']:.0f}% / peak {usage['cpu_peak']:.0f}%, "
+                         f"RSS avg {usage['rss_avg_mb']:.0f}MB / peak {usage['rss_peak_mb']:.0f}MB, "
+                         f"up to {usage['processes_peak']} process(es), {usage['samples']} sample(s)")
+    return lines
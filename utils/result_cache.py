@@ -0,0 +1,247 @@
+"""
+Result cache and test-impact selection for the login matrix.
+
+Every LoginCase gets a key: a hash of the user record, the case's engine, headless mode and data
+source, the Playwright release (which pins the browser builds), the target URL and the code the case
+runs: the modules/ handlers it exercises and the modules/, utils/ and config/ files they import,
+transitively, plus the files deciding whether a case passes (utils/login_flow.py and the matrix test
+itself), which every case shares. Code is hashed as its syntax tree, so edits to comments or formatting keep the key.
+With RESULT_CACHE=1 a case whose key passed within RESULT_CACHE_TTL hours is reported as skipped
+("cached") instead of run. The TTL bounds how long changes the key does not cover go unnoticed.
+
+The same map tells which cases a change touches: ``pytest --impacted-by REF`` keeps only the matrix
+cases using a file changed since REF, where the data file of a source (LOGIN_DATA_FILE, USERS_FILE)
+counts for the cases of that source. Any other changed file may affect every case, so then the whole
+matrix runs.
+# RESULT_CACHE=1 pytest tests/test_login_matrix.py
+# pytest tests/test_login_matrix.py --impacted-by origin/main
+# python -m utils.result_cache map
+# python -m utils.result_cache impacted origin/main
+"""
+import argparse
+import ast
+import functools
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import subprocess
+import time
+
+from config.config import Config
+from utils.login_flow import iter_login_cases
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES_PACKAGE = 'modules'
+
+# Packages whose files are part of the code a case runs
+CODE_PACKAGES = (MODULES_PACKAGE, 'utils', 'config')
+
+# Files every case runs through that decide pass or fail: perform_login_case and the matrix test
+CASE_RUNNER_FILES = ('utils/login_flow.py', 'tests/test_login_matrix.py')
+
+
+def module_path(module_name: str):
+    """Path of a module relative to the project, e.g. modules/perform_logout.py."""
+    return f"{module_name.replace('.', '/')}.py"
+
+
+def _project_module(name: str):
+    return name.split('.')[0] in CODE_PACKAGES and os.path.exists(os.path.join(PROJECT_DIR, module_path(name)))
+
+
+@functools.lru_cache(maxsize=None)
+def _parse(path: str):
+    with open(os.path.join(PROJECT_DIR, path), encoding='utf-8') as source_file:
+        return ast.parse(source_file.read(), filename=path)
+
+
+@functools.lru_cache(maxsize=None)
+def _imported_modules(module_name: str):
+    """The modules/, utils/ and config/ modules ``module_name`` imports directly."""
+    imported = set()
+    for node in ast.walk(_parse(module_path(module_name))):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            # "from utils import wait_policy" imports a module, "from utils.x import y" a name of one
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        elif isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        else:
+            continue
+        imported.update(name for name in names if _project_module(name))
+    return frozenset(imported)
+
+
+@functools.lru_cache(maxsize=None)
+def module_dependencies(module_name: str):
+    """The files ``module_name`` consists of: its own file and the project files it imports, transitively."""
+    seen = {module_name}
+    pending = [module_name]
+    while pending:
+        for name in _imported_modules(pending.pop()):
+            if name not in seen:
+                seen.add(name)
+                pending.append(name)
+    return frozenset(module_path(name) for name in seen)
+
+
+def case_modules(case):
+    """The files of the modules/ handlers perform_login_case runs for the case, with the files they import."""
+    expected = case.user.get('expected')
+    login_module = 'perform_login_with_config_data' if expected is None else 'perform_login_with_json_data'
+    names = ['modules.navigate_to_login_page', f"modules.{login_module}"]
+    # Config users log out whenever they reach the dashboard, so count the logout handlers in for them too
+    if expected in (None, 'success'):
+        names += ['modules.perform_logout', 'modules.perform_logout_redirection_to_login']
+    return sorted(set().union(*(module_dependencies(name) for name in names)))
+
+
+@functools.lru_cache(maxsize=None)
+def module_fingerprint(path: str):
+    """Hash of the module's syntax tree; comments and formatting do not change it."""
+    return hashlib.sha256(ast.dump(_parse(path)).encode()).hexdigest()
+
+
+def engine_version(browser_name: str):
+    # Every Playwright release pins one build per engine, so this names the browser without launching it
+    return f"{browser_name}@playwright-{importlib.metadata.version('playwright')}"
+
+
+def case_key(case):
+    """Hash of everything a case's result depends on, as listed in the module docstring."""
+    inputs = {
+        'user': case.user,
+        'source': case.source,
+        'engine': engine_version(case.engine),
+        'headless': case.headless,
+        'url': Config.BASE_URL,
+        'modules': {path: module_fingerprint(path) for path in case_modules(case)},
+        'runner': {path: module_fingerprint(path) for path in CASE_RUNNER_FILES},
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """Keys of passed cases with the time they passed, stored in one JSON file."""
+
+    def __init__(self, path=None, ttl_hours=None):
+        self.path = path or Config.RESULT_CACHE_FILE
+        self.ttl = (Config.RESULT_CACHE_TTL if ttl_hours is None else ttl_hours) * 3600
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path) as cache_file:
+                self.entries = json.load(cache_file)
+        self.stats = {'hits': 0, 'stored': 0}
+
+    def passed_at(self, key: str):
+        """Time the case passed, or None when it never passed or the pass is older than the TTL."""
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry['passed_at'] > self.ttl:
+            return None
+        self.stats['hits'] += 1
+        return entry['passed_at']
+
+    def store(self, key: str, nodeid: str):
+        self.entries[key] = {'nodeid': nodeid, 'passed_at': time.time()}
+        self.stats['stored'] += 1
+
+    def invalidate(self, key: str):
+        self.entries.pop(key, None)
+
+    def save(self):
+        """Write the cache without the expired entries."""
+        now = time.time()
+        entries = {key: entry for key, entry in self.entries.items() if now - entry['passed_at'] <= self.ttl}
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as cache_file:
+            json.dump(entries, cache_file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def source_data_files():
+    """Data file of every source that reads one, relative to the project; files outside it are left out."""
+    files = {}
+    for source, path in (('json', Config.LOGIN_DATA_FILE), ('config', Config.USERS_FILE)):
+        if not path:
+            continue
+        relative = os.path.relpath(os.path.abspath(path), PROJECT_DIR).replace(os.sep, '/')
+        if not relative.startswith('../'):
+            files[relative] = source
+    return files
+
+
+def impact_map(cases):
+    """Map every code file and source data file to the ids of the cases that use it."""
+    data_files = source_data_files()
+    cases_by_module = {}
+    for case in cases:
+        paths = case_modules(case) + [path for path, source in data_files.items() if source == case.source]
+        for path in paths:
+            cases_by_module.setdefault(path, []).append(case.id)
+    return dict(sorted(cases_by_module.items()))
+
+
+def _syntax_changed(ref: str, path: str):
+    """Whether the syntax tree of a Python file differs between ``ref`` and the working tree."""
+    old = subprocess.run(['git', 'show', f"{ref}:./{path}"], cwd=PROJECT_DIR, capture_output=True, text=True)
+    full_path = os.path.join(PROJECT_DIR, path)
+    if old.returncode != 0 or not os.path.exists(full_path):
+        return True
+    with open(full_path, encoding='utf-8') as source_file:
+        new_source = source_file.read()
+    try:
+        return ast.dump(ast.parse(old.stdout)) != ast.dump(ast.parse(new_source))
+    except SyntaxError:
+        return True
+
+
+def changed_files(ref: str):
+    """
+    Files changed between ``ref`` and the working tree, relative to the project.
+    Python files whose changes are limited to comments or formatting are left out.
+    """
+    output = subprocess.run(['git', 'diff', '--name-only', '--relative', ref], cwd=PROJECT_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return [path for path in output.splitlines() if path and (not path.endswith('.py') or _syntax_changed(ref, path))]
+
+
+def impacted_case_ids(cases, changed):
+    """Ids of the cases affected by the changed files, or None when every case may be."""
+    cases_by_module = impact_map(cases)
+    # A file no case is known to use (a test, the conftest, another data file) may affect any of them
+    if any(path not in cases_by_module for path in changed):
+        return None
+    return {case_id for path in changed for case_id in cases_by_module[path]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the handler map of the login matrix or the cases a change hits.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('map', help='list the cases using every code and data file')
+    impacted_parser = subparsers.add_parser('impacted', help='list the cases affected by the changes since REF')
+    impacted_parser.add_argument('ref')
+    subparsers.add_parser('clear', help='forget every cached pass')
+    args = parser.parse_args()
+
+    if args.command == 'clear':
+        if os.path.exists(Config.RESULT_CACHE_FILE):
+            os.remove(Config.RESULT_CACHE_FILE)
+        return
+    cases = list(iter_login_cases())
+    if args.command == 'map':
+        for path, case_ids in impact_map(cases).items():
+            print(f"{path}: {len(case_ids)} case(s)")
+    else:
+        case_ids = impacted_case_ids(cases, changed_files(args.ref))
+        if case_ids is None:
+            print(f"Changes to files no case is mapped to since {args.ref}; every case is affected")
+        else:
+            print('\n'.join(sorted(case_ids)) or f"No case affected since {args.ref}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Screenshot service with a capture policy and background writes.
+
+The browser renders and encodes the image; the flow only waits for that, while writing the file
+happens on a small thread pool. JPEG with a quality setting, css scale and element or clip regions
+keep the capture itself cheap. The policy decides which captures happen at all:
+- always: every capture
+- on_failure: only captures marked as failures (error screenshots)
+- first_n: every capture of the first SCREENSHOT_FIRST_N users of each screenshot directory,
+  plus all failure captures
+
+With ARTIFACT_STORE=1 the images go to the content-addressed artifact store instead of plain files.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import Config
+from utils.artifact_store import ArtifactStore
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('always', 'on_failure', 'first_n')
+
+_service = None
+
+
+class ScreenshotService:
+    def __init__(self, policy=None, first_n=None, image_type=None, quality=None, scale=None, max_workers=None,
+                 store=None):
+        self.policy = policy or Config.SCREENSHOT_POLICY
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unknown screenshot policy: {self.policy}")
+        self.first_n = Config.SCREENSHOT_FIRST_N if first_n is None else first_n
+        self.image_type = image_type or Config.SCREENSHOT_TYPE
+        self.quality = Config.SCREENSHOT_QUALITY if quality is None else quality
+        self.scale = scale or Config.SCREENSHOT_SCALE
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or Config.SCREENSHOT_WORKERS,
+                                           thread_name_prefix='screenshot-writer')
+        self.store = store if store is not None else (ArtifactStore() if Config.ARTIFACT_STORE else None)
+        self.stats = {'captured': 0, 'skipped': 0, 'bytes': 0}
+        self._first_users = {}
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def should_capture(self, group: str, user=None, failure=False):
+        """Apply the capture policy to one capture; first_n counts users per group (a screenshot directory)."""
+        if failure or self.policy == 'always':
+            return True
+        if self.policy == 'on_failure' or user is None:
+            return False
+        with self._lock:
+            # Only the first n users of a group are kept, so the check stays cheap for any number of users
+            first_users = self._first_users.setdefault(group, {})
+            if user not in first_users and len(first_users) < self.first_n:
+                first_users[user] = len(first_users)
+            return user in first_users
+
+    def _options(self, clip=None):
+        options = {'type': self.image_type, 'scale': self.scale}
+        if self.image_type == 'jpeg':
+            options['quality'] = self.quality
+        if clip:
+            options['clip'] = clip
+        return options
+
+    def _path(self, screenshots_dir: str, filename: str):
+        if self.image_type == 'jpeg':
+            filename = os.path.splitext(filename)[0] + '.jpg'
+        return os.path.join(screenshots_dir, filename)
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as image_file:
+            image_file.write(data)
+        return path
+
+    def _store(self, data: bytes, group: str, user, filename: str):
+        step = os.path.splitext(filename)[0]
+        if user is not None and step.endswith(f"_{user}"):
+            step = step[:-len(user) - 1]
+        ext = 'jpg' if self.image_type == 'jpeg' else 'png'
+        return self.store.put(data, os.path.basename(os.path.normpath(group)), user, step, ext=ext)
+
+    def _submit(self, screenshots_dir: str, filename: str, data: bytes, group: str, user):
+        with self._lock:
+            self.stats['captured'] += 1
+            self.stats['bytes'] += len(data)
+            if self.store is not None:
+                future = self.executor.submit(self._store, data, group, user, filename)
+            else:
+                future = self.executor.submit(self._write, self._path(screenshots_dir, filename), data)
+            self._futures.append(future)
+        return future
+
+    def _skip(self):
+        with self._lock:
+            self.stats['skipped'] += 1
+
+    def capture(self, page, screenshots_dir: str, filename: str, user=None, failure=False, element=None, clip=None,
+                group=None):
+        """
+        Capture the page (or only ``element``, a locator, or the ``clip`` region) if the policy allows it.
+        ``group`` defaults to ``screenshots_dir``; pass the engine directory when every user has its own directory.
+        Returns a future of the written path (or blob digest), or None when the capture was skipped.
+        """
+        group = group or screenshots_dir
+        if not self.should_capture(group, user, failure):
+            self._skip()
+            return None
+        options = self._options(clip)
+        data = element.screenshot(**options) if element is not None else page.screenshot(**options)
+        return self._submit(screenshots_dir, filename, data, group, user)
+
+    async def capture_async(self, page, screenshots_dir: str, filename: str, user=None, failure=False,
+                            element=None, clip=None, group=None):
+        """Async version of capture."""
+        group = group or screenshots_dir
+        if not self.should_capture(group, user, failure):
+            self._skip()
+            return None
+        options = self._options(clip)
+        data = await element.screenshot(**options) if element is not None else await page.screenshot(**options)
+        return self._submit(screenshots_dir, filename, data, group, user)
+
+    def flush(self):
+        """Wait until every queued screenshot is on disk."""
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            try:
+                future.result()
+            except OSError as e:
+                logger.error(f"Could not write screenshot: {str(e)}")
+        if self.store is not None:
+            self.store.save_manifest()
+            logger.info(f"Artifact store: {self.store.stats['new_blobs']} new blob(s), "
+                        f"{self.store.stats['bytes_deduplicated'] / 1024:.1f} KiB deduplicated")
+        logger.info(f"Screenshots ({self.policy}): {self.stats['captured']} captured, {self.stats['skipped']} skipped, "
+                    f"{self.stats['bytes'] / 1024:.1f} KiB")
+
+    def close(self):
+        self.flush()
+        self.executor.shutdown()
+
+
+def get_screenshot_service():
+    """Return the screenshot service of this process, creating it on first use."""
+    global _service
+    if _service is None:
+        _service = ScreenshotService()
+    return _service
+
+
+def close_screenshot_service():
+    """Write out the pending screenshots of this process and shut the service down, if it was used."""
+    global _service
+    if _service is None:
+        return
+    _service.close()
+    _service = None
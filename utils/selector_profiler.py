@@ -0,0 +1,241 @@
+"""
+Resolve time and match count of every selector the modules/ handlers act on.
+
+With PROFILE_SELECTORS=1 every Locator.click, fill and wait_for and every Page.wait_for_selector
+also times a Locator.count() on the same selector: the time the browser needs to resolve it
+(protocol round trip included) and how many elements it matches. Clicks and fills are measured
+before the action, waits after it, so the element is on the page in both cases. The report flags
+selectors whose median resolve time exceeds SLOW_SELECTOR_MS and ambiguous ones (more than one
+match), which Playwright has to disambiguate or rejects in strict mode.
+
+The hooks wrap public Playwright methods and only cost the extra count() while profiling is on.
+Records stay in the process that made them; run the suite in-process (the default) or profile one
+login/logout flow directly:
+# PROFILE_SELECTORS=1 pytest tests/test_login_matrix.py -k chromium
+# python -m utils.selector_profiler --stand-in --output selector_report.json
+"""
+import argparse
+import functools
+import json
+import logging
+import threading
+import time
+
+from playwright.async_api import Locator as AsyncLocator, Page as AsyncPage
+from playwright.sync_api import Locator, Page
+
+from config.config import Config
+from modules.close_browser import handle_close_browser_context
+from modules.navigate_to_login_page import handle_navigate_to_login_page
+from modules.perform_login_with_config_data import handle_perform_login_with_config_data
+from modules.perform_logout import handle_perform_logout
+from utils.browser_pool import close_browser_pool, get_browser_pool
+from utils.log_pipeline import setup_logging
+from utils.stand_in_server import StandInServer
+from utils.stats import summarize
+from utils.wait_policy import wait_for_error_banner
+
+logger = logging.getLogger(__name__)
+
+# Locator methods whose selector is measured before (click, fill) or after (wait_for) the call
+_MEASURE_BEFORE = ('click', 'fill')
+_MEASURE_AFTER = ('wait_for',)
+
+_records = []
+_records_lock = threading.Lock()
+_hooks_installed = False
+
+
+def record_selector(selector: str, action: str, seconds: float, matches: int):
+    with _records_lock:
+        _records.append({'selector': selector, 'action': action, 'resolve': seconds, 'matches': matches})
+
+
+def selector_records():
+    """Return a copy of the selector records of this process."""
+    with _records_lock:
+        return list(_records)
+
+
+def reset_selector_records():
+    with _records_lock:
+        _records.clear()
+
+
+def _selector_of(locator):
+    return getattr(getattr(locator, '_impl_obj', locator), '_selector', repr(locator))
+
+
+def _measure(locator, action: str):
+    try:
+        start = time.perf_counter()
+        matches = locator.count()
+        record_selector(_selector_of(locator), action, time.perf_counter() - start, matches)
+    except Exception as e:
+        # The page may be navigating away; profiling must never fail the action itself
+        logger.debug(f"Could not profile {_selector_of(locator)}: {str(e)}")
+
+
+async def _measure_async(locator, action: str):
+    try:
+        start = time.perf_counter()
+        matches = await locator.count()
+        record_selector(_selector_of(locator), action, time.perf_counter() - start, matches)
+    except Exception as e:
+        logger.debug(f"Could not profile {_selector_of(locator)}: {str(e)}")
+
+
+def _wrap_locator_method(locator_class, name: str):
+    original = getattr(locator_class, name)
+    before = name in _MEASURE_BEFORE
+
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        if not Config.PROFILE_SELECTORS:
+            return original(self, *args, **kwargs)
+        if before:
+            _measure(self, name)
+        result = original(self, *args, **kwargs)
+        if not before:
+            _measure(self, name)
+        return result
+
+    setattr(locator_class, name, wrapper)
+
+
+def _wrap_locator_method_async(locator_class, name: str):
+    original = getattr(locator_class, name)
+    before = name in _MEASURE_BEFORE
+
+    @functools.wraps(original)
+    async def wrapper(self, *args, **kwargs):
+        if not Config.PROFILE_SELECTORS:
+            return await original(self, *args, **kwargs)
+        if before:
+            await _measure_async(self, name)
+        result = await original(self, *args, **kwargs)
+        if not before:
+            await _measure_async(self, name)
+        return result
+
+    setattr(locator_class, name, wrapper)
+
+
+def install_selector_hooks():
+    """Wrap the Locator actions and Page.wait_for_selector of both Playwright APIs once."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+
+    for name in _MEASURE_BEFORE + _MEASURE_AFTER:
+        _wrap_locator_method(Locator, name)
+        _wrap_locator_method_async(AsyncLocator, name)
+
+    original_wait_for_selector = Page.wait_for_selector
+    original_wait_for_selector_async = AsyncPage.wait_for_selector
+
+    @functools.wraps(original_wait_for_selector)
+    def wait_for_selector(self, selector, *args, **kwargs):
+        result = original_wait_for_selector(self, selector, *args, **kwargs)
+        if Config.PROFILE_SELECTORS:
+            _measure(self.locator(selector), 'wait_for_selector')
+        return result
+
+    @functools.wraps(original_wait_for_selector_async)
+    async def wait_for_selector_async(self, selector, *args, **kwargs):
+        result = await original_wait_for_selector_async(self, selector, *args, **kwargs)
+        if Config.PROFILE_SELECTORS:
+            await _measure_async(self.locator(selector), 'wait_for_selector')
+        return result
+
+    Page.wait_for_selector = wait_for_selector
+    AsyncPage.wait_for_selector = wait_for_selector_async
+
+
+def build_report(records=None, slow_ms=None):
+    """Aggregate the records per selector and flag the slow and ambiguous ones."""
+    records = selector_records() if records is None else records
+    slow_ms = Config.SLOW_SELECTOR_MS if slow_ms is None else slow_ms
+    by_selector = {}
+    for record in records:
+        by_selector.setdefault(record['selector'], []).append(record)
+
+    selectors = {}
+    for selector, group in sorted(by_selector.items()):
+        resolve = summarize([record['resolve'] for record in group])
+        max_matches = max(record['matches'] for record in group)
+        flags = []
+        if resolve['p50'] * 1000 > slow_ms:
+            flags.append('slow')
+        if max_matches > 1:
+            flags.append('ambiguous')
+        selectors[selector] = {
+            'resolve': resolve,
+            'matches': max_matches,
+            'actions': sorted({record['action'] for record in group}),
+            'flags': flags,
+        }
+    return {'version': 1, 'slow_ms': slow_ms, 'selectors': selectors}
+
+
+def format_report(report):
+    """Render one line per selector, flagged selectors first."""
+    lines = []
+    ordered = sorted(report['selectors'].items(), key=lambda item: (not item[1]['flags'], item[0]))
+    for selector, stats in ordered:
+        flags = f" [{', '.join(stats['flags'])}]" if stats['flags'] else ''
+        lines.append(f"{selector}: {stats['resolve']['count']} resolve(s), median "
+                     f"{stats['resolve']['p50'] * 1000:.1f}ms, max {stats['resolve']['max'] * 1000:.1f}ms, "
+                     f"{stats['matches']} match(es){flags}")
+    return lines
+
+
+def profile_login_flow(browser_name='chromium', headless=True):
+    """Run one successful and one failed login through the handlers with profiling on and return the report."""
+    install_selector_hooks()
+    previous_setting, Config.PROFILE_SELECTORS = Config.PROFILE_SELECTORS, True
+    user = Config.USERS[0]
+    page = get_browser_pool().acquire(browser_name, headless=headless).new_context().new_page()
+    try:
+        handle_navigate_to_login_page(page)
+        handle_perform_login_with_config_data(page, user['username'], user['password'])
+        handle_perform_logout(page)
+        handle_navigate_to_login_page(page)
+        handle_perform_login_with_config_data(page, user['username'], f"{user['password']}-wrong")
+        wait_for_error_banner(page)
+    finally:
+        Config.PROFILE_SELECTORS = previous_setting
+        handle_close_browser_context(page)
+        close_browser_pool()
+    return build_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile the selectors of one login/logout flow.')
+    parser.add_argument('--browser', default='chromium')
+    parser.add_argument('--headed', action='store_true')
+    parser.add_argument('--stand-in', action='store_true', help='profile a local stand-in server instead')
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    args = parser.parse_args()
+    setup_logging()
+
+    server = None
+    if args.stand_in:
+        server = StandInServer().start()
+        Config.use_site(server.url)
+    try:
+        report = profile_login_flow(args.browser, headless=not args.headed)
+    finally:
+        if server is not None:
+            server.stop()
+
+    for line in format_report(report):
+        logger.info(line)
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
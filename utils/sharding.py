@@ -0,0 +1,170 @@
+"""
+Duration history of test cases and a shard planner to split the suite across CI agents.
+
+After every run conftest adds the duration of each test (setup, call and teardown) to the history
+file. With ``--shard i/N`` every agent plans the same N shards from that history with longest
+processing time first bin packing (the slowest remaining case goes to the least loaded shard) and
+runs only shard i. Cases without history are estimated with the median of the known ones.
+A shard writes its updated history next to the file (.shard-i-of-N) instead of into it; the
+JUnit XML reports and the histories of all shards merge back into one:
+# pytest --shard 1/3 --junitxml=shard-1.xml
+# python -m utils.sharding plan 3
+# python -m utils.sharding merge-junit report.xml shard-1.xml shard-2.xml shard-3.xml
+# python -m utils.sharding merge-history .test_durations.json .test_durations.json.shard-*
+"""
+import argparse
+import heapq
+import json
+import os
+import statistics
+import subprocess
+import sys
+import xml.etree.ElementTree as ElementTree
+
+from config.config import Config
+
+# Weight of the latest run in the moving average of a case's duration
+SMOOTHING = 0.5
+
+DEFAULT_ESTIMATE = 1.0
+
+
+def parse_shard(value: str):
+    """Parse "2/3" into (2, 3); shards are numbered from 1."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {value!r}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard {value!r} is out of range")
+    return index, count
+
+
+def load_history(path=None):
+    """Return {nodeid: {'seconds': smoothed duration, 'runs': count}}; empty when there is no history yet."""
+    path = path or Config.DURATION_HISTORY_FILE
+    if not os.path.exists(path):
+        return {}
+    with open(path) as history_file:
+        return json.load(history_file)
+
+
+def update_history(history, durations):
+    """Fold the durations of one run into the history (exponential moving average per case)."""
+    for nodeid, seconds in durations.items():
+        entry = history.get(nodeid)
+        if entry is None:
+            history[nodeid] = {'seconds': seconds, 'runs': 1}
+        else:
+            entry['seconds'] = SMOOTHING * seconds + (1 - SMOOTHING) * entry['seconds']
+            entry['runs'] += 1
+    return history
+
+
+def save_history(history, path=None):
+    path = path or Config.DURATION_HISTORY_FILE
+    # Several local runs may finish at the same time; write aside and swap the file in
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as history_file:
+        json.dump(history, history_file, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def shard_history_path(index: int, count: int, path=None):
+    """History file a shard writes, so parallel shards never overwrite each other's updates."""
+    return f"{path or Config.DURATION_HISTORY_FILE}.shard-{index}-of-{count}"
+
+
+def record_run(durations, path=None, output_path=None):
+    """Add the durations of this run to the history file, or write the updated history to ``output_path``."""
+    if durations:
+        save_history(update_history(load_history(path), durations), output_path or path)
+
+
+def estimate_durations(nodeids, history):
+    """Historical duration of every case; cases without history get the median of the known ones."""
+    known = [history[nodeid]['seconds'] for nodeid in nodeids if nodeid in history]
+    default = statistics.median(known) if known else DEFAULT_ESTIMATE
+    return {nodeid: history[nodeid]['seconds'] if nodeid in history else default for nodeid in nodeids}
+
+
+def plan_shards(nodeids, history, shard_count: int):
+    """
+    Split the cases into ``shard_count`` shards of similar total duration (LPT bin packing).
+
+    The plan only depends on the case ids and the history, so every agent computes the same one.
+    Returns a list of shards, each a dict with its nodeids and estimated seconds.
+    """
+    estimates = estimate_durations(nodeids, history)
+    shards = [{'nodeids': [], 'seconds': 0.0} for _ in range(shard_count)]
+    loads = [(0.0, index) for index in range(shard_count)]
+    for nodeid in sorted(estimates, key=lambda nodeid: (-estimates[nodeid], nodeid)):
+        seconds, index = heapq.heappop(loads)
+        shards[index]['nodeids'].append(nodeid)
+        shards[index]['seconds'] = seconds + estimates[nodeid]
+        heapq.heappush(loads, (shards[index]['seconds'], index))
+    return shards
+
+
+def merge_histories(paths):
+    """Merge the histories written by the shards; per case the entry with the most runs is the newest."""
+    merged = {}
+    for path in paths:
+        for nodeid, entry in load_history(path).items():
+            if nodeid not in merged or entry['runs'] > merged[nodeid]['runs']:
+                merged[nodeid] = entry
+    return merged
+
+
+def merge_junit(paths):
+    """Merge the JUnit XML reports of the shards into one <testsuites> element."""
+    merged = ElementTree.Element('testsuites')
+    totals = dict.fromkeys(('tests', 'failures', 'errors', 'skipped'), 0)
+    total_time = 0.0
+    for path in paths:
+        root = ElementTree.parse(path).getroot()
+        for suite in ([root] if root.tag == 'testsuite' else root.findall('testsuite')):
+            merged.append(suite)
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+            total_time += float(suite.get('time', 0))
+    for key, value in totals.items():
+        merged.set(key, str(value))
+    merged.set('time', f"{total_time:.3f}")
+    return ElementTree.ElementTree(merged)
+
+
+def _collect_nodeids(pytest_args):
+    output = subprocess.run([sys.executable, '-m', 'pytest', '--collect-only', '-q', '-o', 'addopts=', *pytest_args],
+                            capture_output=True, text=True).stdout
+    return [line for line in output.splitlines() if '::' in line]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plan test shards from the duration history or merge shard results.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    plan_parser = subparsers.add_parser('plan', help='show the shards pytest --shard i/N would run')
+    plan_parser.add_argument('shards', type=int)
+    plan_parser.add_argument('pytest_args', nargs='*', help='arguments selecting the tests, e.g. tests/')
+    junit_parser = subparsers.add_parser('merge-junit', help='merge the JUnit XML reports of all shards')
+    junit_parser.add_argument('output')
+    junit_parser.add_argument('reports', nargs='+')
+    history_parser = subparsers.add_parser('merge-history', help='merge the duration histories of all shards')
+    history_parser.add_argument('output')
+    history_parser.add_argument('histories', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'plan':
+        shards = plan_shards(_collect_nodeids(args.pytest_args), load_history(), args.shards)
+        for number, shard in enumerate(shards, start=1):
+            print(f"shard {number}/{args.shards}: {len(shard['nodeids'])} test(s), ~{shard['seconds']:.1f}s")
+    elif args.command == 'merge-junit':
+        merge_junit(args.reports).write(args.output, encoding='utf-8', xml_declaration=True)
+        print(f"Merged {len(args.reports)} report(s) into {args.output}")
+    else:
+        save_history(merge_histories(args.histories), args.output)
+        print(f"Merged {len(args.histories)} history file(s) into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Local stand-in for the OrangeHRM login, dashboard and logout pages.
+
+It serves the same DOM contract the modules/ handlers rely on (input[name="username"],
+input[name="password"], button[type="submit"], the span.oxd-userdropdown-tab user dropdown, the Logout menuitem
+and the "Invalid credentials" message) at the same paths as the demo site, so the suite and
+benchmarks can run offline and deterministically. Every route can be given extra latency, an
+error rate (answered with 503) and a share of slow responses.
+
+Run it on its own:
+# python -m utils.stand_in_server --port 8000
+# python -m utils.stand_in_server --port 8000 --latency 50 --route dashboard:latency_ms=400,error_rate=0.1
+or let conftest start it for the whole run:
+# STAND_IN=1 pytest
+"""
+import argparse
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LOGIN_PATH = '/web/index.php/auth/login'
+VALIDATE_PATH = '/web/index.php/auth/validate'
+DASHBOARD_PATH = '/web/index.php/dashboard/index'
+LOGOUT_PATH = '/web/index.php/auth/logout'
+STYLESHEET_PATH = '/web/dist/css/app.css'
+LOGO_PATH = '/web/images/ohrm_branding.png'
+
+ROUTES = {
+    LOGIN_PATH: 'login',
+    VALIDATE_PATH: 'validate',
+    DASHBOARD_PATH: 'dashboard',
+    LOGOUT_PATH: 'logout',
+    STYLESHEET_PATH: 'assets',
+    LOGO_PATH: 'assets',
+}
+
+# Usernames are matched case-insensitively, like on the demo site ("Admin" and "admin")
+DEFAULT_USERS = {'admin': 'admin123'}
+
+SESSION_COOKIE = 'orangehrm'
+
+# Smallest valid PNG (1x1 transparent pixel), so asset routes behave like real images
+LOGO_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489'
+    '0000000d49444154789c6360000002000005000156d1cbb60000000049454e44ae426082'
+)
+
+STYLESHEET = b"""
+body { font-family: sans-serif; margin: 0; }
+.oxd-userdropdown-tab { cursor: pointer; display: inline-flex; gap: 6px; padding: 8px; }
+.oxd-dropdown-menu { list-style: none; margin: 0; padding: 8px; border: 1px solid #ccc; }
+.oxd-alert--error { color: #eb0910; }
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>OrangeHRM</title>
+<link rel="stylesheet" href="{stylesheet}">
+</head>
+<body>
+<img class="orangehrm-branding" src="{logo}" alt="company-branding" width="1" height="1">
+{body}
+</body>
+</html>
+"""
+
+LOGIN_BODY = """<div class="orangehrm-login-container">
+<h5 class="orangehrm-login-title">Login</h5>
+{alert}
+<form class="oxd-form" method="post" action="{validate}">
+<input type="hidden" name="_token" value="{token}">
+<label>Username <input class="oxd-input" name="username" placeholder="Username" autofocus></label>
+<label>Password <input class="oxd-input" type="password" name="password" placeholder="Password"></label>
+<button type="submit" class="oxd-button orangehrm-login-button">Login</button>
+</form>
+</div>
+"""
+
+ALERT = """<div class="oxd-alert oxd-alert--error" role="alert">
+<p class="oxd-text oxd-alert-content-text">Invalid credentials</p>
+</div>"""
+
+DASHBOARD_BODY = """<header class="oxd-topbar-header">
+<h6 class="oxd-topbar-header-breadcrumb-module">Dashboard</h6>
+<ul class="oxd-topbar-header-userarea">
+<li>
+<span class="oxd-userdropdown-tab" onclick="document.getElementById('user-menu').hidden = false">
+<p class="oxd-userdropdown-name">{username}</p><i class="oxd-icon bi-caret-down-fill oxd-userdropdown-icon">&#9662;</i>
+</span>
+<ul id="user-menu" class="oxd-dropdown-menu" role="menu" hidden>
+<li><a href="#" role="menuitem" class="oxd-userdropdown-link">About</a></li>
+<li><a href="{logout}" role="menuitem" class="oxd-userdropdown-link">Logout</a></li>
+</ul>
+</li>
+</ul>
+</header>
+<main class="oxd-layout-context"><p>Time at Work</p></main>
+"""
+
+
+def parse_route_faults(value: str):
+    """Parse "dashboard:latency_ms=400,error_rate=0.1" into ('dashboard', {...})."""
+    route, _, settings = value.partition(':')
+    faults = {}
+    for setting in filter(None, settings.split(',')):
+        name, _, number = setting.partition('=')
+        faults[name.strip()] = float(number)
+    return route.strip(), faults
+
+
+class StandInServer:
+    """
+    Threaded HTTP server imitating the OrangeHRM demo site.
+
+    ``faults`` maps a route name (login, validate, dashboard, logout, assets or '*' for every route)
+    to latency_ms, error_rate, slow_rate and slow_ms. Random faults come from a seeded generator
+    so a run can be repeated exactly.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, users=None, faults=None, seed=0):
+        self.users = {username.lower(): password for username, password in (users or DEFAULT_USERS).items()}
+        self.faults = faults or {}
+        self.random = random.Random(seed)
+        self.sessions = {}
+        self.request_counts = {}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='stand-in-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def fault_settings(self, route: str):
+        settings = dict(self.faults.get('*', {}))
+        settings.update(self.faults.get(route, {}))
+        return settings
+
+    def plan_response(self, route: str):
+        """Decide the delay in seconds and whether to fail one request of the route."""
+        settings = self.fault_settings(route)
+        with self.lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+            fail = self.random.random() < settings.get('error_rate', 0)
+            slow = self.random.random() < settings.get('slow_rate', 0)
+        delay_ms = settings.get('latency_ms', 0) + (settings.get('slow_ms', 0) if slow else 0)
+        return delay_ms / 1000, fail
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _session(self):
+                cookie = SimpleCookie(self.headers.get('Cookie', ''))
+                session_id = cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+                with server.lock:
+                    if session_id not in server.sessions:
+                        session_id = secrets.token_hex(16)
+                        server.sessions[session_id] = {'user': None, 'error': False, 'token': secrets.token_hex(8)}
+                    return session_id, server.sessions[session_id]
+
+            def _send(self, status, body=b'', content_type='text/html; charset=utf-8', session_id=None,
+                      location=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if session_id:
+                    self.send_header('Set-Cookie', f'{SESSION_COOKIE}={session_id}; Path=/; HttpOnly')
+                if location:
+                    self.send_header('Location', location)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _page(self, body):
+                return PAGE_TEMPLATE.format(stylesheet=STYLESHEET_PATH, logo=LOGO_PATH, body=body).encode()
+
+            def _handle(self, method):
+                path = urlparse(self.path).path
+                route = ROUTES.get(path)
+                if route is None:
+                    if path in ('/', '/web/index.php', '/web/index.php/'):
+                        self._send(302, location=LOGIN_PATH)
+                    else:
+                        self._send(404, b'Not Found', 'text/plain')
+                    return
+
+                delay, fail = server.plan_response(route)
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    self._send(503, b'Service Unavailable (injected)', 'text/plain')
+                    return
+
+                if route == 'assets':
+                    if path == LOGO_PATH:
+                        self._send(200, LOGO_PNG, 'image/png')
+                    else:
+                        self._send(200, STYLESHEET, 'text/css')
+                    return
+
+                session_id, session = self._session()
+                if route == 'login' and method == 'GET':
+                    if session['user']:
+                        self._send(302, session_id=session_id, location=DASHBOARD_PATH)
+                        return
+                    alert = ALERT if session.pop('error', False) else ''
+                    body = LOGIN_BODY.format(alert=alert, validate=VALIDATE_PATH, token=session['token'])
+                    self._send(200, self._page(body), session_id=session_id)
+                elif route == 'validate' and method == 'POST':
+                    length = int(self.headers.get('Content-Length', 0))
+                    form = parse_qs(self.rfile.read(length).decode())
+                    username = form.get('username', [''])[0]
+                    password = form.get('password', [''])[0]
+                    token = form.get('_token', [''])[0]
+                    if token == session['token'] and server.users.get(username.lower()) == password and password:
+                        session['user'] = username
+                        self._send(302, session_id=session_id, location=DASHBOARD_PATH)
+                    else:
+                        session['error'] = True
+                        self._send(302, session_id=session_id, location=LOGIN_PATH)
+                elif route == 'dashboard' and method == 'GET':
+                    if not session['user']:
+                        self._send(302, session_id=session_id, location=LOGIN_PATH)
+                        return
+                    body = DASHBOARD_BODY.format(username=html.escape(session['user']), logout=LOGOUT_PATH)
+                    self._send(200, self._page(body), session_id=session_id)
+                elif route == 'logout' and method == 'GET':
+                    with server.lock:
+                        server.sessions.pop(session_id, None)
+                    self._send(302, location=LOGIN_PATH)
+                else:
+                    self._send(405, b'Method Not Allowed', 'text/plain')
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the OrangeHRM login flow.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0, help='latency in ms added to every route')
+    parser.add_argument('--error-rate', type=float, default=0, help='share of requests answered with 503')
+    parser.add_argument('--route', action='append', default=[],
+                        help='per route faults, e.g. dashboard:latency_ms=400,slow_rate=0.2,slow_ms=2000')
+    parser.add_argument('--faults', default='', help='all faults as JSON, like the STAND_IN_FAULTS setting')
+    args = parser.parse_args()
+
+    faults = json.loads(args.faults) if args.faults else {}
+    faults.setdefault('*', {}).update({'latency_ms': args.latency, 'error_rate': args.error_rate})
+    for value in args.route:
+        route, settings = parse_route_faults(value)
+        faults.setdefault(route, {}).update(settings)
+
+    server = StandInServer(args.host, args.port, faults=faults, seed=args.seed)
+    print(f"Stand-in server on {server.url}{LOGIN_PATH} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Cache of authenticated browser storage state (cookies and local storage), one file per site and user.
+
+A user is logged in once (by default with a direct API login, see Config.LOGIN_STRATEGY); later
+contexts are created from the saved state and start on the dashboard straight away. States are kept
+apart per Config.SITE_URL, so a run against another environment never reuses a session of the first.
+States expire after Config.STORAGE_STATE_TTL seconds, and a cached state whose session was rejected
+(the dashboard redirects to the login page) is dropped and refreshed.
+
+Prime the cache for every user expected to log in successfully:
+# python -m utils.storage_state_cache
+"""
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import urlparse
+
+from playwright.sync_api import Browser, sync_playwright
+
+from config.config import Config
+from modules.perform_login_via_api import handle_perform_login
+from utils.data_sources import config_users, login_data_users
+from utils.log_pipeline import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+class StorageStateCache:
+    def __init__(self, cache_dir=None, ttl=None):
+        self.cache_dir = cache_dir or Config.STORAGE_STATE_DIR
+        self.ttl = Config.STORAGE_STATE_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, username: str):
+        """Return the storage state file of a user on Config.SITE_URL; the state is shared by all engines."""
+        site = urlparse(Config.SITE_URL)
+        safe_site = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{site.netloc}{site.path}".rstrip('/'))
+        safe_username = re.sub(r'[^A-Za-z0-9_.-]', '_', username)
+        return os.path.join(self.cache_dir, safe_site, f"{safe_username}.json")
+
+    def is_fresh(self, username: str):
+        """Check that a cached state exists and is younger than the TTL."""
+        path = self.path_for(username)
+        return os.path.exists(path) and time.time() - os.path.getmtime(path) < self.ttl
+
+    def invalidate(self, username: str):
+        """Drop the cached state of a user."""
+        path = self.path_for(username)
+        if os.path.exists(path):
+            logger.info(f"Invalidating cached session for user: {username}")
+            os.remove(path)
+
+    def login_and_store(self, browser: Browser, username: str, password: str, strategy=None):
+        """Log the user in (through the API or the UI, see Config.LOGIN_STRATEGY) and save the storage state."""
+        logger.info(f"Logging in {username} to cache the session")
+        context = browser.new_context()
+        try:
+            page = context.new_page()
+            handle_perform_login(page, username, password, strategy=strategy)
+            if page.url != Config.DASHBOARD_URL:
+                raise RuntimeError(f"Login failed for user {username}; there is no session to cache")
+
+            path = self.path_for(username)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write next to the target and swap it in, so parallel workers never read half a file
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as state_file:
+                json.dump(context.storage_state(), state_file)
+            os.replace(temp_path, path)
+            return path
+        finally:
+            context.close()
+
+    def new_context(self, browser: Browser, username: str, password: str, **context_options):
+        """
+        Return a (context, page) pair that is already logged in as the user, with the page on the dashboard.
+
+        Uses the cached state when it is fresh, otherwise logs in first. If the dashboard redirects to the
+        login page the cached session is no longer valid: it is invalidated and the user logs in again once.
+        """
+        for attempt in range(2):
+            if attempt == 0 and self.is_fresh(username):
+                self.hits += 1
+                path = self.path_for(username)
+            else:
+                self.misses += 1
+                path = self.login_and_store(browser, username, password)
+
+            context = browser.new_context(storage_state=path, **context_options)
+            page = context.new_page()
+            page.goto(Config.DASHBOARD_URL)
+            if not page.url.startswith(Config.BASE_URL):
+                return context, page
+
+            context.close()
+            self.invalidate(username)
+
+        raise RuntimeError(f"Cached session for user {username} was redirected to the login page")
+
+    def prime(self, browser: Browser, users):
+        """Log in every user expected to succeed and cache the sessions that are not fresh."""
+        for user in users:
+            if user.get('expected', 'success') != 'success' or self.is_fresh(user['username']):
+                continue
+            try:
+                self.login_and_store(browser, user['username'], user['password'])
+            except RuntimeError as e:
+                logger.warning(str(e))
+
+
+if __name__ == "__main__":
+    setup_logging()
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        StorageStateCache().prime(browser, itertools.chain(config_users(), login_data_users()))
+        browser.close()
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import re
+import time
+
+from playwright.async_api import async_playwright, Browser, Page
+
+from config.config import Config
+from modules.navigate_to_login_page import handle_navigate_to_login_page_async
+from modules.perform_login_with_json_data import handle_perform_login_with_json_data_async
+from modules.perform_logout import handle_perform_logout_async
+from modules.perform_logout_redirection_to_login import handle_perform_logout_redirection_to_login_async
+from utils.concurrency import AdaptiveConcurrency, run_coroutine
+from utils.flight_recorder import finish_flight_recorder, record_case_async, recorder_context_options
+from utils.health import CircuitBreaker, CircuitOpenError, ensure_site_up, is_infrastructure_failure
+from utils.instrumentation import step_labels
+from utils.network_policy import NetworkPolicy
+from utils.screenshot_service import get_screenshot_service
+from utils.wait_policy import wait_for_error_banner_async
+
+logger = logging.getLogger(__name__)
+
+
+def user_screenshots_dir(screenshots_dir: str, index: int, username: str):
+    """Create the screenshot directory of one user, e.g. screenshots/chromium/0001_admin."""
+    # The index keeps users with the same (or an unsafe) username apart
+    safe_username = re.sub(r'[^A-Za-z0-9_.-]', '_', username) or 'user'
+    user_dir = os.path.join(screenshots_dir, f"{index:04d}_{safe_username}")
+    os.makedirs(user_dir, exist_ok=True)
+    return user_dir
+
+
+async def perform_user_flow(page: Page, user: dict, screenshots_dir: str, group=None):
+    """
+    Perform the login, capture screenshots, and perform logout for one user.
+
+    Users with an ``expected`` value follow the JSON data rules (a failure must show the error message);
+    users without one follow the config data rules (a login that does not reach the dashboard is only logged).
+    ``group`` is the engine screenshot directory the screenshot policy counts users in.
+    """
+    username = user['username']
+    password = user['password']
+    expected = user.get('expected')
+    screenshots = get_screenshot_service()
+
+    await handle_navigate_to_login_page_async(page)
+    await screenshots.capture_async(page, screenshots_dir, "before_login.png", user=username, group=group)
+
+    await handle_perform_login_with_json_data_async(page, username, password)
+    await screenshots.capture_async(page, screenshots_dir, "after_login.png", user=username, group=group)
+
+    if expected == "success" or (expected is None and page.url == Config.DASHBOARD_URL):
+        await handle_perform_logout_async(page)
+        await screenshots.capture_async(page, screenshots_dir, "after_logout.png", user=username, group=group)
+        await handle_perform_logout_redirection_to_login_async(page, screenshots_dir, username, group)
+    elif expected is None:
+        logger.warning(f"Login failed for user {username}. Staying on login page.")
+        await screenshots.capture_async(page, screenshots_dir, "login_failed.png", user=username, group=group)
+    else:
+        assert await wait_for_error_banner_async(page), "Expected error message not found."
+
+
+async def run_user_in_context(browser: Browser, index: int, user: dict, screenshots_dir: str, breaker=None):
+    """
+    Run the flow of one user in a fresh browser context and return its result.
+    With a CircuitBreaker the outcome is recorded, and the user is skipped while the breaker is open.
+    """
+    username = user['username']
+    user_dir = user_screenshots_dir(screenshots_dir, index, username)
+    result = {'index': index, 'username': username, 'status': 'passed', 'error': None, 'infrastructure': False,
+              'screenshots_dir': user_dir}
+    start = time.perf_counter()
+
+    if breaker is not None:
+        try:
+            breaker.check()
+        except CircuitOpenError as e:
+            breaker.record(e)
+            return {**result, 'status': 'skipped', 'error': str(e), 'infrastructure': True, 'duration': 0.0}
+
+    context = page = None
+    network_policy = NetworkPolicy()
+    try:
+        # Inside the try, so a context that cannot be created still gives this user a result
+        context = await browser.new_context(**recorder_context_options())
+        await network_policy.attach_async(context)
+        page = await context.new_page()
+        logger.info(f"Starting login/logout test for user: {username}")
+        case_name = f"{os.path.basename(screenshots_dir)}-{os.path.basename(user_dir)}"
+        with step_labels(user=username):
+            async with record_case_async(page, case_name):
+                await perform_user_flow(page, user, user_dir, group=screenshots_dir)
+    except Exception as e:
+        logger.error(f"Error during login/logout tests for user {username}: {str(e)}")
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+        # A timeout may probe the site; keep the blocking request off the event loop
+        result['infrastructure'] = await asyncio.to_thread(is_infrastructure_failure, e)
+        if breaker is not None:
+            breaker.record(e, infrastructure=result['infrastructure'])
+        if page is not None:
+            try:
+                await get_screenshot_service().capture_async(page, user_dir, "error.png", failure=True)
+            except Exception:
+                pass
+    else:
+        if breaker is not None:
+            breaker.record()
+    finally:
+        if context is not None:
+            await context.close()
+            finish_flight_recorder(context)
+        network_policy.log_report(f"user {username}")
+
+    result['network'] = network_policy.stats
+    result['duration'] = time.perf_counter() - start
+    return result
+
+
+async def run_users_in_contexts(browser: Browser, users, screenshots_dir: str, max_concurrency: int):
+    """
+    Run every user in its own context of ``browser``, at most ``max_concurrency`` at a time.
+
+    ``users`` may be any iterable; it is consumed lazily by the workers so only
+    ``max_concurrency`` users are in flight at once (fewer while the adaptive concurrency
+    controller holds them back).
+    """
+    pending_users = enumerate(users, start=1)
+    results = []
+    breaker = CircuitBreaker()
+    controller = AdaptiveConcurrency(max_concurrency)
+
+    async def worker():
+        # All workers share one iterator; the event loop never switches inside the for statement
+        for index, user in pending_users:
+            async with controller.slot():
+                results.append(await run_user_in_context(browser, index, user, screenshots_dir, breaker))
+
+    with controller:
+        await asyncio.gather(*(worker() for _ in range(controller.maximum)))
+    return sorted(results, key=lambda result: result['index'])
+
+
+def run_users_concurrently(browser_name: str, users, screenshots_dir: str, headless=True, max_concurrency=4):
+    """Launch one browser and run all users in isolated contexts, ``max_concurrency`` at a time."""
+
+    async def main():
+        async with async_playwright() as playwright:
+            logger.info(f"Launching {browser_name} browser, headless={headless}, "
+                        f"{max_concurrency} concurrent user(s)")
+            browser = await getattr(playwright, browser_name).launch(headless=headless)
+            try:
+                return await run_users_in_contexts(browser, users, screenshots_dir, max_concurrency)
+            finally:
+                await browser.close()
+
+    if browser_name not in ('chromium', 'firefox', 'webkit'):
+        raise ValueError(f"Unsupported browser: {browser_name}")
+    ensure_site_up()
+
+    start = time.perf_counter()
+    results = run_coroutine(main())
+    get_screenshot_service().flush()
+    failed = sum(1 for result in results if result['status'] == 'failed')
+    skipped = sum(1 for result in results if result['status'] == 'skipped')
+    logger.info(f"{browser_name}: {len(results)} user(s) in {time.perf_counter() - start:.1f}s, {failed} failed, "
+                f"{skipped} skipped")
+    return results
@@ -0,0 +1,153 @@
+"""
+Condition based waits for the login/logout flows.
+
+Every wait here returns as soon as its condition holds (a menu item is visible, the URL changed,
+a response arrived or the error banner rendered) instead of sleeping for a fixed time, and records
+how long it actually took so the time spent waiting shows up in the logs.
+"""
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from config.config import Config
+from modules.selectors import ERROR_BANNER
+
+logger = logging.getLogger(__name__)
+
+ERROR_BANNER_SELECTOR = ERROR_BANNER
+
+_wait_records = []
+_lock = threading.Lock()
+
+
+def record_wait(label: str, seconds: float, outcome: str):
+    """Store the time one wait consumed."""
+    with _lock:
+        _wait_records.append({'label': label, 'seconds': seconds, 'outcome': outcome})
+    logger.info(f"Waited {seconds:.2f}s for {label} ({outcome})")
+
+
+def wait_summary():
+    """Return count, total, max seconds and timeouts per wait label."""
+    summary = {}
+    with _lock:
+        records = list(_wait_records)
+    for record in records:
+        entry = summary.setdefault(record['label'], {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+        entry['count'] += 1
+        entry['total'] += record['seconds']
+        entry['max'] = max(entry['max'], record['seconds'])
+        if record['outcome'] == 'timeout':
+            entry['timeouts'] += 1
+    return summary
+
+
+def format_wait_summary(summary):
+    """One line per wait label, the label that consumed the most time first."""
+    return [f"Wait '{label}': {entry['count']} time(s), {entry['total']:.2f}s total, "
+            f"{entry['max']:.2f}s max, {entry['timeouts']} timeout(s)"
+            for label, entry in sorted(summary.items(), key=lambda item: -item[1]['total'])]
+
+
+def log_wait_summary():
+    """Log how much time each kind of wait consumed so far."""
+    for line in format_wait_summary(wait_summary()):
+        logger.info(line)
+
+
+def reset_wait_records():
+    with _lock:
+        _wait_records.clear()
+
+
+@contextmanager
+def timed_wait(label: str):
+    """Record the time spent inside the block as one wait."""
+    start = time.perf_counter()
+    outcome = 'met'
+    try:
+        yield
+    except Exception:
+        outcome = 'timeout'
+        raise
+    finally:
+        record_wait(label, time.perf_counter() - start, outcome)
+
+
+@asynccontextmanager
+async def timed_wait_async(label: str):
+    """Async version of timed_wait."""
+    start = time.perf_counter()
+    outcome = 'met'
+    try:
+        yield
+    except Exception:
+        outcome = 'timeout'
+        raise
+    finally:
+        record_wait(label, time.perf_counter() - start, outcome)
+
+
+def wait_for_visible(locator, label: str, timeout=None):
+    """Wait until the locator is visible, e.g. a menu item after opening a dropdown."""
+    with timed_wait(label):
+        locator.wait_for(state='visible', timeout=timeout or Config.WAIT_TIMEOUT)
+
+
+def wait_for_url(page, url, label: str, timeout=None):
+    """Wait until the page URL matches ``url`` (string, glob, regex or predicate)."""
+    with timed_wait(label):
+        page.wait_for_url(url, timeout=timeout or Config.WAIT_TIMEOUT)
+
+
+@contextmanager
+def expect_response(page, url_or_predicate, label: str, timeout=None):
+    """Wait for a response triggered by the actions inside the block; yields Playwright's EventInfo."""
+    with timed_wait(label):
+        with page.expect_response(url_or_predicate, timeout=timeout or Config.WAIT_TIMEOUT) as response_info:
+            yield response_info
+
+
+def wait_for_error_banner(page, timeout=None):
+    """Wait for the 'Invalid credentials' banner; return False instead of raising when it never renders."""
+    start = time.perf_counter()
+    try:
+        page.locator(ERROR_BANNER_SELECTOR).wait_for(state='visible', timeout=timeout or Config.WAIT_TIMEOUT)
+    except Exception:
+        record_wait('error banner', time.perf_counter() - start, 'timeout')
+        return False
+    record_wait('error banner', time.perf_counter() - start, 'met')
+    return True
+
+
+async def wait_for_visible_async(locator, label: str, timeout=None):
+    """Async version of wait_for_visible."""
+    async with timed_wait_async(label):
+        await locator.wait_for(state='visible', timeout=timeout or Config.WAIT_TIMEOUT)
+
+
+async def wait_for_url_async(page, url, label: str, timeout=None):
+    """Async version of wait_for_url."""
+    async with timed_wait_async(label):
+        await page.wait_for_url(url, timeout=timeout or Config.WAIT_TIMEOUT)
+
+
+@asynccontextmanager
+async def expect_response_async(page, url_or_predicate, label: str, timeout=None):
+    """Async version of expect_response."""
+    async with timed_wait_async(label):
+        async with page.expect_response(url_or_predicate, timeout=timeout or Config.WAIT_TIMEOUT) as response_info:
+            yield response_info
+
+
+async def wait_for_error_banner_async(page, timeout=None):
+    """Async version of wait_for_error_banner."""
+    start = time.perf_counter()
+    try:
+        await page.locator(ERROR_BANNER_SELECTOR).wait_for(state='visible', timeout=timeout or Config.WAIT_TIMEOUT)
+    except Exception:
+        record_wait('error banner', time.perf_counter() - start, 'timeout')
+        return False
+    record_wait('error banner', time.perf_counter() - start, 'met')
+    return True